@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""Measure memory allocated while encoding and decoding large values.
+
+Compares the current encode/decode path against the previous one, which
+copied payloads to bytes (or str) before compressing or deserializing them.
+Reported numbers are the peak of temporary allocations per call, i.e. not
+counting the returned value itself.
+Values are handed over as memoryviews, as they would be when read out of a
+larger receive buffer.
+
+    python benchmarks/bench_allocations.py [size_in_mb ...]
+
+Requires python 3.4+ (tracemalloc).
+"""
+import gc
+import json
+import os
+import sys
+import tracemalloc
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from condecache import cache
+
+
+#
+# The previous implementations, kept here as the baseline.
+#
+def old_compress(serialized):
+    if isinstance(serialized, str):
+        serialized = serialized.encode()
+    return zlib.compress(serialized)
+
+
+def old_json_deserialize(serialized):
+    if isinstance(serialized, memoryview):
+        # memoryview has no .decode(), so callers had to copy first.
+        serialized = serialized.tobytes()
+    if not isinstance(serialized, str):
+        serialized = serialized.decode()
+    return cache.JSONSerializer._json_decoder.decode(serialized)
+
+
+def old_zlib_json_decode(encoded):
+    decompressed = zlib.decompress(encoded)
+    return old_json_deserialize(decompressed)
+
+
+def measure(func, *args):
+    """returns the peak number of bytes allocated during one call, over and
+        above the size of the result it returns.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = func(*args)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak - after
+
+
+def make_value(size):
+    row = {'id': 0, 'title': 'An article title', 'body': 'x' * 200}
+    rows = size // len(json.dumps(row))
+    return [dict(row, id=i) for i in range(rows)]
+
+
+def run(size_mb):
+    value = make_value(int(size_mb * 1024 * 1024))
+    serialized = cache.JSONSerializer.serialize(value)
+    compressed = memoryview(zlib.compress(serialized.encode()))
+    raw = memoryview(serialized.encode())
+
+    cases = [
+        ('compress text', old_compress, cache.ZLibCompressor.compress,
+            serialized),
+        ('json deserialize memoryview', old_json_deserialize,
+            cache.JSONSerializer.deserialize, raw),
+        ('zlib+json decode', old_zlib_json_decode,
+            cache.ZLibJsonRedisCache._decode, compressed),
+    ]
+
+    print("\n{} MB value".format(size_mb))
+    print("{:<30} {:>16} {:>16}".format('', 'before (bytes)', 'after (bytes)'))
+    for name, old, new, arg in cases:
+        old_peak = measure(old, arg)
+        new_peak = measure(new, arg)
+        print("{:<30} {:>16,} {:>16,}".format(name, old_peak, new_peak))
+
+
+if __name__ == '__main__':
+    sizes = [float(arg) for arg in sys.argv[1:]] or [1, 10]
+    for size in sizes:
+        run(size)
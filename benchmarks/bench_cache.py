@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+"""Benchmark the main cache operations, against an in-memory redis stand-in
+(see fake_redis.py), so it runs anywhere without a redis server.
+
+Scenarios:
+    batching - get/set one key at a time versus get_many/set_many, with a
+        simulated network round trip per command.
+    codec - _encode and _decode for each cache class and payload size.
+    context - LocalContextAndRemoteTTLCache gets at different hit ratios
+        of the local tier.
+
+Results are printed as a table, and can be written as JSON to compare
+across commits with compare.py:
+
+    python benchmarks/bench_cache.py --json before.json
+    git checkout my-branch
+    python benchmarks/bench_cache.py --json after.json
+    python benchmarks/compare.py before.json after.json
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from condecache import cache
+from fake_redis import FakeRedis
+
+
+CACHE_CLASSES = [
+    cache.ZLibJsonRedisCache, cache.ZLibPickleRedisCache,
+    cache.PickleRedisCache, cache.Pickle5RedisCache, cache.NumpyRedisCache,
+]
+
+PAYLOAD_SIZES = [100, 10 * 1024, 1024 * 1024]
+
+
+def make_value(size):
+    """a JSON-like value which serializes to roughly `size` bytes."""
+    row = {'id': 0, 'title': 'An article title', 'tags': ['a', 'b'],
+           'body': 'lorem ipsum dolor sit amet ' * 3}
+    rows = max(1, size // len(json.dumps(row)))
+    return [dict(row, id=i) for i in range(rows)]
+
+
+def measure(func, min_time):
+    """returns: dict
+        the seconds per call of `func`, the best of 3 runs of at least
+        `min_time` seconds each.
+    """
+    timer = timeit.Timer(func)
+    # Find how many calls take at least min_time.
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time / 10:
+            break
+        number *= 10
+    number = max(1, int(number * min_time / elapsed))
+    runs = [timer.timeit(number) / number for _ in range(3)]
+    return {
+        'seconds': min(runs),
+        'mean_seconds': sum(runs) / len(runs),
+        'calls': number * len(runs),
+    }
+
+
+def bench_batching(min_time, latency, bandwidth):
+    results = []
+    conn = FakeRedis(latency=latency, bandwidth=bandwidth)
+    inst = cache.ZLibJsonRedisCache(conn)
+    value = make_value(1024)
+    for batch in (1, 10, 100):
+        keys = ['key:{}'.format(i) for i in range(batch)]
+        inst.set_many({key: value for key in keys}, 60)
+
+        def get_each():
+            for key in keys:
+                inst.get(key)
+
+        def set_each():
+            for key in keys:
+                inst.set(key, value, 60)
+
+        cases = [
+            ('get', get_each),
+            ('get_many', lambda: inst.get_many(keys)),
+            ('set', set_each),
+            ('set_many', lambda: inst.set_many(
+                {key: value for key in keys}, 60)),
+        ]
+        for op, func in cases:
+            result = measure(func, min_time)
+            result.update(name='batching.{}'.format(op),
+                          params={'keys': batch, 'latency': latency,
+                                  'bandwidth': bandwidth})
+            results.append(result)
+    return results
+
+
+def bench_codec(min_time):
+    results = []
+    for size in PAYLOAD_SIZES:
+        value = make_value(size)
+        for cls in CACHE_CLASSES:
+            try:
+                encoded = cls._encode(value)
+            except Exception as e: # e.g. pickle protocol 5 on old pythons.
+                print("skipping {}: {}".format(cls.__name__, e),
+                      file=sys.stderr)
+                continue
+
+            for op, func in [
+                    ('encode', lambda: cls._encode(value)),
+                    ('decode', lambda: cls._decode(encoded))]:
+                result = measure(func, min_time)
+                result.update(
+                    name='codec.{}'.format(op),
+                    params={'cache': cls.__name__, 'size': size,
+                            'encoded_size': len(encoded)})
+                results.append(result)
+    return results
+
+
+def bench_context(min_time, latency, bandwidth):
+    results = []
+    conn = FakeRedis(latency=latency, bandwidth=bandwidth)
+    remote = cache.ZLibJsonRedisCache(conn)
+    keys = ['key:{}'.format(i) for i in range(1000)]
+    remote.set_many({key: make_value(1024) for key in keys}, 60)
+    rng = random.Random(0)
+
+    for hit_ratio in (0.0, 0.5, 0.9, 0.99):
+        local = cache.LocalContextAndRemoteTTLCache(remote)
+        local_keys = keys[:int(len(keys) * hit_ratio)]
+        remote_keys = keys[len(local_keys):]
+        # The sequence of keys to get, cycled through.
+        sequence = [
+            rng.choice(local_keys) if rng.random() < hit_ratio
+            else rng.choice(remote_keys)
+            for _ in range(1000)
+        ]
+        state = {'i': 0}
+
+        remote_keys_set = set(remote_keys)
+
+        def get():
+            i = state['i'] = (state['i'] + 1) % len(sequence)
+            key = sequence[i]
+            local.get(key)
+            if key in remote_keys_set:
+                # Forget it, so remote keys stay misses in the local tier.
+                local._cache.pop(key, None)
+
+        with local:
+            local.get_many(local_keys)
+            result = measure(get, min_time)
+        result.update(name='context.get',
+                      params={'hit_ratio': hit_ratio, 'latency': latency,
+                              'bandwidth': bandwidth})
+        results.append(result)
+    return results
+
+
+SCENARIOS = {
+    'batching': lambda args: bench_batching(
+        args.min_time, args.latency, args.bandwidth),
+    'codec': lambda args: bench_codec(args.min_time),
+    'context': lambda args: bench_context(
+        args.min_time, args.latency, args.bandwidth),
+}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.STDOUT).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def result_key(result):
+    """a string identifying a benchmark, to compare it between runs."""
+    return '{} {}'.format(result['name'], ' '.join(
+        '{}={}'.format(name, value)
+        for name, value in sorted(result['params'].items())
+        if name != 'encoded_size'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('scenarios', nargs='*', help="scenarios to run, "
+                        "from {}; all by default".format(sorted(SCENARIOS)))
+    parser.add_argument('--json', help="file to write results to")
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="seconds to run each benchmark for (x3)")
+    parser.add_argument('--latency', type=float, default=0.0002,
+                        help="simulated seconds per redis round trip")
+    parser.add_argument('--bandwidth', type=float, default=None,
+                        help="simulated redis bytes per second, unlimited "
+                        "by default")
+    args = parser.parse_args()
+    for scenario in args.scenarios:
+        if scenario not in SCENARIOS:
+            parser.error("unknown scenario {!r}".format(scenario))
+
+    results = []
+    for scenario in args.scenarios or sorted(SCENARIOS):
+        for result in SCENARIOS[scenario](args):
+            print("{:<70} {:>12.1f} us".format(
+                result_key(result), result['seconds'] * 1e6))
+            results.append(result)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'time': time.time(),
+                'commit': git_commit(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
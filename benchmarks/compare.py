@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""Compare two sets of results written by bench_cache.py --json.
+
+    python benchmarks/compare.py before.json after.json [threshold_percent]
+
+Prints the change in time per call of each benchmark in both, and exits
+with status 1 if any got slower by more than the threshold (10% by
+default).
+"""
+from __future__ import print_function
+
+import json
+import sys
+
+from bench_cache import result_key
+
+
+def load(path):
+    with open(path) as f:
+        data = json.load(f)
+    return data, {result_key(result): result for result in data['results']}
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit(__doc__)
+    threshold = float(sys.argv[3]) if len(sys.argv) == 4 else 10.0
+
+    before, before_results = load(sys.argv[1])
+    after, after_results = load(sys.argv[2])
+    print("before: {} (python {})".format(before['commit'], before['python']))
+    print("after:  {} (python {})".format(after['commit'], after['python']))
+    print("{:<70} {:>12} {:>12} {:>8}".format(
+        '', 'before us', 'after us', 'change'))
+
+    regressions = 0
+    for key in sorted(set(before_results) & set(after_results)):
+        old = before_results[key]['seconds']
+        new = after_results[key]['seconds']
+        change = (new - old) / old * 100 if old else 0.0
+        flag = ''
+        if change > threshold:
+            regressions += 1
+            flag = ' SLOWER'
+        elif change < -threshold:
+            flag = ' faster'
+        print("{:<70} {:>12.1f} {:>12.1f} {:>+7.1f}%{}".format(
+            key, old * 1e6, new * 1e6, change, flag))
+
+    for key in sorted(set(before_results) ^ set(after_results)):
+        print("{:<70} only in {}".format(
+            key, 'before' if key in before_results else 'after'))
+
+    if regressions:
+        print("\n{} benchmarks slower by more than {}%".format(
+            regressions, threshold))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""An in-memory stand-in for a redis-py connection, for benchmarking without
+a redis server.
+
+Only the commands used by BaseRedisCache are implemented. Each command (or
+pipeline) sleeps for `latency` seconds, plus the time to transfer the bytes
+sent and received at `bandwidth` bytes per second, to simulate the network.
+Both default to 0, so that only the cost of the cache itself is measured.
+
+    from fake_redis import FakeRedis
+    conn = FakeRedis(latency=0.0005, bandwidth=100 * 1024 * 1024)
+    cache = ZLibJsonRedisCache(conn)
+"""
+import threading
+import time
+
+
+class FakeRedis(object):
+    def __init__(self, latency=0.0, bandwidth=None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.commands = 0
+        self.round_trips = 0
+        self._data = {} # key -> (value, expiry time or None)
+        self._lock = threading.Lock()
+
+    #
+    # Commands
+    #
+    def get(self, key):
+        return self._call([('get', (key,), {})])[0]
+
+    def mget(self, keys):
+        return self._call([('mget', (keys,), {})])[0]
+
+    def set(self, key, value, ex=None, nx=False):
+        return self._call([('set', (key, value), {'ex': ex, 'nx': nx})])[0]
+
+    def delete(self, *keys):
+        return self._call([('delete', keys, {})])[0]
+
+    def expire(self, key, seconds):
+        return self._call([('expire', (key, seconds), {})])[0]
+
+    def incr(self, key, amount=1):
+        return self._call([('incrby', (key, amount), {})])[0]
+
+    def incrby(self, key, amount):
+        return self._call([('incrby', (key, amount), {})])[0]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def flushall(self):
+        with self._lock:
+            self._data.clear()
+
+    #
+    # Implementation
+    #
+    def _call(self, commands):
+        sent = 0
+        for _, args, _ in commands:
+            sent += _size(args)
+
+        with self._lock:
+            results = [
+                getattr(self, '_do_' + name)(*args, **kwargs)
+                for name, args, kwargs in commands
+            ]
+            self.commands += len(commands)
+            self.round_trips += 1
+
+        delay = self.latency
+        if self.bandwidth:
+            delay += float(sent + _size(results)) / self.bandwidth
+        if delay:
+            time.sleep(delay)
+        return results
+
+    def _lookup(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expiry = item
+        if expiry is not None and expiry <= time.time():
+            del self._data[key]
+            return None
+        return value
+
+    def _do_get(self, key):
+        return self._lookup(key)
+
+    def _do_mget(self, keys):
+        return [self._lookup(key) for key in keys]
+
+    def _do_set(self, key, value, ex=None, nx=False):
+        if nx and self._lookup(key) is not None:
+            return None
+        if not isinstance(value, bytes):
+            if isinstance(value, (bytearray, memoryview)):
+                value = bytes(value)
+            else:
+                value = str(value).encode()
+        expiry = time.time() + ex if ex else None
+        self._data[key] = (value, expiry)
+        return True
+
+    def _do_delete(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._lookup(key) is not None:
+                del self._data[key]
+                removed += 1
+        return removed
+
+    def _do_expire(self, key, seconds):
+        value = self._lookup(key)
+        if value is None:
+            return False
+        self._data[key] = (value, time.time() + seconds)
+        return True
+
+    def _do_incrby(self, key, amount):
+        value = self._lookup(key)
+        value = int(value or 0) + amount
+        expiry = self._data[key][1] if key in self._data else None
+        self._data[key] = (str(value).encode(), expiry)
+        return value
+
+
+class FakePipeline(object):
+    """Queues commands, and runs them in a single round trip on execute."""
+    def __init__(self, conn):
+        self._conn = conn
+        self._commands = []
+
+    def __getattr__(self, name):
+        if name == 'incr':
+            name = 'incrby'
+        if not hasattr(self._conn, '_do_' + name):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        commands, self._commands = self._commands, []
+        return self._conn._call(commands)
+
+
+def _size(value):
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(_size(item) for item in value)
+    return 8
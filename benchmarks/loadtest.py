@@ -0,0 +1,364 @@
+#!/usr/bin/env python
+"""Load test a cache, or a tiered composition of caches, with a realistic
+workload, to size deployments before shipping them.
+
+Each thread runs "requests" of --request-ops operations. Reads use
+read-through: a miss loads the value and sets it. Keys are chosen from
+--keys keys with one of these popularity distributions:
+
+    uniform - every key equally likely.
+    zipf - key i is chosen with probability proportional to 1 / i^s (see
+        --zipf-s), so a few keys are very hot. Hot keys are adjacent.
+    scrambled-zipf - zipf, with the hot keys spread over the key space.
+    hotspot - --hot-fraction of the keys get --hot-probability of accesses.
+    scan - zipf, interrupted by scans through --scan-length consecutive
+        keys, started with --scan-probability per operation.
+
+The caches are:
+
+    context - a LocalContextCache, entered for each request.
+    redis - a ZLibJsonRedisCache on the in-memory redis stand-in (see
+        fake_redis.py), with simulated --latency and --bandwidth.
+    tiered - a LocalContextAndRemoteTTLCache over `redis`, entered for each
+        request.
+
+Reports throughput, latency percentiles and the hit ratio of each tier:
+
+    python benchmarks/loadtest.py --cache tiered --distribution zipf \\
+        --threads 8 --seconds 10 --read-ratio 0.95 --value-size 100-5000
+"""
+from __future__ import print_function
+
+import argparse
+import bisect
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from condecache import cache
+from fake_redis import FakeRedis
+
+
+# perf_counter is python 3.3+
+_clock = getattr(time, 'perf_counter', time.time)
+
+
+#
+# Key popularity distributions. Each is a function taking a random.Random
+# and returning a function which returns the next key index.
+#
+class Zipf(object):
+    """Zipf distribution over n keys, with exponent s, by inverting the
+        CDF. Rank 0 is the most popular.
+    """
+    def __init__(self, n, s):
+        total = 0.0
+        self._cdf = []
+        for rank in range(1, n + 1):
+            total += 1.0 / rank ** s
+            self._cdf.append(total)
+        self._total = total
+
+    def sample(self, rng):
+        return bisect.bisect_left(self._cdf, rng.random() * self._total)
+
+
+def _scramble(rank, n):
+    # FNV-1a of the rank, to spread hot ranks over the key space. Collisions
+    # are fine, they just slightly change the distribution.
+    h = 0xcbf29ce484222325
+    for byte in str(rank).encode():
+        h = ((h ^ byte) * 0x100000001b3) & 0xffffffffffffffff
+    return h % n
+
+
+def make_distribution(args):
+    n = args.keys
+    name = args.distribution
+
+    if name == 'uniform':
+        return lambda rng: lambda: rng.randrange(n)
+
+    zipf = Zipf(n, args.zipf_s)
+    if name == 'zipf':
+        return lambda rng: lambda: zipf.sample(rng)
+
+    if name == 'scrambled-zipf':
+        return lambda rng: lambda: _scramble(zipf.sample(rng), n)
+
+    if name == 'hotspot':
+        hot = max(1, int(n * args.hot_fraction))
+
+        def hotspot(rng):
+            def next_key():
+                if rng.random() < args.hot_probability:
+                    return rng.randrange(hot)
+                return rng.randrange(hot, n) if hot < n else 0
+            return next_key
+        return hotspot
+
+    if name == 'scan':
+        def scan(rng):
+            state = {'remaining': 0, 'position': 0}
+
+            def next_key():
+                if not state['remaining'] and \
+                        rng.random() < args.scan_probability:
+                    state['remaining'] = args.scan_length
+                    state['position'] = rng.randrange(n)
+                if state['remaining']:
+                    state['remaining'] -= 1
+                    state['position'] = (state['position'] + 1) % n
+                    return state['position']
+                return zipf.sample(rng)
+            return next_key
+        return scan
+
+    raise ValueError("unknown distribution {!r}".format(name))
+
+
+def make_value_size(spec):
+    """'1024' for a fixed size, or '100-5000' for uniformly distributed."""
+    if '-' in spec:
+        low, high = [int(part) for part in spec.split('-', 1)]
+        return lambda rng: rng.randint(low, high)
+    size = int(spec)
+    return lambda rng: size
+
+
+#
+# Caches
+#
+class Setup(object):
+    """The caches under test. `make_cache` is called once per thread, as
+        context caches can't be shared between threads.
+    """
+    def __init__(self, args):
+        self.kind = args.cache
+        self.conn = FakeRedis(latency=args.latency, bandwidth=args.bandwidth)
+        self.remote = cache.ZLibJsonRedisCache(self.conn)
+        self.remote.enable_metrics()
+        self._tiers = []
+
+    def make_cache(self):
+        if self.kind == 'redis':
+            return self.remote, None
+
+        if self.kind == 'context':
+            inst = cache.LocalContextCache()
+        else:
+            inst = cache.LocalContextAndRemoteTTLCache(self.remote)
+        self._tiers.append(inst.enable_metrics())
+        return inst, inst
+
+    def hit_ratios(self):
+        """returns: dict of tier -> hit ratio of gets, or None if no gets."""
+        def counts(metrics):
+            stats = metrics.snapshot()['operations']
+            hits = sum(stats.get(op, {}).get('hits', 0)
+                       for op in ('get', 'get_many'))
+            misses = sum(stats.get(op, {}).get('misses', 0)
+                         for op in ('get', 'get_many'))
+            return hits, misses
+
+        def ratio(hits, lookups):
+            return float(hits) / lookups if lookups else None
+
+        remote_hits, remote_misses = counts(self.remote.metrics)
+        if self.kind == 'redis':
+            return {'remote': ratio(
+                remote_hits, remote_hits + remote_misses)}
+
+        hits = misses = 0
+        for metrics in self._tiers:
+            tier_hits, tier_misses = counts(metrics)
+            hits += tier_hits
+            misses += tier_misses
+        if self.kind == 'context':
+            return {'local': ratio(hits, hits + misses)}
+
+        # Every lookup the local tier couldn't answer went to the remote one.
+        lookups = hits + misses
+        remote_lookups = remote_hits + remote_misses
+        return {
+            'local': ratio(lookups - remote_lookups, lookups),
+            'remote': ratio(remote_hits, remote_lookups),
+            'overall': ratio(hits, lookups),
+        }
+
+
+#
+# Load generation
+#
+def worker(args, setup, next_key_factory, value_size, seed, deadline,
+           latencies, counts):
+    rng = random.Random(seed)
+    next_key = next_key_factory(rng)
+    inst, context = setup.make_cache()
+    ops = 0
+
+    while _clock() < deadline:
+        if context is not None:
+            context.__enter__()
+        try:
+            for _ in range(args.request_ops):
+                keys = ['key:{}'.format(next_key())
+                        for _ in range(args.batch)]
+                start = _clock()
+                if rng.random() < args.read_ratio:
+                    if args.batch == 1:
+                        found = {keys[0]: inst.get(keys[0])}
+                    else:
+                        found = inst.get_many(keys)
+                    missing = {
+                        key: {'key': key, 'body': 'x' * value_size(rng)}
+                        for key, value in found.items() if value is None
+                    }
+                else:
+                    missing = {
+                        key: {'key': key, 'body': 'x' * value_size(rng)}
+                        for key in keys
+                    }
+                if missing:
+                    if len(missing) == 1:
+                        (key, value), = missing.items()
+                        _set(inst, key, value, args.ttl)
+                    else:
+                        _set_many(inst, missing, args.ttl)
+                latencies.append(_clock() - start)
+                ops += 1
+        finally:
+            if context is not None:
+                context.__exit__(None, None, None)
+
+    counts.append(ops)
+
+
+def _set(inst, key, value, ttl):
+    if isinstance(inst, cache.BaseTTLCache):
+        inst.set(key, value, ttl)
+    else:
+        inst.set(key, value)
+
+
+def _set_many(inst, values, ttl):
+    if isinstance(inst, cache.BaseTTLCache):
+        inst.set_many(values, ttl)
+    else:
+        inst.set_many(values)
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(args):
+    setup = Setup(args)
+    next_key_factory = make_distribution(args)
+    value_size = make_value_size(args.value_size)
+
+    # Warm the remote cache, so it isn't only measuring the first misses.
+    if args.warm and args.cache != 'context':
+        warm_rng = random.Random(args.seed)
+        setup.remote.set_many({
+            'key:{}'.format(i): {
+                'key': 'key:{}'.format(i), 'body': 'x' * value_size(warm_rng)}
+            for i in range(args.keys)
+        }, args.ttl)
+        setup.remote.metrics.reset()
+
+    deadline = _clock() + args.seconds
+    latencies = [[] for _ in range(args.threads)]
+    counts = []
+    threads = [
+        threading.Thread(target=worker, args=(
+            args, setup, next_key_factory, value_size, args.seed + i,
+            deadline, latencies[i], counts))
+        for i in range(args.threads)
+    ]
+    start = _clock()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = _clock() - start
+
+    ordered = sorted(latency for each in latencies for latency in each)
+    return {
+        'config': vars(args),
+        'operations': sum(counts),
+        'seconds': elapsed,
+        'throughput': sum(counts) / elapsed,
+        'latency': {
+            name: percentile(ordered, fraction)
+            for name, fraction in [
+                ('p50', 0.5), ('p99', 0.99), ('p999', 0.999)]
+        },
+        'hit_ratio': setup.hit_ratios(),
+        'redis_round_trips': setup.conn.round_trips,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.split('\n')[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('\n', 2)[2])
+    parser.add_argument('--cache', default='tiered',
+                        choices=['context', 'redis', 'tiered'])
+    parser.add_argument('--distribution', default='zipf', choices=[
+        'uniform', 'zipf', 'scrambled-zipf', 'hotspot', 'scan'])
+    parser.add_argument('--keys', type=int, default=100000)
+    parser.add_argument('--zipf-s', type=float, default=0.99)
+    parser.add_argument('--hot-fraction', type=float, default=0.1)
+    parser.add_argument('--hot-probability', type=float, default=0.9)
+    parser.add_argument('--scan-probability', type=float, default=0.001)
+    parser.add_argument('--scan-length', type=int, default=1000)
+    parser.add_argument('--read-ratio', type=float, default=0.95)
+    parser.add_argument('--batch', type=int, default=1,
+                        help="keys per operation; over 1 uses get_many")
+    parser.add_argument('--request-ops', type=int, default=20,
+                        help="operations per entry of the context caches")
+    parser.add_argument('--value-size', default='1024',
+                        help="bytes, or a range like 100-5000")
+    parser.add_argument('--ttl', type=float, default=300)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--latency', type=float, default=0.0002,
+                        help="simulated seconds per redis round trip")
+    parser.add_argument('--bandwidth', type=float, default=None,
+                        help="simulated redis bytes per second")
+    parser.add_argument('--no-warm', dest='warm', action='store_false',
+                        help="don't fill the remote cache first")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="file to write the results to")
+    args = parser.parse_args()
+
+    result = run(args)
+
+    print("{operations} operations in {seconds:.1f}s: "
+          "{throughput:.0f} ops/s".format(**result))
+    print("latency: " + ", ".join(
+        "{} {:.3f}ms".format(name, result['latency'][name] * 1e3)
+        for name in ('p50', 'p99', 'p999')
+        if result['latency'][name] is not None))
+    print("hit ratio: " + ", ".join(
+        "{} {}".format(tier, '{:.1%}'.format(ratio)
+                       if ratio is not None else '-')
+        for tier, ratio in sorted(result['hit_ratio'].items())))
+    print("redis round trips: {}".format(result['redis_round_trips']))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
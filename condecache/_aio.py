@@ -0,0 +1,122 @@
+# asyncio support. This module uses python 3.5+ syntax, so must only be
+# imported lazily, or with a fallback for SyntaxError.
+import asyncio
+import functools
+
+from .cache import _DEFAULT
+
+
+# get_running_loop is python 3.7+
+_get_running_loop = getattr(
+        asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+
+def cached_coroutine(func, cache, make_key, store, single_flight):
+    """async version of decorators._cached_function"""
+    flights = {} if single_flight else None
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        key = make_key(args, kwargs)
+        value = cache.get(key, _DEFAULT)
+        if value is not _DEFAULT:
+            return value
+
+        if flights is None:
+            value = await func(*args, **kwargs)
+            store(key, value)
+            return value
+
+        loop = _get_running_loop()
+        flight = flights.get((loop, key))
+        while flight is not None:
+            try:
+                # shield, so this caller being cancelled doesn't cancel the
+                # others.
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                # Only take over if it was the caller calling func which
+                # was cancelled, rather than this one.
+                if not flight.cancelled():
+                    raise
+            flight = flights.get((loop, key))
+
+        flight = flights[loop, key] = loop.create_future()
+        try:
+            value = await func(*args, **kwargs)
+            store(key, value)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            # Mark it as retrieved, in case nothing else was waiting.
+            flight.exception()
+            raise
+        else:
+            flight.set_result(value)
+        finally:
+            flights.pop((loop, key), None)
+        return value
+
+    return wrapper
+
+
+class AsyncCoalescingCache(object):
+    """Wraps a cache so that `get` calls made by asyncio tasks in the same
+        loop iteration (or within `window_seconds`) are fetched together,
+        with a single `get_many`.
+
+        `get` is a coroutine here. Keys requested by more than one task are
+        only fetched once. All other methods and attributes are those of the
+        wrapped cache.
+    """
+    def __init__(self, cache, window_seconds=0.0):
+        self._cache = cache
+        self._window = window_seconds
+        self._batches = {}
+
+    async def get(self, key, default=None):
+        """as BaseCache.get"""
+        if not isinstance(key, str):
+            raise TypeError("key must be a string")
+
+        loop = _get_running_loop()
+        batch = self._batches.get(loop)
+        if batch is None:
+            batch = self._batches[loop] = {}
+            if self._window:
+                loop.call_later(self._window, self._fetch, loop)
+            else:
+                loop.call_soon(self._fetch, loop)
+
+        future = batch.get(key)
+        if future is None:
+            future = batch[key] = loop.create_future()
+
+        # shield, so one caller being cancelled doesn't cancel the others.
+        value = await asyncio.shield(future)
+        return default if value is _DEFAULT else value
+
+    def __getattr__(self, name):
+        return getattr(self._cache, name)
+
+    def _fetch(self, loop):
+        batch = self._batches.pop(loop)
+        try:
+            values = self._cache.get_many(list(batch), _DEFAULT)
+        except Exception as e:
+            for future in batch.values():
+                future.set_exception(e)
+                # Mark it as retrieved, in case every waiter was cancelled.
+                future.exception()
+            return
+
+        for key, future in batch.items():
+            future.set_result(values[key])
+
+
+async def wait_event(event):
+    """wait for a threading.Event without blocking the event loop."""
+    if not event.is_set():
+        await _get_running_loop().run_in_executor(None, event.wait)
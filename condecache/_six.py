@@ -60,8 +60,46 @@ except ImportError:
 #
 if sys.version_info[0] == 2:
     string_types = basestring,
+    integer_types = (int, long)
 else:
     string_types = str,
+    integer_types = int,
+
+
+if sys.version_info[0] == 2:
+    def text_from_buffer(data, encoding='utf-8'):
+        """decode any bytes-like object to text."""
+        if isinstance(data, unicode):
+            return data
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return data.decode(encoding)
+else:
+    def text_from_buffer(data, encoding='utf-8'):
+        """decode any bytes-like object to text, without first copying
+            bytearrays or memoryviews to bytes.
+        """
+        if isinstance(data, str):
+            return data
+        if isinstance(data, (memoryview, bytearray)):
+            return str(data, encoding)
+        return data.decode(encoding)
+
+
+if sys.version_info[0] == 2:
+    def byte_buffer(data):
+        """bytes for any bytes-like object. py2 memoryviews have no nbytes
+            and can't be joined, so anything but bytes is copied.
+        """
+        if isinstance(data, bytes):
+            return data
+        return memoryview(data).tobytes()
+else:
+    def byte_buffer(data):
+        """a flat byte view of any bytes-like object, without copying it, so
+            len() is its size in bytes.
+        """
+        return memoryview(data).cast('B')
 
 def add_metaclass(metaclass):
     """Class decorator for creating a class with a metaclass."""
@@ -1,14 +1,32 @@
 from abc import ABCMeta, abstractmethod
+import copy
+import functools
+import hashlib
 import json
 import logging
+import multiprocessing
+import re
+import struct
+import threading
+import time
 import zlib
 import pickle
 
-from ._six import add_metaclass, string_types
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError: # py2 without the futures backport.
+    ThreadPoolExecutor = None
+
+from ._six import (
+    add_metaclass, integer_types, string_types, text_from_buffer,
+)
 from .errors import (
     CacheError, RemoteCacheCommError, CacheDecodeError,
 )
-from .data_tools import JSONEncoder, json_object_hook
+from .data_tools import (
+    JSONEncoder, json_object_hook, iter_json_array, pack_frame, unpack_frame,
+    frame_magic, ArrayJSONEncoder, array_object_hook,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -20,16 +38,392 @@ class _DEFAULT(object): pass
 class _DORAISE(object): pass
 
 
+class _Absent(object):
+    """type of ABSENT."""
+    def __repr__(self):
+        return 'ABSENT'
+
+    def __reduce__(self):
+        return 'ABSENT'
+
+    def __bool__(self):
+        return False
+    __nonzero__ = __bool__
+
+
+# Stored as a value to record that a key is known not to exist, e.g. that a
+# database lookup found nothing. get returns it rather than the default, so
+# callers can tell "known absent" apart from "unknown". TTL caches store it
+# for at most `negative_ttl_seconds`.
+ABSENT = _Absent()
+
+# How ABSENT is stored by caches which encode their values.
+_ABSENT_MARKER = frame_magic(b'N')
+
+
+def _is_absent_marker(encoded):
+    return isinstance(encoded, (bytes, bytearray, memoryview)) and \
+        len(encoded) == len(_ABSENT_MARKER) and encoded == _ABSENT_MARKER
+
+
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Text larger than this (in characters) is encoded and compressed piecewise,
+# rather than encoded to a second full size copy first.
+_COMPRESS_TEXT_CHUNK_SIZE = 256 * 1024
+
+
+# Thread pool shared by every cache for parallel decoding in get_many.
+# Created lazily, the first time it is needed.
+_decode_pool = None
+_decode_pool_workers = None
+_decode_pool_lock = threading.Lock()
+
+def _get_decode_pool():
+    global _decode_pool, _decode_pool_workers
+    if _decode_pool is None and ThreadPoolExecutor is not None:
+        with _decode_pool_lock:
+            if _decode_pool is None:
+                try:
+                    workers = max(2, multiprocessing.cpu_count())
+                except NotImplementedError:
+                    workers = 2
+                _decode_pool_workers = workers
+                _decode_pool = ThreadPoolExecutor(max_workers=workers)
+    return _decode_pool
+
+
+_SIZED_TYPES = (bytes, bytearray) + string_types
+
+
+def _payload_size(value):
+    """Size in bytes of an encoded value, or 0 if it can't be measured."""
+    if isinstance(value, _SIZED_TYPES):
+        return len(value)
+    if isinstance(value, memoryview):
+        return value.nbytes
+    return 0
+
+
 __ALL__ = (
+    'ABSENT', 'MIXED_PREFIX', 'ERROR_SUMMARY_SECONDS',
+    'CacheListener', 'Operation', 'RemoteCall',
     'BaseCache', 'BaseNoTTLCache', 'BaseTTLCache',
     'ZLibCompressor',
-    'JSONSerializer', 'PickleSerializer',
+    'JSONSerializer', 'PickleSerializer', 'Pickle5Serializer',
+    'NumpySerializer', 'RecordSerializer',
     'BaseRedisCache', 'BaseContextCache',
     'LocalContextCache', 'LocalContextAndRemoteTTLCache',
     'ZLibJsonRedisCache', 'ZLibPickleRedisCache', 'PickleRedisCache',
+    'Pickle5RedisCache', 'NumpyRedisCache',
 )
 
 
+#
+# Instrumentation
+#
+# Public methods only create an Operation when the cache has listeners, and
+# do their work in a `with self._operation(...)` block, which records, logs
+# and suppresses CacheErrors. Otherwise they take the same inline path as
+# without instrumentation, so that it costs next to nothing when unused.
+
+# perf_counter is python 3.3+
+_clock = getattr(time, 'perf_counter', time.time)
+
+# The Operation in progress in each thread, so that nested operations and
+# remote calls know what they are part of, and _encode and _decode can
+# attribute their cost to its keys.
+_current = threading.local()
+
+# The prefix of an operation on keys with different prefixes, e.g. a
+# get_many of 'article:1' and 'user:1'.
+MIXED_PREFIX = '*'
+
+# The number of caches with codec stats enabled. _encode and _decode only
+# look for the current Operation while it isn't 0.
+_codec_stats_enabled = 0
+_codec_stats_lock = threading.Lock()
+
+
+class CacheListener(object):
+    """Base class for objects which observe a cache's operations, added with
+        `BaseCache.add_listener`. Override the methods of interest.
+    """
+    def on_start(self, op):
+        """called with an Operation as it starts."""
+
+    def on_operation(self, op):
+        """called with an Operation each time one finishes."""
+
+    def on_remote_call(self, call):
+        """called with a RemoteCall each time one finishes."""
+
+
+def _notify(listeners, method, arg):
+    for listener in listeners:
+        try:
+            getattr(listener, method)(arg)
+        except Exception:
+            # Never let a listener break the cache.
+            logger.exception("Error in cache listener %r", listener)
+
+
+class Operation(object):
+    """A single call to one of a cache's public methods, as given to
+        listeners once it finishes.
+
+        `cache` - the cache.
+        `name` - the method, e.g. 'get_many'.
+        `keys` - the keys it was called with.
+        `time` - the time.time() it started.
+        `duration` - how long it took, in seconds.
+        `hits`, `misses` - the number of keys found and not found.
+        `decode_errors` - the number of values found which couldn't be
+            decoded (and so were returned as the default).
+        `bytes_read`, `bytes_written` - the size of the encoded values read
+            and written, where they can be measured.
+        `error` - the CacheError if the operation failed, otherwise None.
+            These are logged rather than raised by the cache.
+        `parent` - the Operation this is part of, e.g. the
+            LocalContextAndRemoteTTLCache get a remote cache's get is for,
+            or None.
+    """
+    __slots__ = (
+        'cache', 'name', 'keys', 'time', 'duration', 'hits', 'misses',
+        'decode_errors', 'bytes_read', 'bytes_written', 'error', 'parent',
+        '_start', '_message',
+    )
+
+    def __init__(self, cache, name, keys):
+        self.cache = cache
+        self.name = name
+        self.keys = keys
+        self.time = time.time()
+        self.duration = None
+        self.hits = 0
+        self.misses = 0
+        self.decode_errors = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.error = None
+        self._message = "Error during cache " + name
+        self.parent = getattr(_current, 'op', None)
+        _current.op = self
+        _notify(cache._listeners, 'on_start', self)
+        self._start = _clock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, error, traceback):
+        try:
+            if exc_type is not None and issubclass(exc_type, CacheError):
+                self.failed(error)
+                _log_cache_error(self._message, error)
+                return True
+            return False
+        finally:
+            self.finish()
+
+    def finish(self):
+        self.duration = _clock() - self._start
+        _current.op = self.parent
+        _notify(self.cache._listeners, 'on_operation', self)
+
+    def failed(self, error):
+        self.error = error
+
+    def written(self, value):
+        self.bytes_written += _payload_size(value)
+
+    def hit(self, value):
+        self.hits += 1
+        self.bytes_read += _payload_size(value)
+
+    def missed(self, count=1):
+        self.misses += count
+
+    def prefix(self, depth=1, separator=':'):
+        """returns: str
+            the first `depth` parts of the keys, e.g. 'article' for
+            'article:123:body', or MIXED_PREFIX if they differ between keys
+            or there are no keys.
+        """
+        prefixes = set()
+        for key in self.keys:
+            parts = key.split(separator, depth)
+            prefixes.add(separator.join(parts[:min(depth, len(parts) - 1)]))
+            if len(prefixes) > 1:
+                return MIXED_PREFIX
+        return prefixes.pop() if prefixes else MIXED_PREFIX
+
+    def decode(self, decode, value, default):
+        if value is _DEFAULT:
+            self.misses += 1
+            return default
+
+        self.hit(value)
+        try:
+            return decode(value)
+        except CacheDecodeError:
+            self.decode_errors += 1
+            return default
+
+    def decode_many(self, decode_many, values, default):
+        misses = 0
+        for value in values:
+            if value is _DEFAULT:
+                misses += 1
+            else:
+                self.hit(value)
+        self.misses += misses
+
+        # Decode with a sentinel default, to count the values which failed.
+        decoded = decode_many(values, _DECODE_FAILED)
+        # By identity, as values may not be comparable, e.g. numpy arrays.
+        failed = sum(1 for value in decoded if value is _DECODE_FAILED)
+        self.decode_errors += failed - misses
+        return [
+            default if value is _DECODE_FAILED else value
+            for value in decoded
+        ]
+
+
+class _DECODE_FAILED(object): pass
+
+
+class RemoteCall(object):
+    """A single call to a remote cache's server, e.g. a redis GET or a
+        pipeline, as given to listeners once it finishes.
+
+        `cache` - the cache.
+        `name` - the command or pipeline, e.g. 'mget' or 'set_many'.
+        `op` - the Operation it was made for, or None.
+        `time`, `duration` - as Operation.
+        `error` - the exception raised by the client, or None.
+    """
+    __slots__ = ('cache', 'name', 'op', 'time', 'duration', 'error', '_start')
+
+    def __init__(self, cache, name):
+        self.cache = cache
+        self.name = name
+        self.op = getattr(_current, 'op', None)
+        self.time = time.time()
+        self.duration = None
+        self.error = None
+        self._start = _clock()
+
+    def finish(self):
+        self.duration = _clock() - self._start
+        _notify(self.cache._listeners, 'on_remote_call', self)
+
+
+def _codec_stats_op():
+    """the current Operation, if its cache has codec stats enabled."""
+    op = getattr(_current, 'op', None)
+    if op is not None and op.cache._codec_stats is not None:
+        return op
+    return None
+
+
+#
+# Error logging
+#
+# Public methods log CacheErrors rather than raising them. While a backend
+# is down every call fails, so only the first error of each class in each
+# operation is logged, followed by a summary of the rest, see
+# ERROR_SUMMARY_SECONDS.
+
+# The interval for summarising repeated errors. After an error is logged,
+# the errors of the same class in the same operation are only counted,
+# and every ERROR_SUMMARY_SECONDS while there are any a summary is logged,
+# as "<message>: <last error> (and <count> more <class> in the last <n>s)".
+# So an outage is logged at most once per interval, and the count of its
+# last errors is still logged, about an interval after they stop.
+ERROR_SUMMARY_SECONDS = 60
+
+# (message, error class) -> [errors since last logged, time last logged,
+#                            the last of those errors]
+_error_counts = {}
+_error_counts_lock = threading.Lock()
+# The threading.Timer which will log the summaries, if any are due.
+_error_flush_timer = None
+
+
+def _log_cache_error(message, error):
+    """log `error`, as "<message>: <error>", unless an error of the same
+        class was logged with the same message in the last
+        ERROR_SUMMARY_SECONDS, in which case it is counted for a summary.
+    """
+    key = (message, error.__class__)
+    now = _clock()
+    with _error_counts_lock:
+        state = _error_counts.get(key)
+        if state is None or (
+                not state[0] and now - state[1] >= ERROR_SUMMARY_SECONDS):
+            # The first, or the first for a while.
+            _error_counts[key] = [0, now, None]
+            suppressed = None
+        elif now - state[1] >= ERROR_SUMMARY_SECONDS:
+            suppressed, elapsed = state[0], now - state[1]
+            state[:] = [0, now, None]
+        else:
+            state[0] += 1
+            state[2] = error
+            if _error_flush_timer is None \
+                    or not _error_flush_timer.is_alive():
+                _schedule_error_flush(ERROR_SUMMARY_SECONDS - (now - state[1]))
+            return
+
+    if suppressed is None:
+        logger.error("%s: %s", message, error)
+    else:
+        _log_error_summary(message, error, suppressed, elapsed)
+
+
+def _log_error_summary(message, error, count, elapsed):
+    logger.error(
+        "%s: %s (and %d more %s in the last %.0fs)",
+        message, error, count, error.__class__.__name__, elapsed)
+
+
+def _schedule_error_flush(delay):
+    """call _flush_error_counts in `delay` seconds. _error_counts_lock must
+        be held.
+    """
+    global _error_flush_timer
+    _error_flush_timer = threading.Timer(delay, _flush_error_counts)
+    _error_flush_timer.daemon = True
+    _error_flush_timer.start()
+
+
+def _flush_error_counts():
+    """log the summaries which are due, for errors which stopped before
+        another was logged, and schedule the next.
+    """
+    global _error_flush_timer
+    now = _clock()
+    summaries = []
+    next_due = None
+    with _error_counts_lock:
+        _error_flush_timer = None
+        for (message, _), state in _error_counts.items():
+            if not state[0]:
+                continue
+            elapsed = now - state[1]
+            if elapsed >= ERROR_SUMMARY_SECONDS:
+                summaries.append((message, state[2], state[0], elapsed))
+                state[:] = [0, now, None]
+            else:
+                due = ERROR_SUMMARY_SECONDS - elapsed
+                next_due = due if next_due is None else min(next_due, due)
+        if next_due is not None:
+            _schedule_error_flush(next_due)
+
+    for summary in summaries:
+        _log_error_summary(*summary)
+
+
 #
 # Base interface definitions
 #
@@ -39,6 +433,23 @@ class BaseCache(object):
     serializer = None
     compressor = None
 
+    # Opt-in parallel decoding for get_many. When enabled, and a batch has
+    # at least `parallel_decode_min_items` values and at least
+    # `parallel_decode_min_bytes` of encoded data, the values are decoded on
+    # a thread pool shared by all caches, in a contiguous chunk per worker.
+    # zlib releases the GIL while decompressing, so large batches can make
+    # use of multiple cores. Handing small values to the pool costs more
+    # than decoding them, however many there are.
+    parallel_decode = False
+    parallel_decode_min_items = 4
+    parallel_decode_min_bytes = 512 * 1024
+
+    # CacheListeners, see add_listener. A tuple which is replaced rather than
+    # changed, so operations in other threads can iterate it safely.
+    _listeners = ()
+    _metrics = None
+    _codec_stats = None
+
     def get(self, key, default=None):
         """Get a single item in the cache.
 
@@ -51,15 +462,19 @@ class BaseCache(object):
         if not isinstance(key, string_types):
             raise TypeError("key must be a string")
 
-        try:
-            val = self._get(key, _DEFAULT)
-        except CacheError as e:
-            logger.error("Error during cache get: %s", e)
-            return default
-
-        if val is not _DEFAULT:
+        if not self._listeners:
+            try:
+                val = self._get(key, _DEFAULT)
+            except CacheError as e:
+                _log_cache_error("Error during cache get", e)
+                return default
+            if val is _DEFAULT:
+                return default
             return self._decode(val, default)
 
+        with self._operation('get', (key,)) as op:
+            val = self._get(key, _DEFAULT)
+            return op.decode(self._decode, val, default)
         return default
 
     def get_many(self, keys, default=None):
@@ -78,17 +493,67 @@ class BaseCache(object):
         if not keys:
             return {}
 
-        try:
+        if not self._listeners:
+            try:
+                values = self._get_many(keys, _DEFAULT)
+            except CacheError as e:
+                _log_cache_error("Error during cache get_many", e)
+                return {key: default for key in keys}
+            return dict(zip(keys, self._decode_many(values, default)))
+
+        with self._operation('get_many', keys) as op:
             values = self._get_many(keys, _DEFAULT)
-        except CacheError as e:
-            logger.error("Error during cache get_many: %s", e)
-            return {key: default for key in keys}
+            return dict(zip(
+                keys, op.decode_many(self._decode_many, values, default)))
+        return {key: default for key in keys}
 
-        values = {
-            key: self._decode(value, default) if value is not _DEFAULT else default
-            for key, value in zip(keys, values)
-        }
-        return values
+    def get_stream(self, key, default=None, chunk_size=_STREAM_CHUNK_SIZE):
+        """Get a single item in the cache as a stream of bytes, without
+            decompressing the whole value into memory at once.
+
+            `key` - the key for the item in the cache to stream.
+            `default` - the value to return if the item is not found.
+            `chunk_size` - maximum size of each chunk yielded.
+
+            returns: iterator of bytes
+                the serialized (but decompressed) value, `default` if not
+                found, or ABSENT if stored as ABSENT. As the value is decoded
+                lazily, a CacheDecodeError may be raised while iterating.
+
+            The chunks can be written straight to a response, or JSON arrays
+            can be decoded item by item with `JSONSerializer.iter_array`.
+            Only caches with a serializer hold values as bytes, so can
+            stream them.
+        """
+        if not isinstance(key, string_types):
+            raise TypeError("key must be a string")
+
+        if self.serializer is None:
+            raise NotImplementedError(
+                "{} does not support get_stream, as it doesn't serialize "
+                "values".format(self.__class__.__name__))
+
+        val = _DEFAULT
+        if not self._listeners:
+            try:
+                val = self._get(key, _DEFAULT)
+            except CacheError as e:
+                _log_cache_error("Error during cache get_stream", e)
+        else:
+            with self._operation('get_stream', (key,)) as op:
+                val = self._get(key, _DEFAULT)
+                if val is _DEFAULT:
+                    op.missed()
+                else:
+                    op.hit(val)
+
+        if val is _DEFAULT:
+            return default
+
+        if _is_absent_marker(val):
+            return ABSENT
+
+        return self._decode_stream(val, chunk_size)
 
     def remove(self, key):
         """Remove an item from the cache
@@ -102,11 +567,16 @@ class BaseCache(object):
         if not isinstance(key, string_types):
             raise TypeError("key must be a string")
 
-        try:
+        if not self._listeners:
+            try:
+                return self._remove(key)
+            except CacheError as e:
+                _log_cache_error("Error during cache remove", e)
+                return False
+
+        with self._operation('remove', (key,)):
             return self._remove(key)
-        except CacheError as e:
-            logger.error("Error during cache remove: %s", e)
-            return False
+        return False
 
     def remove_many(self, keys):
         """remove multple items from the cache
@@ -122,11 +592,85 @@ class BaseCache(object):
         if not keys:
             return 0
 
-        try:
+        if not self._listeners:
+            try:
+                return self._remove_many(keys)
+            except CacheError as e:
+                _log_cache_error("Error during cache remove_many", e)
+                return 0
+
+        with self._operation('remove_many', keys):
             return self._remove_many(keys)
-        except CacheError as e:
-            logger.error("Error during cache remove_many: %s", e)
-            return 0
+        return 0
+
+    def add_listener(self, listener):
+        """Add a CacheListener, to be told about every operation on this
+            cache from now on.
+        """
+        self._listeners = self._listeners + (listener,)
+
+    def remove_listener(self, listener):
+        """Remove a listener added with `add_listener`."""
+        self._listeners = tuple(
+            other for other in self._listeners if other is not listener)
+
+    @property
+    def metrics(self):
+        """the CacheMetrics collected for this cache, or None if not enabled.
+        """
+        return self._metrics
+
+    def enable_metrics(self):
+        """Start collecting hit, miss, error, latency and size metrics for
+            this cache's operations, if not already.
+
+            returns: CacheMetrics
+        """
+        if self._metrics is None:
+            from .metrics import CacheMetrics
+            self._metrics = CacheMetrics()
+            self.add_listener(self._metrics)
+        return self._metrics
+
+    def disable_metrics(self):
+        """Stop collecting metrics, and discard those collected."""
+        if self._metrics is not None:
+            self.remove_listener(self._metrics)
+            self._metrics = None
+
+    @property
+    def codec_stats(self):
+        """the CodecStats collected for this cache, or None if not enabled.
+        """
+        return self._codec_stats
+
+    def enable_codec_stats(self, prefix_depth=1, separator=':'):
+        """Start recording the size of values before and after encoding,
+            and the time spent serializing and compressing them, by key
+            prefix, if not already. This adds to the cost of every
+            operation, so is for choosing a codec rather than leaving on.
+
+            `prefix_depth`, `separator` - how keys are grouped, as CodecStats.
+
+            returns: CodecStats
+        """
+        global _codec_stats_enabled
+        if self._codec_stats is None:
+            from .codecstats import CodecStats
+            self._codec_stats = CodecStats(prefix_depth, separator)
+            self.add_listener(self._codec_stats)
+            with _codec_stats_lock:
+                _codec_stats_enabled += 1
+        return self._codec_stats
+
+    def disable_codec_stats(self):
+        """Stop recording codec stats, and discard those recorded."""
+        global _codec_stats_enabled
+        if self._codec_stats is not None:
+            self.remove_listener(self._codec_stats)
+            self._codec_stats = None
+            with _codec_stats_lock:
+                _codec_stats_enabled -= 1
 
     def __getitem__(self, key):
         val = self.get(key, _DEFAULT)
@@ -144,6 +688,16 @@ class BaseCache(object):
     # other may or may not be overridden if different behaviour
     # is required.
     #
+    def _operation(self, name, keys, message=None):
+        """returns: an Operation, for the work of a public method while the
+            cache has listeners. As a context manager it logs CacheErrors
+            raised within, as "<message>: <error>", and suppresses them.
+        """
+        op = Operation(self, name, keys)
+        if message is not None:
+            op._message = message
+        return op
+
     @abstractmethod
     def _get(self, key, default):
         """override to return the raw cached value, or `default` if not found.
@@ -173,11 +727,52 @@ class BaseCache(object):
     #
     # Serialization and compression.
     #
+    def _decode_many(self, values, default):
+        """decode a list of raw values, as returned by `_get_many`.
+            Values which weren't found are replaced with `default`.
+        """
+        if self.parallel_decode and self._use_decode_pool(values):
+            pool = _get_decode_pool()
+            if pool is not None:
+                size = -(-len(values) // _decode_pool_workers)
+                chunks = [
+                    values[start:start + size]
+                    for start in range(0, len(values), size)
+                ]
+                decode = functools.partial(
+                        _decode_chunk, self._decode, default=default)
+                decoded = []
+                for chunk in pool.map(decode, chunks):
+                    decoded.extend(chunk)
+                return decoded
+
+        return _decode_chunk(self._decode, values, default)
+
+    def _use_decode_pool(self, values):
+        if len(values) < self.parallel_decode_min_items:
+            return False
+
+        total = 0
+        for value in values:
+            if value is not _DEFAULT:
+                total += _payload_size(value)
+                if total >= self.parallel_decode_min_bytes:
+                    return True
+        return False
+
     @classmethod
     def _encode(cls, raw_data):
         if cls.serializer is None:
             return raw_data
 
+        if raw_data is ABSENT:
+            return _ABSENT_MARKER
+
+        if _codec_stats_enabled:
+            op = _codec_stats_op()
+            if op is not None:
+                return op.cache._codec_stats.encode(cls, raw_data, op)
+
         serialized = cls.serializer.serialize(raw_data)
 
         if cls.compressor is None:
@@ -185,29 +780,63 @@ class BaseCache(object):
 
         return cls.compressor.compress(serialized)
 
+    @classmethod
+    def _decode_stream(cls, encoded, chunk_size=_STREAM_CHUNK_SIZE):
+        if cls.serializer is not None and cls.compressor is not None:
+            decompress_iter = getattr(cls.compressor, 'decompress_iter', None)
+            if decompress_iter is not None:
+                return decompress_iter(encoded, chunk_size)
+            encoded = cls.compressor.decompress(encoded)
+
+        return _iter_chunks(encoded, chunk_size)
+
     @classmethod
     def _decode(cls, encoded, fallback=_DORAISE):
         if cls.serializer is None:
             return encoded
 
-        if cls.compressor is not None:
-            try:
-                decompressed = cls.compressor.decompress(encoded)
-            except CacheDecodeError:
-                if fallback is not _DORAISE:
-                    return fallback
-                raise
-        else:
-            decompressed = encoded
+        if _is_absent_marker(encoded):
+            return ABSENT
+
+        if _codec_stats_enabled:
+            op = _codec_stats_op()
+            if op is not None:
+                return op.cache._codec_stats.decode(cls, encoded, fallback, op)
 
         try:
-            return cls.serializer.deserialize(decompressed)
+            if cls.compressor is None:
+                return cls.serializer.deserialize(encoded)
+            # Don't keep a reference to the decompressed data, so that the
+            # serializer can release it as soon as it's done with it.
+            return cls.serializer.deserialize(
+                    cls.compressor.decompress(encoded))
         except CacheDecodeError:
             if fallback is not _DORAISE:
                 return fallback
             raise
 
 
+def _iter_chunks(data, chunk_size):
+    if isinstance(data, string_types) and not isinstance(data, bytes):
+        data = data.encode()
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size].tobytes()
+
+
+def _decode_chunk(decode, values, default):
+    return [
+        decode(value, default) if value is not _DEFAULT else default
+        for value in values
+    ]
+
+
+def _check_delta(delta):
+    if not isinstance(delta, integer_types) or isinstance(delta, bool):
+        raise TypeError("delta must be an integer")
+    return delta
+
+
 class BaseNoTTLCache(BaseCache):
     #
     # Interface methods, try not to override.
@@ -224,12 +853,19 @@ class BaseNoTTLCache(BaseCache):
         if not isinstance(key, string_types):
             raise TypeError("key must be a string")
 
-        value = self._encode(value)
+        if not self._listeners:
+            value = self._encode(value)
+            try:
+                self._set(key, value)
+            except CacheError as e:
+                _log_cache_error("(noTTL) Error during cache set", e)
+            return
 
-        try:
+        with self._operation(
+                'set', (key,), "(noTTL) Error during cache set") as op:
+            value = self._encode(value)
+            op.written(value)
             self._set(key, value)
-        except CacheError as e:
-            logger.error("(noTTL) Error during cache set: %s", e)
 
     def set_many(self, sequence=None, **kwarg_values):
         """Set many items in the cache.
@@ -253,16 +889,83 @@ class BaseNoTTLCache(BaseCache):
         if not values:
             return
 
-        for key in values.keys():
-            if not isinstance(key, string_types):
-                raise TypeError("keys must be strings")
+        if not all(isinstance(key, string_types) for key in values):
+            raise TypeError("keys must be strings")
 
-            values[key] = self._encode(values[key])
+        if not self._listeners:
+            for key in values.keys():
+                values[key] = self._encode(values[key])
+            try:
+                self._set_many(values)
+            except CacheError as e:
+                _log_cache_error("(noTTL) Error during cache set_many", e)
+            return
+
+        with self._operation('set_many', list(values),
+                             "(noTTL) Error during cache set_many") as op:
+            for key in values.keys():
+                values[key] = self._encode(values[key])
+                op.written(values[key])
 
-        try:
             self._set_many(values)
-        except CacheError as e:
-            logger.error("(noTTL) Error during cache set_many: %s", e)
+
+    def add(self, key, value):
+        """Set `key` to be `value` in the cache, only if it isn't already
+            set. Checking and setting is a single atomic operation.
+
+            returns: True/False
+                True if the value was set, False if the key already existed
+                or the value couldn't be set.
+        """
+        if not isinstance(key, string_types):
+            raise TypeError("key must be a string")
+
+        if not self._listeners:
+            value = self._encode(value)
+            try:
+                return self._add(key, value)
+            except CacheError as e:
+                _log_cache_error("(noTTL) Error during cache add", e)
+                return False
+
+        with self._operation(
+                'add', (key,), "(noTTL) Error during cache add") as op:
+            value = self._encode(value)
+            op.written(value)
+            return self._add(key, value)
+        return False
+
+    def incr(self, key, delta=1):
+        """Atomically add `delta` to the counter at `key`, starting from 0
+            if it doesn't exist.
+
+            Counters are stored as plain integers rather than encoded, so
+            should only be read and changed with incr and decr, e.g. read
+            with `incr(key, 0)`.
+
+            returns: int or None
+                the new value, or None if it couldn't be changed.
+        """
+        if not isinstance(key, string_types):
+            raise TypeError("key must be a string")
+
+        delta = _check_delta(delta)
+
+        if not self._listeners:
+            try:
+                return self._incr(key, delta)
+            except CacheError as e:
+                _log_cache_error("(noTTL) Error during cache incr", e)
+                return None
+
+        with self._operation(
+                'incr', (key,), "(noTTL) Error during cache incr"):
+            return self._incr(key, delta)
+        return None
+
+    def decr(self, key, delta=1):
+        """as incr, but subtracts `delta`."""
+        return self.incr(key, -_check_delta(delta))
 
     def __setitem__(self, key, val):
         self.set(key, val)
@@ -283,12 +986,29 @@ class BaseNoTTLCache(BaseCache):
         for k, v in dict_vals.items():
             self._set(k, v)
 
+    def _add(self, key, value):
+        """override to support add, atomically. This is given an encoded
+            value.
+        """
+        raise NotImplementedError(
+            "{} does not support add".format(self.__class__.__name__))
+
+    def _incr(self, key, delta):
+        """override to support incr and decr, atomically."""
+        raise NotImplementedError(
+            "{} does not support incr".format(self.__class__.__name__))
+
 
 class BaseTTLCache(BaseCache):
+    # The longest ttl for ABSENT values, so lookups of things which didn't
+    # exist are retried sooner than other values are refreshed. A shorter
+    # ttl given to set is used instead. None to use the given ttl.
+    negative_ttl_seconds = 30
+
     #
     # Interface methods, try not to override.
     #
-    def set(self, key, value, ttl_seconds):
+    def set(self, key, value, ttl_seconds, tags=None):
         """Set `key` to be `value` in the cache
 
             `key` must be a string.
@@ -298,24 +1018,332 @@ class BaseTTLCache(BaseCache):
 
             `ttl_seconds` number of seconds (int or float) for which to cache
                 the item.
+
+            `tags` optional iterable of strings, e.g. ['article:123'], for
+                removing the item with `invalidate_tags`. Only supported by
+                some caches, and not by redis cluster.
         """
         if not isinstance(key, string_types):
             raise TypeError("key must be a string")
 
-        if ttl_seconds is not None:
+        ttl_seconds = self._check_ttl(ttl_seconds)
+        if tags is not None:
+            tags = self._check_tags(tags)
+        if value is ABSENT:
+            ttl_seconds = self._negative_ttl(ttl_seconds)
+
+        if not self._listeners:
+            value = self._encode(value)
             try:
-                ttl_seconds = float(ttl_seconds)
-            except TypeError as e:
-                raise TypeError("invalid ttl_seconds {}".format(e.args[0]))
-            except ValueError as e:
-                raise ValueError("Invalid ttl_seconds {}".format(e.args[0]))
+                if tags:
+                    self._set_tagged(key, value, ttl_seconds, tags)
+                else:
+                    self._set(key, value, ttl_seconds)
+            except CacheError as e:
+                _log_cache_error("(TTL) Error during cache set", e)
+            return
+
+        with self._operation(
+                'set', (key,), "(TTL) Error during cache set") as op:
+            value = self._encode(value)
+            op.written(value)
+
+            if tags:
+                self._set_tagged(key, value, ttl_seconds, tags)
+            else:
+                self._set(key, value, ttl_seconds)
+
+    def add(self, key, value, ttl_seconds):
+        """Set `key` to be `value` in the cache, only if it isn't already
+            set. Checking and setting is a single atomic operation.
+
+            returns: True/False
+                True if the value was set, False if the key already existed
+                or the value couldn't be set.
+        """
+        if not isinstance(key, string_types):
+            raise TypeError("key must be a string")
+
+        ttl_seconds = self._check_ttl(ttl_seconds)
+        if value is ABSENT:
+            ttl_seconds = self._negative_ttl(ttl_seconds)
+
+        if not self._listeners:
+            value = self._encode(value)
+            try:
+                return self._add(key, value, ttl_seconds)
+            except CacheError as e:
+                _log_cache_error("(TTL) Error during cache add", e)
+                return False
+
+        with self._operation(
+                'add', (key,), "(TTL) Error during cache add") as op:
+            value = self._encode(value)
+            op.written(value)
+            return self._add(key, value, ttl_seconds)
+        return False
+
+    def incr(self, key, delta=1, ttl_seconds=None):
+        """Atomically add `delta` to the counter at `key`. If it doesn't
+            exist, it is created at 0 first, to expire after `ttl_seconds`.
+            The ttl isn't changed for existing counters, so e.g. a rate limit
+            window starts from the first incr.
+
+            Counters are stored as plain integers rather than encoded, so
+            should only be read and changed with incr and decr, e.g. read
+            with `incr(key, 0)`.
+
+            returns: int or None
+                the new value, or None if it couldn't be changed.
+        """
+        if not isinstance(key, string_types):
+            raise TypeError("key must be a string")
+
+        delta = _check_delta(delta)
+        ttl_seconds = self._check_ttl(ttl_seconds)
+
+        if not self._listeners:
+            try:
+                return self._incr(key, delta, ttl_seconds)
+            except CacheError as e:
+                _log_cache_error("(TTL) Error during cache incr", e)
+                return None
+
+        with self._operation(
+                'incr', (key,), "(TTL) Error during cache incr"):
+            return self._incr(key, delta, ttl_seconds)
+        return None
+
+    def decr(self, key, delta=1, ttl_seconds=None):
+        """as incr, but subtracts `delta`."""
+        return self.incr(key, -_check_delta(delta), ttl_seconds)
+
+    def touch(self, key, ttl_seconds):
+        """Set the ttl of `key` to `ttl_seconds`, without changing its value.
+            Items stored as ABSENT are only kept for up to
+            `negative_ttl_seconds` more.
+
+            returns: True/False
+                True if the key exists, and so was touched.
+        """
+        if not isinstance(key, string_types):
+            raise TypeError("key must be a string")
+
+        ttl_seconds = self._check_ttl(ttl_seconds)
+
+        if not self._listeners:
+            try:
+                return self._touch(key, ttl_seconds)
+            except CacheError as e:
+                _log_cache_error("(TTL) Error during cache touch", e)
+                return False
+
+        with self._operation(
+                'touch', (key,), "(TTL) Error during cache touch"):
+            return self._touch(key, ttl_seconds)
+        return False
+
+    def touch_many(self, keys, ttl_seconds):
+        """Set the ttl of many keys to `ttl_seconds`, without changing their
+            values. Items stored as ABSENT are only kept for up to
+            `negative_ttl_seconds` more.
+
+            returns: int
+                the number of keys which exist, and so were touched.
+        """
+        keys = list(keys) # reduce a generator/iter if it is one.
+        if not all(isinstance(key, string_types) for key in keys):
+            raise TypeError("keys must be strings")
+
+        ttl_seconds = self._check_ttl(ttl_seconds)
+
+        if not keys:
+            return 0
+
+        if not self._listeners:
+            try:
+                return self._touch_many(keys, ttl_seconds)
+            except CacheError as e:
+                _log_cache_error("(TTL) Error during cache touch_many", e)
+                return 0
+
+        with self._operation(
+                'touch_many', keys, "(TTL) Error during cache touch_many"):
+            return self._touch_many(keys, ttl_seconds)
+        return 0
+
+    def get_and_touch(self, key, ttl_seconds, default=None):
+        """as get, but also sets the ttl of the item to `ttl_seconds` if it
+            exists, e.g. for sliding expiration.
+        """
+        if not isinstance(key, string_types):
+            raise TypeError("key must be a string")
+
+        ttl_seconds = self._check_ttl(ttl_seconds)
+
+        if not self._listeners:
+            try:
+                val = self._get_and_touch(key, ttl_seconds, _DEFAULT)
+            except CacheError as e:
+                _log_cache_error("(TTL) Error during cache get_and_touch", e)
+                return default
+            if val is _DEFAULT:
+                return default
+            return self._decode(val, default)
+
+        with self._operation('get_and_touch', (key,),
+                             "(TTL) Error during cache get_and_touch") as op:
+            val = self._get_and_touch(key, ttl_seconds, _DEFAULT)
+            return op.decode(self._decode, val, default)
+        return default
+
+    def get_many_and_touch(self, keys, ttl_seconds, default=None):
+        """as get_many, but also sets the ttl of the items which exist to
+            `ttl_seconds`.
+        """
+        keys = list(keys) # reduce a generator/iter if it is one.
+        if not all(isinstance(key, string_types) for key in keys):
+            raise TypeError("keys must be strings")
+
+        ttl_seconds = self._check_ttl(ttl_seconds)
+
+        if not keys:
+            return {}
+
+        if not self._listeners:
+            try:
+                values = self._get_many_and_touch(keys, ttl_seconds, _DEFAULT)
+            except CacheError as e:
+                _log_cache_error(
+                    "(TTL) Error during cache get_many_and_touch", e)
+                return {key: default for key in keys}
+            return dict(zip(keys, self._decode_many(values, default)))
+
+        with self._operation(
+                'get_many_and_touch', keys,
+                "(TTL) Error during cache get_many_and_touch") as op:
+            values = self._get_many_and_touch(keys, ttl_seconds, _DEFAULT)
+            return dict(zip(
+                keys, op.decode_many(self._decode_many, values, default)))
+        return {key: default for key in keys}
+
+    def invalidate_tags(self, tags):
+        """Remove every item set with any of `tags`.
+
+            `tags` - an iterable of tags.
+
+            returns: int
+                the number of items removed.
+        """
+        tags = self._check_tags(tags)
+        if not tags:
+            return 0
+
+        if not self._listeners:
+            try:
+                return self._invalidate_tags(tags)
+            except CacheError as e:
+                _log_cache_error("(TTL) Error during cache invalidate_tags", e)
+                return 0
+
+        with self._operation('invalidate_tags', (),
+                             "(TTL) Error during cache invalidate_tags"):
+            return self._invalidate_tags(tags)
+        return 0
+
+    def set_many(self, sequence, ttl_seconds):
+        """Set many items in the cache, all with the same ttl.
+
+            `sequence` - A Mapping, or iterable of (key, value) pairs. Values
+                must be encodable by the cache class. See the class
+                definition for more details.
 
-        value = self._encode(value)
+            `ttl_seconds` number of seconds (int or float) for which to cache
+                the items.
+        """
+        try:
+            values = dict(sequence)
+        except TypeError as e:
+            raise TypeError("Invalid items sequence: {}".format(e.args[0]))
+        except ValueError as e:
+            raise ValueError("Invalid items sequence: {}".format(e.args[0]))
+
+        if not values:
+            return
+
+        ttl_seconds = self._check_ttl(ttl_seconds)
+
+        if not all(isinstance(key, string_types) for key in values):
+            raise TypeError("keys must be strings")
+
+        if not self._listeners:
+            try:
+                self._set_many_batches(values, ttl_seconds, None)
+            except CacheError as e:
+                _log_cache_error("(TTL) Error during cache set_many", e)
+            return
+
+        with self._operation('set_many', list(values),
+                             "(TTL) Error during cache set_many") as op:
+            self._set_many_batches(values, ttl_seconds, op)
+
+    def _set_many_batches(self, values, ttl_seconds, op):
+        """encode `values` and set them, in a separate batch with the
+            negative ttl for ABSENT values.
+        """
+        absent_keys = []
+        for key in values.keys():
+            if values[key] is ABSENT:
+                absent_keys.append(key)
+            values[key] = self._encode(values[key])
+            if op is not None:
+                op.written(values[key])
+
+        batches = [(values, ttl_seconds)]
+        if absent_keys:
+            negative_ttl = self._negative_ttl(ttl_seconds)
+            if negative_ttl != ttl_seconds:
+                absent = {key: values.pop(key) for key in absent_keys}
+                batches.append((absent, negative_ttl))
+
+        for batch, ttl in batches:
+            if batch:
+                self._set_many(batch, ttl)
+
+    def _negative_ttl(self, ttl_seconds):
+        negative_ttl = self.negative_ttl_seconds
+        if negative_ttl is None:
+            return ttl_seconds
+        if ttl_seconds is None:
+            return float(negative_ttl)
+        return min(ttl_seconds, float(negative_ttl))
+
+    def _touch_ttl(self, value, ttl_seconds):
+        """the ttl to touch an item stored as `value` with."""
+        if value is ABSENT or _is_absent_marker(value):
+            return self._negative_ttl(ttl_seconds)
+        return ttl_seconds
+
+    @staticmethod
+    def _check_tags(tags):
+        if isinstance(tags, string_types):
+            raise TypeError("tags must be an iterable of strings")
+        tags = list(tags)
+        if not all(isinstance(tag, string_types) for tag in tags):
+            raise TypeError("tags must be strings")
+        return tags
 
+    @staticmethod
+    def _check_ttl(ttl_seconds):
+        if ttl_seconds is None:
+            return None
         try:
-            self._set(key, value, ttl_seconds)
-        except CacheError as e:
-            logger.error("(TTL) Error during cache set: %s", e)
+            return float(ttl_seconds)
+        except TypeError as e:
+            raise TypeError("invalid ttl_seconds {}".format(e.args[0]))
+        except ValueError as e:
+            raise ValueError("Invalid ttl_seconds {}".format(e.args[0]))
+
     #
     # Internal logic, abstract methods _must_ be overridden,
     # other may or may not be overridden if different behaviour
@@ -328,16 +1356,98 @@ class BaseTTLCache(BaseCache):
         """
         raise NotImplementedError
 
+    def _set_many(self, dict_vals, ttl_seconds):
+        """override for a more efficient implementation.
+            This is given encoded values.
+        """
+        for k, v in dict_vals.items():
+            self._set(k, v, ttl_seconds)
+
+    def _touch(self, key, ttl_seconds):
+        """override to support touch, returning whether the key exists.
+            Items stored as ABSENT should be given a ttl of at most
+            `_negative_ttl(ttl_seconds)`.
+        """
+        raise NotImplementedError(
+            "{} does not support touch".format(self.__class__.__name__))
+
+    def _touch_many(self, keys, ttl_seconds):
+        """override for a more efficient implementation."""
+        return sum(1 for key in keys if self._touch(key, ttl_seconds))
+
+    def _get_and_touch(self, key, ttl_seconds, default):
+        """override for a more efficient implementation."""
+        val = self._get(key, default)
+        if val is not default:
+            self._touch(key, self._touch_ttl(val, ttl_seconds))
+        return val
+
+    def _get_many_and_touch(self, keys, ttl_seconds, default):
+        """override for a more efficient implementation.
+            Must return values in the same order as the keys.
+        """
+        vals = self._get_many(keys, default)
+        found = {} # ttl -> keys
+        for key, val in zip(keys, vals):
+            if val is not default:
+                ttl = self._touch_ttl(val, ttl_seconds)
+                found.setdefault(ttl, []).append(key)
+        for ttl, found_keys in found.items():
+            self._touch_many(found_keys, ttl)
+        return vals
+
+    def _add(self, key, value, ttl_seconds):
+        """override to support add, atomically. This is given an encoded
+            value.
+        """
+        raise NotImplementedError(
+            "{} does not support add".format(self.__class__.__name__))
+
+    def _incr(self, key, delta, ttl_seconds):
+        """override to support incr and decr, atomically. `ttl_seconds` only
+            applies to counters which are created.
+        """
+        raise NotImplementedError(
+            "{} does not support incr".format(self.__class__.__name__))
+
+    def _set_tagged(self, key, value, ttl_seconds, tags):
+        """override to support tags. This is given an encoded value, and
+            a non-empty list of tags.
+        """
+        raise NotImplementedError(
+            "{} does not support tags".format(self.__class__.__name__))
+
+    def _invalidate_tags(self, tags):
+        """override to support tags, returning the number of items removed.
+        """
+        raise NotImplementedError(
+            "{} does not support tags".format(self.__class__.__name__))
+
 
 #
 # Compressors
 #
 class ZLibCompressor(object):
+    """Accepts text or any bytes-like object (bytes, bytearray, memoryview)
+        to compress, and any bytes-like object to decompress.
+    """
     @staticmethod
     def compress(serialized):
-        if isinstance(serialized, string_types):
-            serialized = serialized.encode()
-        return zlib.compress(serialized)
+        if isinstance(serialized, bytes) or \
+                not isinstance(serialized, string_types):
+            return zlib.compress(serialized)
+
+        chunk_size = _COMPRESS_TEXT_CHUNK_SIZE
+        if len(serialized) <= chunk_size:
+            return zlib.compress(serialized.encode())
+
+        compressor = zlib.compressobj()
+        parts = [
+            compressor.compress(serialized[start:start + chunk_size].encode())
+            for start in range(0, len(serialized), chunk_size)
+        ]
+        parts.append(compressor.flush())
+        return b''.join(parts)
 
     @staticmethod
     def decompress(compressed):
@@ -346,6 +1456,27 @@ class ZLibCompressor(object):
         except (TypeError, ValueError, zlib.error) as e:
             raise CacheDecodeError(e)
 
+    @staticmethod
+    def decompress_iter(compressed, chunk_size=_STREAM_CHUNK_SIZE):
+        """yield the decompressed data in chunks of at most `chunk_size`."""
+        try:
+            view = memoryview(compressed)
+            decompressor = zlib.decompressobj()
+            for start in range(0, len(view), chunk_size):
+                data = view[start:start + chunk_size]
+                while data:
+                    chunk = decompressor.decompress(data, chunk_size)
+                    if chunk:
+                        yield chunk
+                    data = decompressor.unconsumed_tail
+            chunk = decompressor.flush()
+            if not getattr(decompressor, 'eof', True): # eof is py3.3+
+                raise zlib.error("incomplete or truncated stream")
+        except (TypeError, ValueError, zlib.error) as e:
+            raise CacheDecodeError(e)
+        if chunk:
+            yield chunk
+
 #
 # Serializers
 #
@@ -360,14 +1491,66 @@ class JSONSerializer(object):
 
     @classmethod
     def deserialize(cls, serialized):
-        if not isinstance(serialized, string_types):
-            serialized = serialized.decode()
-
+        """`serialized` may be text or any bytes-like object."""
         try:
+            # rebind, so the bytes can be freed before decoding the text.
+            serialized = text_from_buffer(serialized)
             return cls._json_decoder.decode(serialized)
         except (ValueError, TypeError) as e:
             raise CacheDecodeError(e)
 
+    @classmethod
+    def iter_array(cls, chunks):
+        """Incrementally deserialize a JSON array from an iterable of byte
+            chunks (e.g. from `BaseCache.get_stream`), yielding each item.
+        """
+        try:
+            for item in iter_json_array(chunks, cls._json_decoder):
+                yield item
+        except (ValueError, TypeError) as e:
+            raise CacheDecodeError(e)
+
+
+class NumpySerializer(JSONSerializer):
+    """JSON serializer which stores numpy arrays (anywhere in the value, e.g.
+        nested in dicts and lists) as raw buffers after the JSON document,
+        rather than as JSON lists. Arrays are deserialized without copying, as
+        read only views over the payload.
+
+        Values without any arrays are serialized as plain JSON, so values
+        written by JSONSerializer can be read too. numpy is an optional
+        dependency, only needed if arrays are used.
+    """
+    _frame_kind = b'A'
+
+    @classmethod
+    def serialize(cls, raw_data):
+        buffers = []
+        serialized = ArrayJSONEncoder(buffers).encode(raw_data)
+        if not buffers:
+            return serialized
+        return pack_frame(cls._frame_kind, [serialized.encode()] + buffers)
+
+    @classmethod
+    def deserialize(cls, serialized):
+        if isinstance(serialized, string_types) and \
+                not isinstance(serialized, bytes):
+            return super(NumpySerializer, cls).deserialize(serialized)
+
+        try:
+            segments = unpack_frame(serialized, cls._frame_kind)
+        except (ValueError, TypeError):
+            # Not a frame, so plain JSON.
+            return super(NumpySerializer, cls).deserialize(serialized)
+
+        decoder = json.JSONDecoder(object_hook=functools.partial(
+                array_object_hook, segments[1:]))
+        try:
+            return decoder.decode(text_from_buffer(segments[0]))
+        # KeyError and IndexError are from corrupt array descriptions.
+        except (ValueError, TypeError, KeyError, IndexError) as e:
+            raise CacheDecodeError(e)
+
 
 class PickleSerializer(object):
     @staticmethod
@@ -382,9 +1565,296 @@ class PickleSerializer(object):
             raise CacheDecodeError(e)
 
 
+class Pickle5Serializer(object):
+    """Pickle using the highest available protocol.
+
+        With protocol 5 (python 3.8+), objects supporting out-of-band
+        buffers (e.g. numpy arrays, or bytes-like values wrapped in
+        pickle.PickleBuffer) aren't copied into the pickle stream. Instead
+        their buffers are written after it, and on load they are rebuilt
+        over memoryview slices of the payload rather than copies.
+    """
+    protocol = pickle.HIGHEST_PROTOCOL
+    _frame_kind = b'P'
+
+    @classmethod
+    def serialize(cls, raw_data):
+        if cls.protocol < 5:
+            return pack_frame(
+                    cls._frame_kind, [pickle.dumps(raw_data, cls.protocol)])
+
+        buffers = []
+        data = pickle.dumps(
+                raw_data, cls.protocol, buffer_callback=buffers.append)
+        return pack_frame(
+                cls._frame_kind, [data] + [buf.raw() for buf in buffers])
+
+    @classmethod
+    def deserialize(cls, serialized):
+        try:
+            segments = unpack_frame(serialized, cls._frame_kind)
+            if len(segments) == 1:
+                return pickle.loads(segments[0])
+            return pickle.loads(segments[0], buffers=segments[1:])
+        except (EOFError, pickle.UnpicklingError, TypeError, ValueError) as e:
+            raise CacheDecodeError(e)
+
+
+# A count is only allowed for bytes fields, e.g. '16s', as e.g. '2I' would
+# be two values.
+_RECORD_FIELD_FORMAT = re.compile(r'[cbB?hHiIlLqQefd]|\d*s')
+
+class _RecordLayout(object):
+    def __init__(self, schema_id, record_type, formats):
+        self.schema_id = schema_id
+        self.record_type = record_type
+        self.make = record_type._make
+        # Bytes fields are stored after their length, as struct pads them
+        # with nulls: index -> the most bytes they can hold.
+        self.bytes_fields = {
+            i: int(format[:-1] or 1)
+            for i, format in enumerate(formats) if format.endswith('s')
+        }
+        self.struct = struct.Struct('<' + ''.join(
+            'H' + format if i in self.bytes_fields else format
+            for i, format in enumerate(formats)))
+
+    def pack(self, record):
+        if not self.bytes_fields:
+            try:
+                return self.struct.pack(*record)
+            except struct.error as e:
+                raise ValueError("Can't pack {!r}: {}".format(record, e))
+
+        values = []
+        for i, value in enumerate(record):
+            size = self.bytes_fields.get(i)
+            if size is not None:
+                if not isinstance(value, bytes):
+                    raise TypeError("{} field {} must be bytes".format(
+                        self.record_type.__name__, record._fields[i]))
+                if len(value) > size:
+                    raise ValueError("{} field {} is longer than {} "
+                                     "bytes".format(self.record_type.__name__,
+                                                    record._fields[i], size))
+                values.append(len(value))
+            values.append(value)
+        try:
+            return self.struct.pack(*values)
+        except struct.error as e:
+            raise ValueError("Can't pack {!r}: {}".format(record, e))
+
+    def unpack_from(self, view, offset):
+        values = self.struct.unpack_from(view, offset)
+        if not self.bytes_fields:
+            return self.make(values)
+
+        record = []
+        values = iter(values)
+        for i in range(len(self.record_type._fields)):
+            if i in self.bytes_fields:
+                length, value = next(values), next(values)
+                if length > len(value):
+                    raise ValueError("Invalid bytes field length")
+                record.append(value[:length])
+            else:
+                record.append(next(values))
+        return self.make(record)
+
+
+class RecordSerializer(object):
+    """Serializer for flat records with the same fields every time, such as
+        ids, counts and timestamps.
+
+        Record types (namedtuple classes) are registered once with a schema
+        id and a struct format for each field. Values are then packed with
+        a precompiled struct layout, so field names aren't repeated in every
+        value. Lists of records of the same type are packed into one buffer.
+
+        Unlike the other serializers this holds state, so create an instance
+        to use as a cache's serializer:
+
+            records = RecordSerializer()
+            records.register(1, ArticleStats, 'QIId')
+
+            class ArticleStatsCache(BaseRedisCache):
+                serializer = records
+    """
+    _magic = frame_magic(b'R')
+    _header = struct.Struct('<4sHB')
+    _SINGLE, _LIST = 0, 1
+    _EMPTY_LIST_SCHEMA_ID = 0
+
+    def __init__(self):
+        self._layouts_by_id = {}
+        self._layouts_by_type = {}
+
+    def register(self, schema_id, record_type, formats):
+        """Register a record type.
+
+            `schema_id` - int between 1 and 65535 identifying the layout.
+                This is stored in every value, so must not be reused for a
+                different layout while values may still be cached.
+            `record_type` - a namedtuple class.
+            `formats` - struct format for each field, in field order. Either
+                a string (e.g. 'QId') or a list (e.g. ['Q', '16s', 'd']).
+                Values are packed little-endian, with standard sizes. Only
+                bytes fields ('s') can have a count, which is the most bytes
+                they can hold, up to 65535. Longer values can't be
+                serialized.
+        """
+        if not 0 < schema_id <= 0xFFFF:
+            raise ValueError("schema_id must be between 1 and 65535")
+        if schema_id in self._layouts_by_id:
+            raise ValueError("schema_id {} already registered".format(schema_id))
+        if record_type in self._layouts_by_type:
+            raise ValueError("{} already registered".format(record_type))
+
+        if isinstance(formats, string_types):
+            fields = _RECORD_FIELD_FORMAT.findall(formats)
+            # Fall back to validating it as a whole, to give a ValueError.
+            formats = fields if ''.join(fields) == formats else [formats]
+        formats = list(formats)
+        for format in formats:
+            if _RECORD_FIELD_FORMAT.findall(format) != [format] or (
+                    format.endswith('s') and int(format[:-1] or 1) > 0xFFFF):
+                raise ValueError("Invalid field format {!r}".format(format))
+        if len(formats) != len(record_type._fields):
+            raise ValueError("{} has {} fields but {} formats given".format(
+                record_type.__name__, len(record_type._fields), len(formats)))
+
+        layout = _RecordLayout(schema_id, record_type, formats)
+        self._layouts_by_id[schema_id] = layout
+        self._layouts_by_type[record_type] = layout
+
+    def serialize(self, raw_data):
+        layout = self._layouts_by_type.get(type(raw_data))
+        if layout is not None:
+            return self._header.pack(
+                    self._magic, layout.schema_id, self._SINGLE
+                ) + layout.pack(raw_data)
+
+        if not isinstance(raw_data, (list, tuple)):
+            raise TypeError("{} is not a registered record type".format(
+                type(raw_data).__name__))
+
+        if not raw_data:
+            return self._header.pack(
+                    self._magic, self._EMPTY_LIST_SCHEMA_ID, self._LIST)
+
+        record_type = type(raw_data[0])
+        layout = self._layouts_by_type.get(record_type)
+        if layout is None:
+            raise TypeError("{} is not a registered record type".format(
+                record_type.__name__))
+        if not all(type(record) is record_type for record in raw_data):
+            raise TypeError("records in a list must all be the same type")
+
+        pack = layout.pack
+        parts = [self._header.pack(self._magic, layout.schema_id, self._LIST)]
+        parts.extend(pack(record) for record in raw_data)
+        return b''.join(parts)
+
+    def deserialize(self, serialized):
+        try:
+            view = memoryview(serialized)
+            magic, schema_id, kind = self._header.unpack_from(view)
+            if magic != self._magic:
+                raise ValueError("Not a record")
+
+            if kind == self._LIST and schema_id == self._EMPTY_LIST_SCHEMA_ID:
+                return []
+
+            layout = self._layouts_by_id.get(schema_id)
+            if layout is None:
+                raise ValueError("Unknown record schema {}".format(schema_id))
+
+            start, size = self._header.size, layout.struct.size
+            if kind == self._SINGLE and len(view) - start == size:
+                return layout.unpack_from(view, start)
+
+            if kind == self._LIST and (len(view) - start) % size == 0:
+                unpack_from = layout.unpack_from
+                return [
+                    unpack_from(view, offset)
+                    for offset in range(start, len(view), size)
+                ]
+
+            raise ValueError("Invalid record length")
+        except (struct.error, TypeError, ValueError) as e:
+            raise CacheDecodeError(e)
+
+
 #
 # Base remote caches
 #
+# The tag scripts are given a key along with the tag sets it belongs to, so
+# the keys of one run are in different hash slots, which redis cluster
+# rejects with CROSSSLOT. Tags are only supported on a single redis server.
+#
+# Sets KEYS[1] to ARGV[1] with a ttl of ARGV[2], and adds it to the tag sets
+# KEYS[2:]. Each tag set lives at least as long as its longest lived key.
+_SET_TAGGED_SCRIPT = """
+local ttl = tonumber(ARGV[2])
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ttl)
+for i = 2, #KEYS do
+    redis.call('SADD', KEYS[i], KEYS[1])
+    if redis.call('TTL', KEYS[i]) < ttl then
+        redis.call('EXPIRE', KEYS[i], ttl)
+    end
+end
+"""
+
+# Removes KEYS[2:], and their membership of the tag set KEYS[1]. Returns the
+# number of them which still existed.
+_INVALIDATE_TAG_SCRIPT = """
+local removed = 0
+for i = 2, #KEYS do
+    removed = removed + redis.call('UNLINK', KEYS[i])
+    redis.call('SREM', KEYS[1], KEYS[i])
+end
+return removed
+"""
+
+# The most keys given to each run of _INVALIDATE_TAG_SCRIPT.
+_INVALIDATE_TAG_BATCH_SIZE = 1000
+
+# Sets the ttl of KEYS[1] to ARGV[1], or to ARGV[2] if it holds the ABSENT
+# marker ARGV[3]. Returns whether it exists.
+_TOUCH_SCRIPT = """
+local ttl = ARGV[1]
+-- Only GET values as short as the marker, rather than copying every value.
+if redis.call('STRLEN', KEYS[1]) == #ARGV[3]
+        and redis.call('GET', KEYS[1]) == ARGV[3] then
+    ttl = ARGV[2]
+end
+return redis.call('EXPIRE', KEYS[1], ttl)
+"""
+
+# as _TOUCH_SCRIPT, but returns the value of KEYS[1].
+_GET_AND_TOUCH_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if value then
+    local ttl = ARGV[1]
+    if value == ARGV[3] then
+        ttl = ARGV[2]
+    end
+    redis.call('EXPIRE', KEYS[1], ttl)
+end
+return value
+"""
+
+
+def _script_sha(source):
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+
+def _is_no_script_error(result):
+    return isinstance(result, Exception) and (
+        result.__class__.__name__ == 'NoScriptError' or
+        str(result).startswith('NOSCRIPT'))
+
+
 class BaseRedisCache(BaseTTLCache):
     """Base generic redis class, does not implement encoding/decoding.
 
@@ -395,24 +1865,106 @@ class BaseRedisCache(BaseTTLCache):
         https://github.com/andymccurdy/redis-py
     """
     _default_ttl = 60 # seconds
+    # How long a namespace's version is cached in memory before being read
+    # from redis again, so bumps by other processes are seen within this.
+    namespace_version_ttl = 5 # seconds
+
+    def __init__(self, redis_connection, prefix='', namespace=None):
+        """`namespace` - optional name of a group of keys which can be
+            invalidated together with `bump_namespace`. Can't contain ':'.
 
-    def __init__(self, redis_connection, prefix=''):
+            Keys starting with '__ns__:' or '__tag__:' are used for
+            namespaces and tags, so shouldn't be used otherwise.
+        """
         self._conn = redis_connection
         self._prefix = prefix
+        self._namespace = self._check_namespace(namespace)
+        # (version, time to read it again)
+        self._namespace_version = None
+        # lua source -> redis-py Script, see _script.
+        self._scripts = {}
+
+    def in_namespace(self, namespace):
+        """returns a copy of this cache, using the same connection, for
+            keys in `namespace`.
+        """
+        inst = copy.copy(self)
+        inst._namespace = self._check_namespace(namespace)
+        inst._namespace_version = None
+        return inst
+
+    def bump_namespace(self):
+        """Invalidate every key in this cache's namespace, by incrementing
+            the namespace's version. Old keys are no longer read, and expire
+            through their TTL.
+
+            returns: int or None
+                the new version, or None if it couldn't be incremented.
+        """
+        if self._namespace is None:
+            raise ValueError("cache has no namespace")
+
+        try:
+            version = int(self._try_redis_action(
+                    self._conn.incr, self._namespace_key()))
+        except CacheError as e:
+            _log_cache_error("Error during cache bump_namespace", e)
+            return None
+
+        self._namespace_version = (
+                version, time.time() + self.namespace_version_ttl)
+        return version
 
     @staticmethod
-    def _try_redis_action(cb, *args, **kwargs):
+    def _check_namespace(namespace):
+        # Namespaced keys are '__ns__:<namespace>:<version>:<key>', which
+        # is only unambiguous if the namespace can't contain the separator.
+        if namespace is not None and ':' in namespace:
+            raise ValueError("namespace can't contain ':'")
+        return namespace
+
+    def _namespace_key(self):
+        return self._make_raw_key('__ns__:' + self._namespace)
+
+    def _get_namespace_version(self):
+        cached = self._namespace_version
+        if cached is not None and cached[1] > time.time():
+            return cached[0]
+
+        version = self._try_redis_action(self._conn.get, self._namespace_key())
+        try:
+            version = int(version) if version is not None else 0
+        except (TypeError, ValueError) as e:
+            raise CacheDecodeError(e)
+        self._namespace_version = (
+                version, time.time() + self.namespace_version_ttl)
+        return version
+
+    def _try_redis_action(self, cb, *args, **kwargs):
+        call = RemoteCall(self, getattr(cb, '__name__', 'call')) \
+            if self._listeners else None
         try:
             return cb(*args, **kwargs)
         except Exception as e:
+            if call is not None:
+                call.error = e
             # This module isn't dependant on the actual redis library, and
             # therefore can't catch the actual redis exceptions here. So just
             # catch everything.
             msg = "Failed to talk to redis {}: {}".format(
                     e.__class__.__name__, e)
             raise RemoteCacheCommError(msg)
+        finally:
+            if call is not None:
+                call.finish()
 
     def _make_key(self, key):
+        if self._namespace is not None:
+            key = '__ns__:{}:{}:{}'.format(
+                    self._namespace, self._get_namespace_version(), key)
+        return self._make_raw_key(key)
+
+    def _make_raw_key(self, key):
         if self._prefix:
             return self._prefix + ':' + key
         else:
@@ -423,6 +1975,168 @@ class BaseRedisCache(BaseTTLCache):
         key = self._make_key(key)
         self._try_redis_action(self._conn.set, key, value, ex=ttl)
 
+    def _set_many(self, dict_vals, ttl_seconds):
+        ttl = round(ttl_seconds or self._default_ttl)
+
+        def set_many():
+            pipe = self._conn.pipeline(transaction=False)
+            for key, value in dict_vals.items():
+                pipe.set(self._make_key(key), value, ex=ttl)
+            pipe.execute()
+
+        self._try_redis_action(set_many)
+
+    def _add(self, key, value, ttl_seconds):
+        ttl = round(ttl_seconds or self._default_ttl)
+        key = self._make_key(key)
+        result = self._try_redis_action(
+                self._conn.set, key, value, ex=ttl, nx=True)
+        return bool(result)
+
+    def _incr(self, key, delta, ttl_seconds):
+        ttl = round(ttl_seconds or self._default_ttl)
+        key = self._make_key(key)
+
+        def incr():
+            # SET NX only creates the counter (with its ttl) if it's missing.
+            pipe = self._conn.pipeline()
+            pipe.set(key, 0, ex=ttl, nx=True)
+            pipe.incrby(key, delta)
+            return pipe.execute()[1]
+
+        return int(self._try_redis_action(incr))
+
+    def _touch_args(self, ttl_seconds):
+        """ARGV for _TOUCH_SCRIPT and _GET_AND_TOUCH_SCRIPT."""
+        ttl = ttl_seconds or self._default_ttl
+        return [int(round(ttl)), int(round(self._negative_ttl(ttl))),
+                _ABSENT_MARKER]
+
+    # The touch methods use scripts, so that ABSENT values aren't kept for
+    # longer than negative_ttl_seconds, with a single key each, so they work
+    # with redis cluster.
+    def _touch(self, key, ttl_seconds):
+        key = self._make_key(key)
+        args = self._touch_args(ttl_seconds)
+        script = self._script(_TOUCH_SCRIPT)
+
+        def touch():
+            return script(keys=[key], args=args)
+
+        return bool(self._try_redis_action(touch))
+
+    def _touch_many(self, keys, ttl_seconds):
+        args = self._touch_args(ttl_seconds)
+        calls = [([self._make_key(key)], args) for key in keys]
+
+        def touch_many():
+            return self._run_scripts(_TOUCH_SCRIPT, calls)
+
+        return sum(1 for touched in self._try_redis_action(touch_many)
+                   if touched)
+
+    def _get_and_touch(self, key, ttl_seconds, default):
+        # A script rather than GETEX, which needs redis 6.2+, and can't
+        # tell ABSENT values apart.
+        key = self._make_key(key)
+        args = self._touch_args(ttl_seconds)
+        script = self._script(_GET_AND_TOUCH_SCRIPT)
+
+        def get_and_touch():
+            return script(keys=[key], args=args)
+
+        val = self._try_redis_action(get_and_touch)
+        return val if val is not None else default
+
+    def _get_many_and_touch(self, keys, ttl_seconds, default):
+        args = self._touch_args(ttl_seconds)
+        calls = [([self._make_key(key)], args) for key in keys]
+
+        def get_many_and_touch():
+            return self._run_scripts(_GET_AND_TOUCH_SCRIPT, calls)
+
+        vals = self._try_redis_action(get_many_and_touch)
+        return [
+            i if i is not None else default
+            for i in vals
+        ]
+
+    def _script(self, source):
+        """the redis-py Script for the lua `source`, which runs it with
+            EVALSHA, loading it first if the server doesn't have it.
+        """
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = \
+                self._conn.register_script(source)
+        return script
+
+    def _run_scripts(self, source, calls):
+        """run the lua `source` once for each (keys, args) in `calls`, with
+            EVALSHA in a single pipeline. redis-py Scripts check the server
+            has them before every pipeline, so this is one round trip
+            rather than two. The script is only loaded, and the batch run
+            again, if the server doesn't have it.
+
+            returns: list
+                the result of each run.
+        """
+        sha = _script_sha(source)
+
+        def execute():
+            pipe = self._conn.pipeline(transaction=False)
+            for keys, args in calls:
+                pipe.evalsha(sha, len(keys), *(list(keys) + list(args)))
+            return pipe.execute(raise_on_error=False)
+
+        results = execute()
+        if any(_is_no_script_error(result) for result in results):
+            self._conn.script_load(source)
+            results = execute()
+
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def _set_tagged(self, key, value, ttl_seconds, tags):
+        ttl = round(ttl_seconds or self._default_ttl)
+        keys = [self._make_key(key)] + [self._tag_key(tag) for tag in tags]
+        script = self._script(_SET_TAGGED_SCRIPT)
+
+        def set_tagged():
+            script(keys=keys, args=[value, ttl])
+
+        self._try_redis_action(set_tagged)
+
+    def _invalidate_tags(self, tags):
+        tag_keys = [self._tag_key(tag) for tag in tags]
+
+        def invalidate_tags():
+            pipe = self._conn.pipeline(transaction=False)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            members = pipe.execute()
+
+            # Each key is passed to the script, rather than it reading the
+            # tag sets, so it only touches keys it declares. Keys tagged
+            # since the sets were read are left, as they were set after
+            # the invalidation.
+            size = _INVALIDATE_TAG_BATCH_SIZE
+            calls = []
+            for tag_key, keys in zip(tag_keys, members):
+                keys = list(keys)
+                for start in range(0, len(keys), size):
+                    calls.append(([tag_key] + keys[start:start + size], ()))
+            return sum(self._run_scripts(_INVALIDATE_TAG_SCRIPT, calls))
+
+        return self._try_redis_action(invalidate_tags)
+
+    def _tag_key(self, tag):
+        # Tags aren't namespaced, so can remove keys from every version of
+        # a namespace.
+        return self._make_raw_key('__tag__:' + tag)
+
     def _get(self, key, default):
         key = self._make_key(key)
         val = self._try_redis_action(self._conn.get, key)
@@ -478,6 +2192,19 @@ class BaseContextCache(BaseCache):
             self._clear()
             raise RuntimeError("Context Cache was supposed to be fully exited.")
 
+    def memory_report(self, sample_size=1000, largest=10):
+        """Estimate the memory used by the values held, by measuring each
+            entry and everything it refers to. With more than `sample_size`
+            entries, a random sample is measured and the total
+            extrapolated.
+
+            `largest` - how many of the largest entries measured to list.
+
+            returns: dict, as condecache.memory.memory_report
+        """
+        from .memory import memory_report
+        return memory_report(self._cache, sample_size, largest)
+
     @abstractmethod
     def _clear(self):
         """method called when no longer in context."""
@@ -497,6 +2224,8 @@ class LocalContextCache(BaseContextCache, BaseNoTTLCache):
     def __init__(self):
         super(LocalContextCache, self).__init__()
         self._cache = {}
+        # for add and incr, which read and then write.
+        self._lock = threading.Lock()
 
     #
     # Methods that have to be overridden for BaseContextCache
@@ -514,6 +2243,27 @@ class LocalContextCache(BaseContextCache, BaseNoTTLCache):
     def _get(self, key, default):
         return self._cache.get(key, default)
 
+    def _add(self, key, value):
+        # Nothing is stored while not entered, as with _set.
+        if not self._active:
+            return False
+        with self._lock:
+            if key in self._cache:
+                return False
+            self._cache[key] = value
+        return True
+
+    def _incr(self, key, delta):
+        if not self._active:
+            return None
+        with self._lock:
+            value = self._cache.get(key, 0)
+            if not isinstance(value, integer_types) or \
+                    isinstance(value, bool):
+                raise CacheError("value of {!r} is not an integer".format(key))
+            value = self._cache[key] = value + delta
+        return value
+
     def _remove(self, key):
         return self._cache.pop(key, _DEFAULT) is not _DEFAULT
 
@@ -528,12 +2278,87 @@ class LocalContextAndRemoteTTLCache(BaseContextCache, BaseTTLCache):
         super(LocalContextAndRemoteTTLCache, self).__init__()
         self._cache = {}
         self._remote_cache = remote_cache
+        # key -> threading.Event, for keys being prefetched in the background.
+        self._prefetching = {}
+
+    def prefetch(self, keys, background=False):
+        """Fetch many items from the remote cache with a single `get_many`,
+            and keep them locally, so later `get`s don't need a round trip.
+            Should be called with the keys known at the start of a request.
+            Does nothing if not entered.
+
+            `keys` - iterable of cache keys to fetch. Keys already held
+                locally aren't fetched again.
+            `background` - if True, fetch in a separate thread and return
+                immediately. `get`s for keys still being fetched wait for it,
+                rather than making their own round trip.
+
+            returns: threading.Event or None
+                if `background`, an event set once the fetch is done.
+        """
+        keys = list(keys)
+        if not all(isinstance(key, string_types) for key in keys):
+            raise TypeError("keys must be strings")
+
+        done = threading.Event()
+        keys = [
+            key for key in set(keys)
+            if key not in self._cache and key not in self._prefetching
+        ] if self._active else []
+
+        for key in keys:
+            self._prefetching[key] = done
+
+        if not keys:
+            done.set()
+        elif not background:
+            self._prefetch(keys, done)
+        else:
+            thread = threading.Thread(
+                    target=self._prefetch, args=(keys, done),
+                    name='condecache-prefetch')
+            thread.daemon = True
+            thread.start()
+
+        return done if background else None
+
+    def prefetch_async(self, keys):
+        """as `prefetch`, but returns an awaitable which completes once
+            the fetch is done, without blocking the event loop.
+        """
+        from ._aio import wait_event
+        return wait_event(self.prefetch(keys, background=True))
+
+    def _prefetch(self, keys, done):
+        try:
+            vals = self._remote_cache.get_many(keys, _DEFAULT)
+            for key in keys:
+                # Skip keys whose prefetch was discarded by leaving the
+                # context, or which have been set since.
+                if self._prefetching.pop(key, None) is done and \
+                        self._active and key not in self._cache:
+                    val = vals.get(key, _DEFAULT)
+                    # Misses aren't kept, see _keep_found.
+                    if val is not _DEFAULT:
+                        self._cache[key] = val
+        finally:
+            for key in keys:
+                if self._prefetching.get(key) is done:
+                    del self._prefetching[key]
+            done.set()
+
+    def _wait_for_prefetch(self, keys):
+        for key in keys:
+            done = self._prefetching.get(key)
+            if done is not None:
+                done.wait()
 
     #
     # Methods that have to be overridden for BaseContextCache
     #
     def _clear(self):
         self._cache.clear()
+        self._prefetching.clear()
 
     #
     # Methods that have to be overridden for BaseTTLCache
@@ -543,7 +2368,79 @@ class LocalContextAndRemoteTTLCache(BaseContextCache, BaseTTLCache):
             self._cache[key] = value
         self._remote_cache.set(key, value, ttl)
 
+    def _set_many(self, dict_vals, ttl):
+        if self._active:
+            self._cache.update(dict_vals)
+        self._remote_cache.set_many(dict_vals, ttl)
+
+    def _touch(self, key, ttl):
+        return self._remote_cache.touch(key, ttl)
+
+    def _touch_many(self, keys, ttl):
+        return self._remote_cache.touch_many(keys, ttl)
+
+    def _get_and_touch(self, key, ttl, default):
+        self._wait_for_prefetch((key,))
+        val = self._cache.get(key, _DEFAULT)
+        if val is not _DEFAULT:
+            self._remote_cache.touch(key, ttl)
+            return val
+
+        val = self._remote_cache.get_and_touch(key, ttl, _DEFAULT)
+        if val is not _DEFAULT and self._active:
+            self._cache[key] = val
+        return val
+
+    def _get_many_and_touch(self, keys, ttl, default):
+        self._wait_for_prefetch(keys)
+        vals = {
+            key: self._cache[key]
+            for key in keys
+            if key in self._cache
+        }
+        missing_keys = [key for key in keys if key not in vals]
+
+        # Items held locally only need their remote ttl refreshing.
+        if vals:
+            self._remote_cache.touch_many(list(vals), ttl)
+
+        if missing_keys:
+            missing_vals = self._remote_cache.get_many_and_touch(
+                    missing_keys, ttl, _DEFAULT)
+            vals.update(missing_vals)
+
+            if self._active:
+                self._keep_found(missing_vals)
+
+        return [
+            vals[key] if vals[key] is not _DEFAULT else default
+            for key in keys
+        ]
+
+    def _add(self, key, value, ttl):
+        added = self._remote_cache.add(key, value, ttl)
+        if added and self._active:
+            self._cache[key] = value
+        return added
+
+    def _incr(self, key, delta, ttl):
+        # Counters are only kept remotely, as other processes change them.
+        self._cache.pop(key, None)
+        return self._remote_cache.incr(key, delta, ttl)
+
+    def _set_tagged(self, key, value, ttl, tags):
+        if self._active:
+            self._cache[key] = value
+        self._remote_cache.set(key, value, ttl, tags=tags)
+
+    def _invalidate_tags(self, tags):
+        # Which keys have the tags is only known remotely, and any key held
+        # locally may have been fetched with them, so drop everything.
+        self._clear()
+        return self._remote_cache.invalidate_tags(tags)
+
     def _get(self, key, default):
+        self._wait_for_prefetch((key,))
         val = self._cache.get(key, _DEFAULT)
 
         if val is _DEFAULT:
@@ -556,6 +2453,7 @@ class LocalContextAndRemoteTTLCache(BaseContextCache, BaseTTLCache):
         return val
 
     def _get_many(self, keys, default):
+        self._wait_for_prefetch(keys)
         vals = {
             key: self._cache[key]
             for key in keys
@@ -568,15 +2466,21 @@ class LocalContextAndRemoteTTLCache(BaseContextCache, BaseTTLCache):
             vals.update(missing_vals)
 
             if self._active:
-                # This will put _DEFAULT into our cache, but that's ok.
-                self._cache.update(missing_vals)
+                self._keep_found(missing_vals)
 
         return [
             vals[key] if vals[key] is not _DEFAULT else default
             for key in keys
         ]
 
+    def _keep_found(self, vals):
+        # Misses aren't kept, as the remote cache also returns every key as
+        # missing if it fails, so they would never be retried.
+        self._cache.update(
+            (key, val) for key, val in vals.items() if val is not _DEFAULT)
+
     def _remove(self, key):
+        self._prefetching.pop(key, None)
         existed_local = self._cache.pop(key, _DEFAULT) is not _DEFAULT
         existed_remote = self._remote_cache.remove(key)
         return existed_local or existed_remote
@@ -595,3 +2499,13 @@ class ZLibPickleRedisCache(BaseRedisCache):
 class PickleRedisCache(BaseRedisCache):
     compressor = None
     serializer = PickleSerializer
+
+
+class Pickle5RedisCache(BaseRedisCache):
+    compressor = None
+    serializer = Pickle5Serializer
+
+
+class NumpyRedisCache(BaseRedisCache):
+    compressor = None
+    serializer = NumpySerializer
@@ -0,0 +1,108 @@
+import threading
+import time
+
+from ._flight import Flight
+from ._six import string_types
+from .cache import _DEFAULT, _clock
+
+try:
+    from ._aio import AsyncCoalescingCache
+except SyntaxError: # py2, py3.4 and below.
+    AsyncCoalescingCache = None
+
+
+__ALL__ = ('CoalescingCache', 'AsyncCoalescingCache')
+
+
+class CoalescingCache(object):
+    """Wraps a cache so that `get` calls made concurrently from different
+        threads are fetched together, with a single `get_many`.
+
+        `cache` - the cache to wrap.
+        `window_seconds` - the longest the first `get` of a batch waits
+            for other calls to join it before fetching. It only waits while
+            other threads are in a `get` which isn't part of the batch (e.g.
+            waiting for an earlier batch), so uncontended calls are fetched
+            straight away. With the default of 0, only calls made while it
+            yields to other threads are batched.
+
+        Keys requested by more than one caller are only fetched once. All
+        other methods and attributes are those of the wrapped cache.
+
+        See AsyncCoalescingCache for batching calls from asyncio tasks.
+    """
+    def __init__(self, cache, window_seconds=0.0):
+        self._cache = cache
+        self._window = window_seconds
+        self._lock = threading.Lock()
+        # Notified whenever a caller joins a batch or returns.
+        self._changed = threading.Condition(self._lock)
+        self._batch = None
+        # The number of threads in get, and of those in the current batch.
+        self._callers = 0
+        self._batch_callers = 0
+
+    def get(self, key, default=None):
+        """as BaseCache.get"""
+        if not isinstance(key, string_types):
+            raise TypeError("key must be a string")
+
+        with self._lock:
+            self._callers += 1
+            batch = self._batch
+            leader = batch is None
+            if leader:
+                batch = self._batch = {}
+                self._batch_callers = 0
+            self._batch_callers += 1
+            flight = batch.get(key)
+            if flight is None:
+                flight = batch[key] = Flight()
+            self._changed.notify_all()
+
+        try:
+            if leader:
+                self._close_batch()
+                self._fetch(batch)
+            value = flight.wait()
+        finally:
+            with self._lock:
+                self._callers -= 1
+                self._changed.notify_all()
+
+        return default if value is _DEFAULT else value
+
+    def __getitem__(self, key):
+        val = self.get(key, _DEFAULT)
+        if val is _DEFAULT:
+            raise KeyError(key)
+        return val
+
+    def __getattr__(self, name):
+        return getattr(self._cache, name)
+
+    def _close_batch(self):
+        """wait for other callers to join the current batch, while they
+            still can and the window hasn't passed, then stop any more
+            joining it.
+        """
+        time.sleep(0) # yield to threads about to call get.
+        deadline = _clock() + self._window
+        with self._lock:
+            while self._callers > self._batch_callers:
+                remaining = deadline - _clock()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            self._batch = None
+
+    def _fetch(self, batch):
+        try:
+            values = self._cache.get_many(list(batch), _DEFAULT)
+        except BaseException as e:
+            for flight in batch.values():
+                flight.set_error(e)
+            raise
+
+        for key, flight in batch.items():
+            flight.set_result(values[key])
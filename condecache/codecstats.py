@@ -0,0 +1,200 @@
+"""The size of cached values before and after encoding, and the time spent
+    serializing and compressing them, by key prefix. For choosing whether a
+    cache's values are worth compressing, and with what.
+
+    stats = cache.enable_codec_stats()
+    ...
+    print(stats.report())
+"""
+import threading
+import time
+
+from .cache import (
+    MIXED_PREFIX, CacheListener, _DORAISE, _clock, _payload_size,
+)
+from .errors import CacheDecodeError
+from .memory import deep_size
+
+
+__ALL__ = ('CodecStats', 'MIXED_PREFIX')
+
+
+class CodecStats(CacheListener):
+    """Records the cost of encoding and decoding values, grouped by the
+        prefix of their keys. Enable with `BaseCache.enable_codec_stats`.
+
+        `prefix_depth` - how many parts of a key make up its prefix, e.g.
+            with 1, 'article:123:body' is grouped under 'article'. Operations
+            on keys with different prefixes are grouped under MIXED_PREFIX.
+        `separator` - what separates the parts of a key.
+
+        Values decoded on the parallel decode pool aren't recorded. Like
+        CacheMetrics, updates aren't locked, so counts may be very slightly
+        low when a cache is used by many threads at once.
+    """
+    def __init__(self, prefix_depth=1, separator=':'):
+        self._depth = prefix_depth
+        self._separator = separator
+        self._local = threading.local()
+        self.reset()
+
+    def on_operation(self, op):
+        # Only a listener so that the cache tracks its operations, which is
+        # where keys are found. Drop the last one, which is now finished.
+        self._local.op = None
+
+    def encode(self, cls, raw_data, op):
+        """as BaseCache._encode, for a value with a serializer."""
+        stats = self._get_stats(op)
+
+        start = _clock()
+        serialized = cls.serializer.serialize(raw_data)
+        serialized_at = _clock()
+        if cls.compressor is None:
+            encoded = serialized
+        else:
+            encoded = cls.compressor.compress(serialized)
+            stats.compress_seconds += _clock() - serialized_at
+        stats.serialize_seconds += serialized_at - start
+
+        stats.encodes += 1
+        stats.raw_bytes += deep_size(raw_data)
+        stats.serialized_bytes += _payload_size(serialized)
+        stats.compressed_bytes += _payload_size(encoded)
+        return encoded
+
+    def decode(self, cls, encoded, fallback, op):
+        """as BaseCache._decode, for a value with a serializer."""
+        stats = self._get_stats(op)
+        stats.decodes += 1
+
+        try:
+            start = _clock()
+            if cls.compressor is None:
+                serialized = encoded
+            else:
+                serialized = cls.compressor.decompress(encoded)
+                decompressed_at = _clock()
+                stats.decompress_seconds += decompressed_at - start
+                start = decompressed_at
+            stats.serialized_bytes += _payload_size(serialized)
+            stats.compressed_bytes += _payload_size(encoded)
+
+            value = cls.serializer.deserialize(serialized)
+            stats.deserialize_seconds += _clock() - start
+            return value
+        except CacheDecodeError:
+            stats.decode_errors += 1
+            if fallback is not _DORAISE:
+                return fallback
+            raise
+
+    def snapshot(self):
+        """returns: dict
+            the stats recorded so far, which can be serialized as JSON:
+            {
+                'since': <time.time() recording started>,
+                'prefixes': {
+                    <prefix>: {
+                        'encodes', 'decodes', 'decode_errors',
+                        'raw_bytes', 'serialized_bytes',
+                        'compressed_bytes': <int>,
+                        'serialize_seconds', 'compress_seconds',
+                        'decompress_seconds', 'deserialize_seconds',
+                        'cpu_seconds': <float>,
+                        'compression_ratio': <serialized / compressed
+                            bytes, or None if nothing was recorded>,
+                    },
+                },
+            }
+
+            `raw_bytes` is an estimate of the memory used by the values
+            encoded, and only counts encodes. The other sizes count both.
+        """
+        return {
+            'since': self._since,
+            'prefixes': {
+                prefix: stats.snapshot()
+                for prefix, stats in list(self._stats.items())
+            },
+        }
+
+    def report(self):
+        """returns: str
+            a table of the compression ratio and CPU cost of each prefix,
+            most costly first.
+        """
+        prefixes = sorted(
+            self.snapshot()['prefixes'].items(),
+            key=lambda item: item[1]['cpu_seconds'], reverse=True)
+
+        rows = [(
+            'prefix', 'encodes', 'decodes', 'avg size', 'ratio',
+            'serialize ms', 'compress ms', 'decompress ms', 'deserialize ms',
+            'us/value',
+        )]
+        for prefix, stats in prefixes:
+            values = stats['encodes'] + stats['decodes']
+            ratio = stats['compression_ratio']
+            rows.append((
+                prefix,
+                str(stats['encodes']),
+                str(stats['decodes']),
+                str(stats['serialized_bytes'] // values if values else 0),
+                '{:.2f}'.format(ratio) if ratio is not None else '-',
+                '{:.1f}'.format(stats['serialize_seconds'] * 1e3),
+                '{:.1f}'.format(stats['compress_seconds'] * 1e3),
+                '{:.1f}'.format(stats['decompress_seconds'] * 1e3),
+                '{:.1f}'.format(stats['deserialize_seconds'] * 1e3),
+                '{:.1f}'.format(
+                    stats['cpu_seconds'] * 1e6 / values if values else 0),
+            ))
+
+        widths = [max(len(cell) for cell in column) for column in zip(*rows)]
+        return '\n'.join(
+            '  '.join(
+                cell.ljust(width) if i == 0 else cell.rjust(width)
+                for i, (cell, width) in enumerate(zip(row, widths))
+            )
+            for row in rows
+        )
+
+    def reset(self):
+        """Discard the stats recorded so far."""
+        self._stats = {}
+        self._since = time.time()
+        self._local.op = None
+
+    def _get_stats(self, op):
+        local = self._local
+        if getattr(local, 'op', None) is not op:
+            prefix = op.prefix(self._depth, self._separator)
+            stats = self._stats.get(prefix)
+            if stats is None:
+                stats = self._stats.setdefault(prefix, _PrefixStats())
+            local.op = op
+            local.stats = stats
+        return local.stats
+
+
+class _PrefixStats(object):
+    __slots__ = (
+        'encodes', 'decodes', 'decode_errors', 'raw_bytes', 'serialized_bytes',
+        'compressed_bytes', 'serialize_seconds', 'compress_seconds',
+        'decompress_seconds', 'deserialize_seconds',
+    )
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0.0 if name.endswith('_seconds') else 0)
+
+    def snapshot(self):
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        stats['cpu_seconds'] = (
+            self.serialize_seconds + self.compress_seconds +
+            self.decompress_seconds + self.deserialize_seconds)
+        stats['compression_ratio'] = (
+            float(self.serialized_bytes) / self.compressed_bytes
+            if self.compressed_bytes else None)
+        return stats
+
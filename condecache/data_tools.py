@@ -1,11 +1,23 @@
+import codecs
 from datetime import datetime, timedelta
 import json
+import re
+import struct
 
 
-from ._six import timezone
+from ._six import timezone, byte_buffer
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-__ALL__ = ('json_object_hook', 'JSONEncoder')
+
+__ALL__ = (
+    'json_object_hook', 'JSONEncoder', 'iter_json_array',
+    'pack_frame', 'unpack_frame', 'frame_magic',
+    'ArrayJSONEncoder', 'array_object_hook',
+)
 
 
 def json_object_hook(data):
@@ -50,6 +62,62 @@ class JSONEncoder(json.JSONEncoder):
         return super(JSONEncoder, self).default(data)
 
 
+class ArrayJSONEncoder(JSONEncoder):
+    """JSON encoder which moves numpy arrays out of the JSON document.
+
+        The raw data of each array is appended to `buffers`, and the array is
+        replaced in the document by its index in `buffers`, dtype and shape.
+        Use `array_object_hook` to turn them back into arrays.
+    """
+    def __init__(self, buffers, **kwargs):
+        super(ArrayJSONEncoder, self).__init__(**kwargs)
+        self.buffers = buffers
+
+    def default(self, data):
+        if numpy is not None:
+            if isinstance(data, numpy.ndarray):
+                return self._encode_array(data)
+            if isinstance(data, numpy.generic):
+                return data.item()
+
+        return super(ArrayJSONEncoder, self).default(data)
+
+    def _encode_array(self, array):
+        if array.dtype.hasobject or array.dtype.fields is not None:
+            raise TypeError(
+                "Can't serialize numpy arrays of dtype {}".format(array.dtype))
+
+        shape = list(array.shape)
+        # A no-op unless the array isn't already C contiguous.
+        array = numpy.ascontiguousarray(array)
+        self.buffers.append(array.reshape(-1).view(numpy.uint8))
+
+        return {
+            '__conde_item_type__': 'ndarray',
+            'buffer': len(self.buffers) - 1,
+            'dtype': array.dtype.str,
+            'shape': shape,
+        }
+
+
+def array_object_hook(buffers, data):
+    """object hook for documents encoded by `ArrayJSONEncoder`. Arrays are
+        created over `buffers` with numpy.frombuffer, so they are read only
+        views of them rather than copies.
+    """
+    if data.get('__conde_item_type__') != 'ndarray':
+        return json_object_hook(data)
+
+    if numpy is None:
+        raise ValueError("numpy is required to decode arrays")
+
+    dtype = numpy.dtype(data['dtype'])
+    buf = buffers[data['buffer']]
+    if len(buf) == 0:
+        return numpy.empty(data['shape'], dtype=dtype)
+    return numpy.frombuffer(buf, dtype=dtype).reshape(data['shape'])
+
+
 _tz_cache = {}
 def _tz_from_seconds(seconds, tzname):
     try:
@@ -59,3 +127,164 @@ def _tz_from_seconds(seconds, tzname):
                 timedelta(seconds=seconds), name=tzname)
         return tz
 
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# iter_json_array parser states.
+_ARRAY_START, _ARRAY_FIRST, _ARRAY_ITEM, _ARRAY_AFTER, _ARRAY_END = range(5)
+
+def iter_json_array(chunks, decoder):
+    """Incrementally decode a JSON array, yielding its items one at a time.
+
+        `chunks` - an iterable of utf-8 encoded byte strings, which together
+            make up the JSON document.
+        `decoder` - a json.JSONDecoder used to decode each item.
+
+        Only the item currently being decoded (and the chunk it is in) are
+        held in memory, rather than the whole document.
+        Raises ValueError if the document isn't a valid JSON array.
+    """
+    chunks = iter(chunks)
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buf, pos, done = '', 0, False
+    state = _ARRAY_START
+
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos == len(buf) and not done:
+            buf, pos, done = _read_json_chunks(chunks, utf8, buf, pos)
+            continue
+
+        if state == _ARRAY_START:
+            if not buf.startswith('[', pos):
+                raise ValueError("Expecting '[' at char {}".format(pos))
+            pos += 1
+            state = _ARRAY_FIRST
+
+        elif state == _ARRAY_FIRST and buf.startswith(']', pos):
+            pos += 1
+            state = _ARRAY_END
+
+        elif state in (_ARRAY_FIRST, _ARRAY_ITEM):
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if done:
+                    raise
+                # Item is incomplete, grow the buffer geometrically so that
+                # large items aren't re-parsed once per chunk.
+                buf, pos, done = _read_json_chunks(
+                        chunks, utf8, buf, pos, 2 * (len(buf) - pos))
+                continue
+
+            next_pos = _WHITESPACE.match(buf, end).end()
+            if not done and buf[next_pos:next_pos + 1] not in (',', ']'):
+                # A number at the end of the buffer (e.g. "1.5e" of
+                # "1.5e10") may continue in the next chunk.
+                buf, pos, done = _read_json_chunks(
+                        chunks, utf8, buf, pos, 2 * (len(buf) - pos))
+                continue
+
+            yield item
+            pos = end
+            state = _ARRAY_AFTER
+
+        elif state == _ARRAY_AFTER:
+            if buf.startswith(',', pos):
+                state = _ARRAY_ITEM
+            elif buf.startswith(']', pos):
+                state = _ARRAY_END
+            else:
+                raise ValueError(
+                        "Expecting ',' delimiter at char {}".format(pos))
+            pos += 1
+
+        else: # _ARRAY_END
+            if pos != len(buf):
+                raise ValueError("Extra data at char {}".format(pos))
+            return
+
+
+def _read_json_chunks(chunks, utf8, buf, pos, min_size=0):
+    """read from `chunks` until there is more than `min_size` characters
+        left in the buffer, or the chunks are exhausted.
+
+        returns the new buffer, position and whether chunks are exhausted.
+    """
+    parts = [buf[pos:]]
+    size = len(parts[0])
+    min_size = max(min_size, size)
+    done = False
+
+    while not done and size <= min_size:
+        chunk = next(chunks, None)
+        if chunk is None:
+            text = utf8.decode(b'', True)
+            done = True
+        else:
+            text = utf8.decode(chunk)
+        parts.append(text)
+        size += len(text)
+
+    return ''.join(parts), 0, done
+
+
+# Framed payloads are a magic prefix followed by a count of segments, the
+# length of each segment, and then the segments themselves. The magic starts
+# with a null byte, which can't start a JSON document, a zlib stream or a
+# pickle, so framed values are easy to tell apart from other encodings.
+_FRAME_MAGIC = b'\x00CD'
+_FRAME_COUNT = struct.Struct('!I')
+_FRAME_LENGTH = struct.Struct('!Q')
+
+def frame_magic(kind):
+    """the prefix of frames of type `kind`, for formats which write their
+        own more compact header after it.
+    """
+    return _FRAME_MAGIC + kind
+
+
+def pack_frame(kind, segments):
+    """pack a list of buffers into a single framed byte string.
+
+        `kind` - a single byte identifying what the frame contains.
+        `segments` - a list of bytes-like objects.
+    """
+    segments = [byte_buffer(segment) for segment in segments]
+    header = [_FRAME_MAGIC, kind, _FRAME_COUNT.pack(len(segments))]
+    header.extend(_FRAME_LENGTH.pack(len(segment)) for segment in segments)
+    return b''.join(header + segments)
+
+
+def unpack_frame(data, kind):
+    """unpack a frame created by `pack_frame`
+
+        returns: list of memoryview
+            the segments, as slices over `data` rather than copies.
+        Raises ValueError if `data` isn't a frame of type `kind`.
+    """
+    view = memoryview(data)
+    magic = frame_magic(kind)
+    if view[:len(magic)].tobytes() != magic:
+        raise ValueError("Not a {!r} frame".format(kind))
+
+    pos = len(magic)
+    try:
+        count, = _FRAME_COUNT.unpack_from(view, pos)
+        pos += _FRAME_COUNT.size
+        lengths = [
+            _FRAME_LENGTH.unpack_from(view, pos + i * _FRAME_LENGTH.size)[0]
+            for i in range(count)
+        ]
+    except struct.error as e:
+        raise ValueError("Truncated frame header: {}".format(e))
+    pos += count * _FRAME_LENGTH.size
+
+    if pos + sum(lengths) != len(view):
+        raise ValueError("Frame length mismatch")
+
+    segments = []
+    for length in lengths:
+        segments.append(view[pos:pos + length])
+        pos += length
+    return segments
@@ -0,0 +1,290 @@
+try:
+    from collections.abc import Mapping
+except ImportError: # py2
+    from collections import Mapping
+from datetime import date, datetime, time, timedelta
+import functools
+import hashlib
+import inspect
+import threading
+
+from ._flight import Flight
+from ._six import integer_types, string_types
+from .cache import _DEFAULT, ABSENT, BaseTTLCache
+
+
+__ALL__ = ('cached', 'cached_batch')
+
+
+# Keys longer than this have their argument part replaced by a hash.
+_MAX_KEY_LENGTH = 200
+
+# Types whose repr is deterministic, and so can be used directly in keys.
+_SIMPLE_TYPES = frozenset(
+    integer_types + string_types +
+    (bytes, float, bool, type(None), date, datetime, time, timedelta)
+)
+
+
+def cached(cache, ttl_seconds=None, key=None, prefix=None,
+        single_flight=False):
+    """Decorator to memoize a function's results in `cache`.
+
+        `cache` - any BaseTTLCache or BaseNoTTLCache instance.
+        `ttl_seconds` - passed to `cache.set` for TTL caches, ignored for
+            others.
+        `key` - optional callable taking the same arguments as the function
+            and returning a string, used instead of the arguments in keys.
+            Needed for arguments which can't be normalized, e.g. `self`.
+        `prefix` - prefix for keys, defaults to the function's module and
+            qualified name.
+        `single_flight` - if True, concurrent calls with the same arguments
+            which miss the cache wait for the first call's result, rather
+            than all calling the function.
+
+        Keys are built from the prefix and the function's arguments, bound
+        to its signature (so `f(1)`, `f(a=1)` and `f(1, b=default)` share a
+        key). Arguments must be strings, numbers, bools, None, dates, or
+        lists, tuples, sets and dicts of those.
+
+        Coroutine functions are supported; the result is awaited and then
+        cached. Cache errors are logged and treated as misses, as with the
+        cache's own get and set.
+
+        The decorated function has extra attributes:
+            `invalidate(*args, **kwargs)` - remove the cached result for
+                the given arguments.
+            `make_key(*args, **kwargs)` - the cache key for the arguments.
+    """
+    def decorator(func):
+        make_key = _KeyBuilder(func, prefix, key)
+        store = functools.partial(_store, cache, ttl_seconds)
+
+        iscoroutinefunction = getattr(inspect, 'iscoroutinefunction', None)
+        if iscoroutinefunction is not None and iscoroutinefunction(func):
+            from ._aio import cached_coroutine
+            wrapper = cached_coroutine(
+                    func, cache, make_key, store, single_flight)
+        else:
+            wrapper = _cached_function(
+                    func, cache, make_key, store, single_flight)
+
+        wrapper.make_key = lambda *args, **kwargs: make_key(args, kwargs)
+        wrapper.invalidate = \
+            lambda *args, **kwargs: cache.remove(make_key(args, kwargs))
+        return wrapper
+
+    return decorator
+
+
+def cached_batch(cache, ttl_seconds=None, key=None, prefix=None,
+        cache_missing=False):
+    """Decorator to memoize a batch function, such as `load_articles(ids)`,
+        per id in `cache`.
+
+        `cache` - any BaseTTLCache or BaseNoTTLCache instance.
+        `ttl_seconds` - passed to `cache.set_many` for TTL caches, ignored
+            for others.
+        `key` - optional callable taking an id and returning a string, used
+            instead of the id in keys.
+        `prefix` - prefix for keys, defaults to the function's module and
+            qualified name.
+        `cache_missing` - if True, ids missing from the function's result
+            are cached as ABSENT (for the cache's `negative_ttl_seconds`),
+            so aren't looked up again until that expires.
+
+        The decorated function is called with a list of ids, and must return
+        either a mapping of id to value, or a list of values in the same
+        order as the ids. Ids missing from a returned mapping aren't cached,
+        unless `cache_missing` is set.
+
+        Calling the decorated function with an iterable of ids looks them all
+        up with one `get_many`, calls the function with only the ids which
+        weren't found (if any), and stores its results with one `set_many`.
+        Returns a list of values in the same order as the ids, with None for
+        ids the function didn't return, or which are cached as ABSENT.
+
+        The decorated function has extra attributes:
+            `invalidate(ids)` - remove the cached values for `ids`.
+            `make_key(id)` - the cache key for an id.
+    """
+    def decorator(func):
+        key_prefix = prefix
+        if key_prefix is None:
+            key_prefix = '{}.{}'.format(func.__module__,
+                    getattr(func, '__qualname__', func.__name__))
+        key_prefix += ':'
+        make_id_key = normalize_arg if key is None else key
+
+        def make_key(id_):
+            return key_prefix + make_id_key(id_)
+
+        @functools.wraps(func)
+        def wrapper(ids):
+            ids = list(ids)
+            keys = {}
+            unique_ids = []
+            for id_ in ids:
+                if id_ not in keys:
+                    keys[id_] = make_key(id_)
+                    unique_ids.append(id_)
+
+            cached = cache.get_many([keys[id_] for id_ in unique_ids], _DEFAULT)
+            found = {}
+            missing = []
+            for id_ in unique_ids:
+                value = cached[keys[id_]]
+                if value is _DEFAULT:
+                    missing.append(id_)
+                elif value is not ABSENT:
+                    found[id_] = value
+
+            if missing:
+                loaded = func(missing)
+                if not isinstance(loaded, Mapping):
+                    loaded = list(loaded)
+                    if len(loaded) != len(missing):
+                        raise ValueError(
+                            "{} returned {} values for {} ids".format(
+                                func.__name__, len(loaded), len(missing)))
+                    loaded = dict(zip(missing, loaded))
+
+                to_store = {}
+                for id_ in missing:
+                    if id_ in loaded:
+                        found[id_] = to_store[keys[id_]] = loaded[id_]
+                    elif cache_missing:
+                        to_store[keys[id_]] = ABSENT
+                _store_many(cache, ttl_seconds, to_store)
+
+            return [found.get(id_) for id_ in ids]
+
+        wrapper.make_key = make_key
+        wrapper.invalidate = \
+            lambda ids: cache.remove_many([make_key(id_) for id_ in ids])
+        return wrapper
+
+    return decorator
+
+
+def _cached_function(func, cache, make_key, store, single_flight):
+    flights = {} if single_flight else None
+    flights_lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = make_key(args, kwargs)
+        value = cache.get(key, _DEFAULT)
+        if value is not _DEFAULT:
+            return value
+
+        if flights is None:
+            value = func(*args, **kwargs)
+            store(key, value)
+            return value
+
+        with flights_lock:
+            flight = flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = flights[key] = Flight()
+
+        if not leader:
+            return flight.wait()
+
+        try:
+            value = func(*args, **kwargs)
+            store(key, value)
+        except BaseException as e:
+            flight.set_error(e)
+            raise
+        else:
+            flight.set_result(value)
+        finally:
+            with flights_lock:
+                flights.pop(key, None)
+        return value
+
+    return wrapper
+
+
+def _store(cache, ttl_seconds, key, value):
+    if isinstance(cache, BaseTTLCache):
+        cache.set(key, value, ttl_seconds)
+    else:
+        cache.set(key, value)
+
+
+def _store_many(cache, ttl_seconds, values):
+    if not values:
+        return
+    if isinstance(cache, BaseTTLCache):
+        cache.set_many(values, ttl_seconds)
+    else:
+        cache.set_many(values)
+
+
+class _KeyBuilder(object):
+    def __init__(self, func, prefix, key):
+        if prefix is None:
+            prefix = '{}.{}'.format(func.__module__,
+                    getattr(func, '__qualname__', func.__name__))
+        self._prefix = prefix + ':'
+        self._key = key
+        self._signature = None
+        self._arity = None
+
+        signature = getattr(inspect, 'signature', None)
+        if key is None and signature is not None:
+            try:
+                self._signature = signature(func)
+            except (TypeError, ValueError):
+                pass
+            else:
+                params = self._signature.parameters.values()
+                if all(p.kind == p.POSITIONAL_OR_KEYWORD for p in params):
+                    # Calls with exactly this many positional arguments
+                    # don't need binding.
+                    self._arity = len(params)
+
+    def __call__(self, args, kwargs):
+        if self._key is not None:
+            suffix = self._key(*args, **kwargs)
+            if not isinstance(suffix, string_types):
+                raise TypeError("key function must return a string")
+        else:
+            if self._signature is not None and \
+                    (kwargs or len(args) != self._arity):
+                bound = self._signature.bind(*args, **kwargs)
+                for param in self._signature.parameters.values():
+                    if param.name not in bound.arguments and \
+                            param.default is not param.empty:
+                        bound.arguments[param.name] = param.default
+                args, kwargs = bound.args, bound.kwargs
+
+            suffix = ','.join(normalize_arg(arg) for arg in args)
+            if kwargs:
+                suffix += ',' + normalize_arg(kwargs)
+
+        if len(self._prefix) + len(suffix) > _MAX_KEY_LENGTH:
+            suffix = hashlib.sha1(suffix.encode('utf-8')).hexdigest()
+        return self._prefix + suffix
+
+
+def normalize_arg(value):
+    """deterministic string representation of a function argument, for
+        use in cache keys.
+    """
+    if type(value) in _SIMPLE_TYPES:
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return '(' + ','.join(normalize_arg(item) for item in value) + ')'
+    if isinstance(value, dict):
+        return '{' + ','.join(sorted(
+            normalize_arg(k) + ':' + normalize_arg(v) for k, v in value.items()
+        )) + '}'
+    if isinstance(value, (set, frozenset)):
+        return '{' + ','.join(sorted(normalize_arg(i) for i in value)) + '}'
+
+    raise TypeError(
+        "Can't build a cache key from {!r}, use key= instead".format(value))
@@ -0,0 +1,120 @@
+"""Finding the most used keys of a cache, in bounded memory.
+
+    tracker = HotKeyTracker(capacity=200, sample_rate=0.1)
+    cache.add_listener(tracker)
+    ...
+    tracker.top_by_count(10)
+"""
+import heapq
+import random
+import threading
+
+from .cache import CacheListener
+
+
+__ALL__ = ('HotKeyTracker',)
+
+
+class HotKeyTracker(CacheListener):
+    """Tracks the keys accessed most often, and those transferring the most
+        bytes, with the Space-Saving algorithm. Every operation with keys
+        (reads and writes) counts as an access of each key.
+
+        `capacity` - the number of keys tracked. Any key accessed more than
+            1/capacity of the time is guaranteed to be tracked; a few times
+            the number of keys wanted from `top_by_count` is plenty.
+        `sample_rate` - the fraction of operations recorded, to make the
+            cost negligible on busy caches. Counts are scaled up to match.
+
+        Counts are estimates. Each comes with the most it may be over by,
+        which is small for keys which really are hot. Bytes are the encoded
+        size of values, so are only measured for caches which encode, and
+        are split evenly between the keys of multi-key operations.
+    """
+    def __init__(self, capacity=100, sample_rate=1.0):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be > 0 and <= 1")
+
+        self._capacity = capacity
+        self._sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self.reset()
+
+    def on_operation(self, op):
+        if self._sample_rate < 1 and random.random() >= self._sample_rate:
+            return
+        if not op.keys:
+            return
+
+        weight = 1.0 / self._sample_rate
+        size = (op.bytes_read + op.bytes_written) * weight / len(op.keys)
+        with self._lock:
+            for key in op.keys:
+                self._counts.add(key, weight)
+                if size:
+                    self._bytes.add(key, size)
+
+    def top_by_count(self, n=10):
+        """returns: list of (key, estimated count, maximum overestimate)
+            for the `n` most accessed keys, most accessed first.
+        """
+        with self._lock:
+            return self._counts.top(n)
+
+    def top_by_bytes(self, n=10):
+        """returns: list of (key, estimated bytes, maximum overestimate)
+            for the `n` keys transferring the most bytes, most first.
+        """
+        with self._lock:
+            return self._bytes.top(n)
+
+    def reset(self):
+        """Forget every key tracked so far."""
+        with self._lock:
+            self._counts = _SpaceSaving(self._capacity)
+            self._bytes = _SpaceSaving(self._capacity)
+
+
+class _SpaceSaving(object):
+    """The Space-Saving heavy hitters algorithm (Metwally et al. 2005).
+
+        At most `capacity` keys are counted. A new key replaces the one with
+        the lowest count, and inherits that count as its possible error.
+        The lowest count is found with a heap, which holds an entry for each
+        change in count; stale entries are skipped when popped, and dropped
+        whenever the heap grows too large.
+    """
+    def __init__(self, capacity):
+        self._capacity = capacity
+        self._counts = {} # key -> [count, error]
+        self._heap = [] # (count, key)
+
+    def add(self, key, weight):
+        entry = self._counts.get(key)
+        if entry is not None:
+            entry[0] += weight
+        elif len(self._counts) < self._capacity:
+            entry = self._counts[key] = [weight, 0]
+        else:
+            min_count, min_key = self._pop_min()
+            del self._counts[min_key]
+            entry = self._counts[key] = [min_count + weight, min_count]
+
+        heapq.heappush(self._heap, (entry[0], key))
+        if len(self._heap) > 4 * self._capacity + 64:
+            self._heap = [(count, k) for k, (count, _) in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, key = heapq.heappop(self._heap)
+            entry = self._counts.get(key)
+            if entry is not None and entry[0] == count:
+                return count, key
+
+    def top(self, n):
+        ranked = sorted(
+            self._counts.items(), key=lambda item: item[1][0], reverse=True)
+        return [(key, count, error) for key, (count, error) in ranked[:n]]
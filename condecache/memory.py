@@ -0,0 +1,131 @@
+"""Estimating the memory used by the decoded values held by in-process
+    caches.
+
+    with context_cache:
+        ...
+        context_cache.memory_report()
+"""
+import collections
+import random
+import sys
+import types
+
+from ._six import integer_types, string_types
+
+
+__ALL__ = ('deep_size', 'memory_report')
+
+
+# Shared by everything that refers to them, so not counted.
+_SHARED_TYPES = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+    types.MethodType, type(None), bool,
+)
+# Don't refer to anything worth counting.
+_LEAF_TYPES = string_types + integer_types + (
+    bytes, bytearray, memoryview, float, complex,
+)
+_SEQUENCE_TYPES = (list, tuple, set, frozenset, collections.deque)
+
+
+def deep_size(value, seen=None):
+    """Estimate the memory used by `value` and everything it refers to, in
+        bytes. Objects referred to more than once are only counted once.
+        Classes, functions, modules, None and bools are shared, so aren't
+        counted.
+
+        `seen` - optional set of the ids of objects already counted, which
+            is added to.
+    """
+    if seen is None:
+        seen = set()
+
+    size = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj, 0)
+
+        if isinstance(obj, _LEAF_TYPES):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, _SEQUENCE_TYPES):
+            stack.extend(obj)
+        else:
+            attrs = getattr(obj, '__dict__', None)
+            if attrs is not None:
+                stack.append(attrs)
+            stack.extend(_slot_values(obj))
+    return size
+
+
+def _slot_values(obj):
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get('__slots__', ())
+        if isinstance(slots, string_types):
+            slots = (slots,)
+        for name in slots:
+            if name in ('__dict__', '__weakref__'):
+                continue
+            try:
+                yield getattr(obj, name)
+            except AttributeError: # unset slot
+                pass
+
+
+def memory_report(entries, sample_size=1000, largest=10,
+                  container_bytes=None):
+    """Estimate the memory used by a dict of cache entries.
+
+        `entries` - dict of key -> value.
+        `sample_size` - with more entries than this, only a random sample
+            of them is measured, and the total is extrapolated.
+        `largest` - how many of the largest entries measured to list.
+        `container_bytes` - the size of the container holding the entries,
+            if not `entries` itself, e.g. when given a filtered copy.
+
+        returns: dict
+            {
+                'entries': <number of entries>,
+                'measured': <number of entries measured>,
+                'exact': <whether every entry was measured>,
+                'total_bytes': <estimated total, including the dict>,
+                'container_bytes': <size of the dict itself, or as given>,
+                'average_bytes': <average size of the entries measured>,
+                'largest': [[<key>, <bytes>], ...], largest first,
+            }
+
+        Each entry (key and value) is measured on its own, so objects
+        shared between entries are counted once for each.
+    """
+    items = list(entries.items())
+    count = len(items)
+    exact = count <= sample_size
+    if not exact:
+        items = random.sample(items, sample_size)
+
+    sizes = [
+        [key, deep_size(key) + deep_size(value)]
+        for key, value in items
+    ]
+    measured = sum(size for _, size in sizes)
+    average = float(measured) / len(sizes) if sizes else 0.0
+    container = sys.getsizeof(entries) if container_bytes is None \
+        else container_bytes
+    sizes.sort(key=lambda item: item[1], reverse=True)
+
+    return {
+        'entries': count,
+        'measured': len(sizes),
+        'exact': exact,
+        'total_bytes': container + (
+            measured if exact else int(average * count)),
+        'container_bytes': container,
+        'average_bytes': average,
+        'largest': sizes[:largest],
+    }
@@ -0,0 +1,149 @@
+"""Hit, miss, error, latency and size metrics for cache operations.
+
+    metrics = cache.enable_metrics()
+    ...
+    metrics.snapshot()
+"""
+import bisect
+import time
+
+from .cache import CacheListener
+
+
+__ALL__ = ('CacheMetrics', 'LATENCY_BUCKETS')
+
+
+# Upper bounds, in seconds, of the latency histogram buckets: 1, 2 and 5
+# times each power of ten from 10us to 5s, then 10s. Slower operations are
+# counted in a final overflow bucket.
+LATENCY_BUCKETS = tuple(
+    float('{}e{}'.format(mult, exp))
+    for exp in range(-5, 1)
+    for mult in (1, 2, 5)
+) + (10.0,)
+
+_QUANTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('p999', 0.999))
+
+
+class CacheMetrics(CacheListener):
+    """Collects metrics for each kind of operation (get, get_many, set, ...)
+        on a cache. Enable with `BaseCache.enable_metrics`.
+
+        Updates aren't locked, to keep them cheap, so counts may be very
+        slightly low when a cache is used by many threads at once.
+    """
+    def __init__(self):
+        self._stats = {}
+        self._since = time.time()
+
+    def on_operation(self, op):
+        stats = self._stats.get(op.name)
+        if stats is None:
+            stats = self._stats.setdefault(op.name, _OperationStats())
+        stats.record(op)
+
+    def snapshot(self):
+        """returns: dict
+            the metrics collected so far, which can be serialized as JSON:
+            {
+                'since': <time.time() collection started>,
+                'operations': {
+                    <name>: {
+                        'calls', 'hits', 'misses', 'errors', 'decode_errors',
+                        'bytes_read', 'bytes_written': <int>,
+                        'hit_ratio': <float, or None if no keys looked up>,
+                        'latency': {
+                            'total_seconds': <float>,
+                            'buckets': [[<upper bound>, <count>], ...],
+                            'overflow': <count of operations over 10s>,
+                            'p50', 'p90', 'p99', 'p999': <upper bound of the
+                                bucket the quantile falls in, or None>,
+                        },
+                    },
+                },
+            }
+        """
+        return {
+            'since': self._since,
+            'operations': {
+                name: stats.snapshot()
+                for name, stats in list(self._stats.items())
+            },
+        }
+
+    def reset(self):
+        """Discard the metrics collected so far."""
+        self._stats = {}
+        self._since = time.time()
+
+
+class _OperationStats(object):
+    __slots__ = (
+        'calls', 'hits', 'misses', 'errors', 'decode_errors', 'bytes_read',
+        'bytes_written', 'latency_counts', 'latency_total',
+    )
+
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.decode_errors = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_total = 0.0
+
+    def record(self, op):
+        self.calls += 1
+        self.hits += op.hits
+        self.misses += op.misses
+        self.decode_errors += op.decode_errors
+        self.bytes_read += op.bytes_read
+        self.bytes_written += op.bytes_written
+        if op.error is not None:
+            self.errors += 1
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, op.duration)
+        self.latency_counts[bucket] += 1
+        self.latency_total += op.duration
+
+    def snapshot(self):
+        counts = list(self.latency_counts)
+        looked_up = self.hits + self.misses
+
+        latency = {
+            'total_seconds': self.latency_total,
+            'buckets': [list(pair) for pair in zip(LATENCY_BUCKETS, counts)],
+            'overflow': counts[-1],
+        }
+        for name, quantile in _QUANTILES:
+            latency[name] = _estimate_quantile(counts, quantile)
+
+        return {
+            'calls': self.calls,
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'decode_errors': self.decode_errors,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'hit_ratio': float(self.hits) / looked_up if looked_up else None,
+            'latency': latency,
+        }
+
+
+def _estimate_quantile(counts, quantile):
+    """the upper bound of the bucket which the quantile falls in, or None
+        if there are no counts or it is in the overflow bucket.
+    """
+    total = sum(counts)
+    if not total:
+        return None
+
+    rank = quantile * total
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS, counts):
+        seen += count
+        if seen >= rank:
+            return bound
+    return None
@@ -0,0 +1,273 @@
+"""Replaying traces recorded with condecache.trace against simulated caches,
+    to choose a local cache's size and eviction policy from real traffic.
+
+    python -m condecache.simulator cache.trace --policies lru,lfu,fifo \\
+        --capacities 1000,10000,100000 --ttls 60,300
+
+Reads which miss fill the simulated cache, as a read-through cache would,
+and writes replace the value. Capacities are in entries, or in bytes of
+encoded values with --bytes. Traces recorded with a sample rate are
+simulated with capacities scaled down to match.
+"""
+from __future__ import print_function
+
+import argparse
+import collections
+import heapq
+import itertools
+import json
+import sys
+
+from .trace import READ, WRITE, DELETE, read_trace, read_trace_header
+
+
+__ALL__ = (
+    'LRUCache', 'LFUCache', 'FIFOCache', 'POLICIES',
+    'simulate', 'simulate_curves',
+)
+
+
+class _SimulatedCache(object):
+    """Base for the simulated caches, which only track keys, sizes and
+        expiry, not values.
+
+        `capacity` - the most entries (or bytes, if `by_bytes`) to hold.
+        `ttl` - seconds after being set that entries expire, or None.
+    """
+    def __init__(self, capacity, ttl=None, by_bytes=False):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.by_bytes = by_bytes
+        self._used = 0
+        self._entries = collections.OrderedDict() # key -> (weight, expiry)
+
+    def lookup(self, key, now):
+        """returns: True if `key` is held and hasn't expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        if entry[1] is not None and entry[1] <= now:
+            self.remove(key)
+            return False
+        self._accessed(key)
+        return True
+
+    def insert(self, key, size, now):
+        weight = max(size, 1) if self.by_bytes else 1
+        self.remove(key)
+        if weight > self.capacity:
+            return
+
+        expiry = now + self.ttl if self.ttl is not None else None
+        self._entries[key] = (weight, expiry)
+        self._used += weight
+        self._inserted(key)
+        while self._used > self.capacity:
+            self.remove(self._victim())
+
+    def remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._used -= entry[0]
+            self._removed(key)
+
+    # Policy hooks
+    def _accessed(self, key):
+        pass
+
+    def _inserted(self, key):
+        pass
+
+    def _removed(self, key):
+        pass
+
+    def _victim(self):
+        raise NotImplementedError
+
+
+class FIFOCache(_SimulatedCache):
+    """Evicts the entry inserted longest ago."""
+    def _victim(self):
+        return next(iter(self._entries))
+
+
+class LRUCache(_SimulatedCache):
+    """Evicts the entry used longest ago."""
+    def _accessed(self, key):
+        # OrderedDict.move_to_end is python 3.2+
+        self._entries[key] = self._entries.pop(key)
+
+    def _victim(self):
+        return next(iter(self._entries))
+
+
+class LFUCache(_SimulatedCache):
+    """Evicts the entry used least often since it was inserted, and of
+        those, the one used longest ago.
+
+        The least used entry is found with a heap, which holds an entry for
+        each use; stale entries are skipped when popped, and dropped
+        whenever the heap grows too large.
+    """
+    def __init__(self, *args, **kwargs):
+        super(LFUCache, self).__init__(*args, **kwargs)
+        self._counts = {} # key -> (count, last use)
+        self._heap = [] # (count, last use, key)
+        self._uses = itertools.count()
+
+    def _accessed(self, key):
+        self._push(key, self._counts[key][0] + 1)
+
+    def _inserted(self, key):
+        self._push(key, 1)
+
+    def _removed(self, key):
+        del self._counts[key]
+
+    def _push(self, key, count):
+        entry = self._counts[key] = (count, next(self._uses))
+        heapq.heappush(self._heap, entry + (key,))
+        if len(self._heap) > 4 * len(self._counts) + 64:
+            self._heap = [
+                entry + (key,) for key, entry in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def _victim(self):
+        while True:
+            count, use, key = heapq.heappop(self._heap)
+            if self._counts.get(key) == (count, use):
+                return key
+
+
+POLICIES = collections.OrderedDict([
+    ('lru', LRUCache), ('lfu', LFUCache), ('fifo', FIFOCache),
+])
+
+
+def simulate(records, policy, capacity, ttl=None, by_bytes=False,
+             sample_rate=1.0):
+    """Replay trace records against a simulated cache.
+
+        `records` - iterable of TraceRecord.
+        `policy` - a name from POLICIES.
+        `capacity`, `ttl`, `by_bytes` - of the cache, see _SimulatedCache.
+        `sample_rate` - the trace's sample rate, which capacity is scaled
+            by.
+
+        returns: dict
+            {
+                'policy', 'capacity', 'ttl', 'by_bytes': <as given>,
+                'reads', 'hits': <int>,
+                'read_bytes', 'hit_bytes': <int>,
+                'hit_ratio': <float, or None if no reads>,
+                'byte_hit_ratio': <float, or None if no sizes are known>,
+            }
+    """
+    sim = POLICIES[policy](
+        max(1, int(capacity * sample_rate)), ttl, by_bytes)
+    sizes = {} # key -> last known size
+    reads = hits = read_bytes = hit_bytes = 0
+
+    for time, key, kind, size in records:
+        if size:
+            sizes[key] = size
+        else:
+            size = sizes.get(key, 0)
+
+        if kind == READ:
+            reads += 1
+            read_bytes += size
+            if sim.lookup(key, time):
+                hits += 1
+                hit_bytes += size
+            else:
+                sim.insert(key, size, time)
+        elif kind == WRITE:
+            sim.insert(key, size, time)
+        elif kind == DELETE:
+            sim.remove(key)
+            sizes.pop(key, None)
+
+    return {
+        'policy': policy,
+        'capacity': capacity,
+        'ttl': ttl,
+        'by_bytes': by_bytes,
+        'reads': reads,
+        'hits': hits,
+        'read_bytes': read_bytes,
+        'hit_bytes': hit_bytes,
+        'hit_ratio': float(hits) / reads if reads else None,
+        'byte_hit_ratio':
+            float(hit_bytes) / read_bytes if read_bytes else None,
+    }
+
+
+def simulate_curves(path, policies, capacities, ttls=(None,),
+                    by_bytes=False):
+    """Simulate every combination of policy, capacity and ttl for the
+        trace at `path`, which is read into memory once.
+
+        returns: list of dict, as `simulate`
+    """
+    with open(path, 'rb') as f:
+        sample_rate = read_trace_header(f)['sample_rate']
+    records = list(read_trace(path))
+
+    return [
+        simulate(records, policy, capacity, ttl, by_bytes, sample_rate)
+        for policy in policies
+        for ttl in ttls
+        for capacity in sorted(capacities)
+    ]
+
+
+def _list_of(convert):
+    return lambda value: [convert(item) for item in value.split(',')]
+
+
+def _ttl(value):
+    return None if value == 'none' else float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.split('\n')[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('\n', 2)[2])
+    parser.add_argument('trace', help="trace file from TraceRecorder")
+    parser.add_argument('--policies', type=_list_of(str),
+                        default=list(POLICIES))
+    parser.add_argument('--capacities', type=_list_of(int),
+                        default=[100, 1000, 10000, 100000])
+    parser.add_argument('--ttls', type=_list_of(_ttl), default=[None],
+                        help="comma separated seconds, or 'none'")
+    parser.add_argument('--bytes', dest='by_bytes', action='store_true',
+                        help="capacities are in bytes, not entries")
+    parser.add_argument('--json', help="file to write the results to")
+    args = parser.parse_args(argv)
+    for policy in args.policies:
+        if policy not in POLICIES:
+            parser.error("unknown policy {!r}".format(policy))
+
+    results = simulate_curves(
+        args.trace, args.policies, args.capacities, args.ttls, args.by_bytes)
+
+    print("{:<6} {:>8} {:>12} {:>10} {:>10}".format(
+        'policy', 'ttl', 'capacity', 'hit ratio', 'byte hit'))
+    for result in results:
+        print("{:<6} {:>8} {:>12} {:>10} {:>10}".format(
+            result['policy'], str(result['ttl']), result['capacity'],
+            _percent(result['hit_ratio']), _percent(result['byte_hit_ratio'])))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+def _percent(ratio):
+    return '{:.1%}'.format(ratio) if ratio is not None else '-'
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""A log of the slowest recent cache operations, kept in memory.
+
+    slowlog = SlowLog(threshold_seconds=0.05)
+    cache.add_listener(slowlog)
+    slowlog.install_signal_handler() # dump to stderr on SIGUSR1
+    ...
+    slowlog.entries()
+"""
+import collections
+import itertools
+import os
+import random
+import signal
+import sys
+import time
+import traceback
+
+from .cache import CacheListener
+
+
+__ALL__ = ('SlowLog',)
+
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+
+class SlowLog(CacheListener):
+    """Records operations which take at least `threshold_seconds`, keeping
+        the last `max_entries`.
+
+        `max_keys`, `max_key_length` - how many of an operation's keys are
+            kept, and how much of each.
+        `stack_sample_rate` - the fraction of entries which record where
+            the operation was called from, as getting the stack is slow.
+        `stack_depth` - how many frames of the stack are kept.
+    """
+    def __init__(self, threshold_seconds=0.1, max_entries=128, max_keys=5,
+                 max_key_length=100, stack_sample_rate=0.1, stack_depth=8):
+        self.threshold_seconds = threshold_seconds
+        self._entries = collections.deque(maxlen=max_entries)
+        self._max_keys = max_keys
+        self._max_key_length = max_key_length
+        self._stack_sample_rate = stack_sample_rate
+        self._stack_depth = stack_depth
+
+    def on_operation(self, op):
+        if op.duration < self.threshold_seconds:
+            return
+
+        stack = None
+        if self._stack_sample_rate and \
+                random.random() < self._stack_sample_rate:
+            stack = self._caller_stack()
+
+        keys = [
+            key if len(key) <= self._max_key_length
+            else key[:self._max_key_length] + '...'
+            for key in itertools.islice(op.keys, self._max_keys)
+        ]
+        # deque.append is atomic, so needs no lock.
+        self._entries.append({
+            'time': op.time,
+            'cache': op.cache.__class__.__name__,
+            'operation': op.name,
+            'keys': keys,
+            'key_count': len(op.keys),
+            'bytes_read': op.bytes_read,
+            'bytes_written': op.bytes_written,
+            'duration': op.duration,
+            'error': repr(op.error) if op.error is not None else None,
+            'stack': stack,
+        })
+
+    def entries(self, operation=None, min_duration=0):
+        """returns: list of dict
+            the entries recorded, newest first, optionally only those for
+            `operation` (e.g. 'get_many') or taking at least `min_duration`.
+            Each is:
+            {
+                'time': <time.time() the operation started>,
+                'cache': <class name>,
+                'operation': <name>,
+                'keys': <the first keys, truncated>,
+                'key_count', 'bytes_read', 'bytes_written': <int>,
+                'duration': <seconds>,
+                'error': <repr of the CacheError, or None>,
+                'stack': <list of 'file:line in function' for the calling
+                    code, innermost last, or None if not sampled>,
+            }
+        """
+        return [
+            entry for entry in reversed(list(self._entries))
+            if (operation is None or entry['operation'] == operation)
+            and entry['duration'] >= min_duration
+        ]
+
+    def clear(self):
+        """Discard the entries recorded so far."""
+        self._entries.clear()
+
+    def dump(self, file=None):
+        """Write the entries, newest first, to `file` (stderr by default)."""
+        file = file or sys.stderr
+        entries = self.entries()
+        file.write("condecache slowlog: {} entries\n".format(len(entries)))
+        for entry in entries:
+            file.write(
+                "{} {}.{} {:.1f}ms keys={} ({}) read={} written={} "
+                "error={}\n".format(
+                    time.strftime(
+                        '%Y-%m-%dT%H:%M:%S', time.localtime(entry['time'])),
+                    entry['cache'], entry['operation'],
+                    entry['duration'] * 1e3, entry['keys'],
+                    entry['key_count'], entry['bytes_read'],
+                    entry['bytes_written'], entry['error'],
+                ))
+            for frame in entry['stack'] or ():
+                file.write("    {}\n".format(frame))
+        file.flush()
+
+    def install_signal_handler(self, signum=None):
+        """Dump the entries to stderr whenever the process receives
+            `signum` (SIGUSR1 by default). Must be called from the main
+            thread.
+
+            returns: the previous handler for the signal.
+        """
+        if signum is None:
+            signum = signal.SIGUSR1
+        return signal.signal(signum, lambda signum, frame: self.dump())
+
+    def _caller_stack(self):
+        # Skip the frames inside this package, to start at the caller.
+        frames = [
+            frame for frame in traceback.extract_stack()
+            if not os.path.abspath(frame[0]).startswith(_PACKAGE_DIR)
+        ]
+        return [
+            '{}:{} in {}'.format(filename, line, function)
+            for filename, line, function, _ in frames[-self._stack_depth:]
+        ]
@@ -0,0 +1,165 @@
+"""Recording a compact binary trace of a cache's accesses, to replay with
+    condecache.simulator.
+
+    with TraceRecorder('/tmp/cache.trace', sample_rate=0.1) as recorder:
+        cache.add_listener(recorder)
+        ...
+        cache.remove_listener(recorder)
+
+    for record in read_trace('/tmp/cache.trace'):
+        ...
+"""
+import collections
+import hashlib
+import struct
+import threading
+
+from ._six import string_types
+from .cache import CacheListener
+from .data_tools import frame_magic
+
+
+__ALL__ = (
+    'TraceRecorder', 'TraceRecord', 'read_trace', 'read_trace_header',
+    'hash_key',
+    'READ', 'WRITE', 'DELETE',
+)
+
+
+# Kinds of access.
+READ = 0
+WRITE = 1
+DELETE = 2
+
+_OPERATION_KINDS = {
+    'get': READ, 'get_many': READ, 'get_stream': READ,
+    'get_and_touch': READ, 'get_many_and_touch': READ,
+    'set': WRITE, 'set_many': WRITE, 'add': WRITE, 'incr': WRITE,
+    'remove': DELETE, 'remove_many': DELETE,
+}
+
+_MAGIC = frame_magic(b'T')
+_VERSION = 1
+# version, sample rate
+_HEADER = struct.Struct('<Bd')
+# timestamp, key hash, kind, size
+_RECORD = struct.Struct('<dQBI')
+_MAX_SIZE = 2 ** 32 - 1
+
+# Keys are sampled by hash, so every access to a sampled key is recorded.
+_HASH_SPACE = 2 ** 64
+
+
+# A single access to a key. `kind` is READ, WRITE or DELETE.
+TraceRecord = collections.namedtuple(
+    'TraceRecord', ['time', 'key_hash', 'kind', 'size'])
+
+
+def hash_key(key):
+    """a 64 bit hash of `key`, as recorded in traces."""
+    if isinstance(key, string_types) and not isinstance(key, bytes):
+        key = key.encode('utf-8')
+    return struct.unpack('<Q', hashlib.sha1(key).digest()[:8])[0]
+
+
+class TraceRecorder(CacheListener):
+    """Writes a record of each key read, written or removed by the caches
+        it is added to, to `file` (a path, or a binary file object).
+
+        `sample_rate` - the fraction of keys recorded. Keys are chosen by
+            hash, so all accesses to the keys chosen are recorded, and the
+            simulator can scale cache sizes to match.
+
+        Keys are recorded as hashes, and sizes are of encoded values, so
+        are 0 for caches which don't encode. The size of each key in multi
+        key operations is the average. Close the recorder (or use it as a
+        context manager) to flush the trace.
+    """
+    def __init__(self, file, sample_rate=1.0):
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be > 0 and <= 1")
+
+        if isinstance(file, string_types):
+            self._file = open(file, 'wb')
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+        self._max_hash = int(sample_rate * _HASH_SPACE)
+        self._lock = threading.Lock()
+        self._file.write(_MAGIC + _HEADER.pack(_VERSION, sample_rate))
+
+    def on_operation(self, op):
+        kind = _OPERATION_KINDS.get(op.name)
+        if kind is None or not op.keys or op.error is not None:
+            return
+
+        size = (op.bytes_read + op.bytes_written) // len(op.keys)
+        size = min(size, _MAX_SIZE)
+        records = []
+        for key in op.keys:
+            key_hash = hash_key(key)
+            if key_hash < self._max_hash:
+                records.append(_RECORD.pack(op.time, key_hash, kind, size))
+
+        if records:
+            with self._lock:
+                if self._file is not None:
+                    self._file.write(b''.join(records))
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            if self._owns_file:
+                self._file.close()
+            else:
+                self._file.flush()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_trace_header(file):
+    """read the header of a trace from a binary file object.
+
+        returns: dict
+            {'version': <int>, 'sample_rate': <float>}
+    """
+    magic = file.read(len(_MAGIC))
+    if magic != _MAGIC:
+        raise ValueError("Not a condecache trace")
+    version, sample_rate = _HEADER.unpack(file.read(_HEADER.size))
+    if version != _VERSION:
+        raise ValueError("Unsupported trace version {}".format(version))
+    return {'version': version, 'sample_rate': sample_rate}
+
+
+def read_trace(file, chunk_records=4096):
+    """Iterate over the records in a trace.
+
+        `file` - a path, or a binary file object positioned at the start.
+
+        returns: iterator of TraceRecord
+    """
+    if isinstance(file, string_types):
+        with open(file, 'rb') as f:
+            for record in read_trace(f, chunk_records):
+                yield record
+        return
+
+    read_trace_header(file)
+    while True:
+        chunk = file.read(_RECORD.size * chunk_records)
+        if not chunk:
+            return
+        usable = len(chunk) - len(chunk) % _RECORD.size
+        for offset in range(0, usable, _RECORD.size):
+            yield TraceRecord(*_RECORD.unpack_from(chunk, offset))
+        if usable != len(chunk):
+            # Truncated, e.g. by a crash while recording.
+            return
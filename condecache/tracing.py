@@ -0,0 +1,162 @@
+"""Tracing of cache operations, and of the remote calls made for them, so
+    time spent in the cache shows up in logs or traces.
+
+    cache.add_listener(LoggingTracer(threshold_seconds=0.01))
+    cache.add_listener(OpenTelemetryTracer())
+"""
+import logging
+import threading
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+from .cache import CacheListener
+
+
+__ALL__ = ('LoggingTracer', 'OpenTelemetryTracer')
+
+
+def _operation_attributes(op, prefix_depth, separator):
+    attributes = {
+        'cache.operation': op.name,
+        'cache.class': op.cache.__class__.__name__,
+        'cache.key_count': len(op.keys),
+        'cache.prefix': op.prefix(prefix_depth, separator),
+        'cache.hits': op.hits,
+        'cache.misses': op.misses,
+        'cache.bytes_read': op.bytes_read,
+        'cache.bytes_written': op.bytes_written,
+    }
+    if op.error is not None:
+        attributes['error.type'] = op.error.__class__.__name__
+    return attributes
+
+
+class LoggingTracer(CacheListener):
+    """Logs each operation, and each remote call made for it, which takes
+        at least `threshold_seconds`.
+
+        `logger` - the logger to use, 'condecache.tracing' by default.
+        `level` - the level to log at.
+        `prefix_depth`, `separator` - how key prefixes are found, as
+            Operation.prefix.
+    """
+    def __init__(self, logger=None, level=logging.DEBUG, threshold_seconds=0,
+                 prefix_depth=1, separator=':'):
+        self._logger = logger or logging.getLogger(__name__)
+        self._level = level
+        self._threshold = threshold_seconds
+        self._prefix_depth = prefix_depth
+        self._separator = separator
+
+    def on_operation(self, op):
+        if op.duration < self._threshold or \
+                not self._logger.isEnabledFor(self._level):
+            return
+
+        self._logger.log(
+            self._level,
+            "cache %s.%s keys=%d prefix=%s bytes=%d duration=%.3fms error=%s",
+            op.cache.__class__.__name__, op.name, len(op.keys),
+            op.prefix(self._prefix_depth, self._separator),
+            op.bytes_read + op.bytes_written, op.duration * 1e3,
+            op.error.__class__.__name__ if op.error is not None else None,
+        )
+
+    def on_remote_call(self, call):
+        if call.duration < self._threshold or \
+                not self._logger.isEnabledFor(self._level):
+            return
+
+        self._logger.log(
+            self._level,
+            "cache %s remote call %s for %s duration=%.3fms error=%s",
+            call.cache.__class__.__name__, call.name,
+            call.op.name if call.op is not None else None,
+            call.duration * 1e3,
+            call.error.__class__.__name__ if call.error is not None else None,
+        )
+
+
+class OpenTelemetryTracer(CacheListener):
+    """Records a span for each operation, with a child span for each remote
+        call made for it.
+
+        `tracer` - an OpenTelemetry tracer, or anything with the same
+            `start_span` method. By default, the global tracer provider's
+            tracer for 'condecache', which needs opentelemetry-api.
+        `prefix_depth`, `separator` - how key prefixes are found, as
+            Operation.prefix.
+
+        Spans are made current while operations run when opentelemetry is
+        installed, so spans started by other instrumentation (e.g. of the
+        redis client) are children of the cache's.
+    """
+    def __init__(self, tracer=None, prefix_depth=1, separator=':'):
+        if tracer is None:
+            if otel_trace is None:
+                raise ImportError(
+                    "opentelemetry-api is needed for the default tracer")
+            tracer = otel_trace.get_tracer('condecache')
+
+        self._tracer = tracer
+        self._prefix_depth = prefix_depth
+        self._separator = separator
+        # Operation -> (span, context manager making it current)
+        self._spans = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, op):
+        span = self._tracer.start_span(
+            'cache ' + op.name, start_time=_nanoseconds(op.time))
+        activation = None
+        if otel_trace is not None:
+            activation = otel_trace.use_span(span, end_on_exit=False)
+            activation.__enter__()
+        with self._lock:
+            self._spans[op] = (span, activation)
+
+    def on_operation(self, op):
+        with self._lock:
+            span, activation = self._spans.pop(op, (None, None))
+        if span is None:
+            # Added while the operation was running.
+            return
+
+        if activation is not None:
+            activation.__exit__(None, None, None)
+        for name, value in _operation_attributes(
+                op, self._prefix_depth, self._separator).items():
+            span.set_attribute(name, value)
+        if op.error is not None:
+            _record_error(span, op.error)
+        span.end(end_time=_nanoseconds(op.time + op.duration))
+
+    def on_remote_call(self, call):
+        # Finished already, so started with its own times. It is still
+        # parented correctly, as the operation's span is current.
+        span = self._tracer.start_span(
+            'cache remote ' + call.name,
+            start_time=_nanoseconds(call.time),
+            attributes={
+                'db.operation': call.name,
+                'cache.class': call.cache.__class__.__name__,
+            },
+        )
+        if call.error is not None:
+            span.set_attribute('error.type', call.error.__class__.__name__)
+            _record_error(span, call.error)
+        span.end(end_time=_nanoseconds(call.time + call.duration))
+
+
+def _record_error(span, error):
+    span.record_exception(error)
+    if otel_trace is not None:
+        span.set_status(
+            otel_trace.Status(otel_trace.StatusCode.ERROR, str(error)))
+
+
+def _nanoseconds(timestamp):
+    return int(timestamp * 1e9)
@@ -0,0 +1,184 @@
+# Tests of asyncio support. These use python 3.7+ syntax and APIs, so are
+# only imported by test_aio where they can run.
+import asyncio
+from unittest import TestCase
+
+import mock
+
+from condecache import cache, coalescing, decorators
+
+
+class TestCachedCoroutine(TestCase):
+    def setUp(self):
+        self.cache = cache.LocalContextCache()
+        self.cache.__enter__()
+
+    def tearDown(self):
+        self.cache.__exit__(None, None, None)
+
+    def test_coroutine(self):
+        calls = []
+
+        @decorators.cached(self.cache)
+        async def load(a):
+            calls.append(a)
+            await asyncio.sleep(0)
+            return a * 2
+
+        async def main():
+            return [await load(2), await load(2)]
+
+        self.assertEqual(asyncio.run(main()), [4, 4])
+        self.assertEqual(calls, [2])
+        self.assertTrue(asyncio.iscoroutinefunction(load))
+
+    def test_coroutine_single_flight(self):
+        calls = []
+
+        @decorators.cached(self.cache, single_flight=True)
+        async def load(a):
+            calls.append(a)
+            await asyncio.sleep(0.01)
+            return a * 2
+
+        async def main():
+            return await asyncio.gather(*[load(2) for _ in range(5)])
+
+        self.assertEqual(asyncio.run(main()), [4] * 5)
+        self.assertEqual(calls, [2])
+
+    def test_coroutine_single_flight_error(self):
+
+        @decorators.cached(self.cache, single_flight=True)
+        async def load(a):
+            await asyncio.sleep(0.01)
+            raise ValueError("TEST")
+
+        async def main():
+            return await asyncio.gather(
+                    *[load(2) for _ in range(3)], return_exceptions=True)
+
+        results = asyncio.run(main())
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+    def test_coroutine_single_flight_leader_cancelled(self):
+        calls = []
+
+        @decorators.cached(self.cache, single_flight=True)
+        async def load(a):
+            calls.append(a)
+            await asyncio.sleep(0.01)
+            return a * 2
+
+        async def main():
+            leader = asyncio.ensure_future(load(2))
+            followers = [asyncio.ensure_future(load(2)) for _ in range(2)]
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await asyncio.gather(
+                    leader, *followers, return_exceptions=True)
+
+        results = asyncio.run(main())
+
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertEqual(results[1:], [4, 4])
+        # One of the followers took over.
+        self.assertEqual(calls, [2, 2])
+
+    def test_coroutine_single_flight_follower_cancelled(self):
+        @decorators.cached(self.cache, single_flight=True)
+        async def load(a):
+            await asyncio.sleep(0.01)
+            return a * 2
+
+        async def main():
+            leader = asyncio.ensure_future(load(2))
+            follower = asyncio.ensure_future(load(2))
+            await asyncio.sleep(0)
+            follower.cancel()
+            return await asyncio.gather(
+                    leader, follower, return_exceptions=True)
+
+        leader, follower = asyncio.run(main())
+
+        self.assertEqual(leader, 4)
+        self.assertIsInstance(follower, asyncio.CancelledError)
+
+
+class TestAsyncCoalescingCache(TestCase):
+    def _remote(self, values):
+        remote = mock.Mock(name='remote_cache')
+        remote.get_many.side_effect = lambda keys, default: {
+            key: values.get(key, default) for key in keys
+        }
+        return remote
+
+    def test_gets_in_same_tick_are_batched(self):
+        remote = self._remote({'key_a': 'val_a', 'key_b': 'val_b'})
+        inst = coalescing.AsyncCoalescingCache(remote)
+
+        async def main():
+            return await asyncio.gather(
+                inst.get('key_a'), inst.get('key_b'), inst.get('key_a'),
+                inst.get('key_c', 'default'),
+            )
+
+        result = asyncio.run(main())
+
+        self.assertEqual(result, ['val_a', 'val_b', 'val_a', 'default'])
+        remote.get_many.assert_called_once_with(
+                ['key_a', 'key_b', 'key_c'], cache._DEFAULT)
+
+    def test_window(self):
+        remote = self._remote({'key_a': 'val_a', 'key_b': 'val_b'})
+        inst = coalescing.AsyncCoalescingCache(remote, window_seconds=0.05)
+
+        async def get_later(key):
+            await asyncio.sleep(0.01)
+            return await inst.get(key)
+
+        async def main():
+            return await asyncio.gather(inst.get('key_a'), get_later('key_b'))
+
+        self.assertEqual(asyncio.run(main()), ['val_a', 'val_b'])
+        self.assertEqual(remote.get_many.call_count, 1)
+
+    def test_separate_ticks(self):
+        remote = self._remote({'key_a': 'val_a'})
+        inst = coalescing.AsyncCoalescingCache(remote)
+
+        async def main():
+            return [await inst.get('key_a'), await inst.get('key_a')]
+
+        self.assertEqual(asyncio.run(main()), ['val_a', 'val_a'])
+        self.assertEqual(remote.get_many.call_count, 2)
+
+    def test_error(self):
+        remote = mock.Mock(name='remote_cache')
+        remote.get_many.side_effect = RuntimeError("TEST")
+        inst = coalescing.AsyncCoalescingCache(remote)
+
+        async def main():
+            return await asyncio.gather(
+                    inst.get('key_a'), inst.get('key_b'),
+                    return_exceptions=True)
+
+        result = asyncio.run(main())
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in result))
+
+
+class TestPrefetchAsync(TestCase):
+    def test_prefetch_async(self):
+        remote = mock.Mock(name='remote_cache')
+        remote.get_many.return_value = {'key_a': 'val_a'}
+        inst = cache.LocalContextAndRemoteTTLCache(remote)
+
+        async def main():
+            with inst:
+                await inst.prefetch_async(['key_a'])
+                return inst.get('key_a')
+
+        self.assertEqual(asyncio.run(main()), 'val_a')
+        remote.get_many.assert_called_once_with(['key_a'], cache._DEFAULT)
+        remote.get.assert_not_called()
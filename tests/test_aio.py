@@ -0,0 +1,8 @@
+# Tests of asyncio support. They use async syntax and asyncio.run, so are kept
+# in _aio_cases, which is only imported on python 3.7+.
+import sys
+
+if sys.version_info >= (3, 7):
+    from _aio_cases import (
+        TestCachedCoroutine, TestAsyncCoalescingCache, TestPrefetchAsync,
+    )
@@ -1,8 +1,10 @@
 import sys
 import datetime
+import threading
 from unittest import TestCase
 import zlib
 import json
+import pickle
 
 import mock
 
@@ -144,6 +146,29 @@ class TestBaseRedisCache(TestCase):
         except cache.RemoteCacheCommError:
             self.fail("RemoteCacheCommError raised")
 
+    def test_set_many(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        pipe = redis_conn.pipeline.return_value
+        inst = self._cls(redis_conn, prefix='pre')
+        inst._default_ttl = 1000
+
+        inst._set_many({'key_a': 'val_a', 'key_b': 'val_b'}, None)
+
+        redis_conn.pipeline.assert_called_once_with(transaction=False)
+        pipe.set.assert_has_calls([
+            mock.call('pre:key_a', 'val_a', ex=1000),
+            mock.call('pre:key_b', 'val_b', ex=1000),
+        ], any_order=True)
+        pipe.execute.assert_called_once_with()
+
+    def test_set_many_redis_error_raised_internally(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.pipeline.return_value.execute.side_effect = Exception("X")
+        inst = self._cls(redis_conn)
+
+        with self.assertRaises(cache.RemoteCacheCommError):
+            inst._set_many({'key_a': 'val_a'}, 1)
+
     def test_remove_exists(self):
         redis_conn = mock.Mock(name='redis_conn')
         redis_conn.delete.return_value = 1
@@ -186,6 +211,338 @@ class TestBaseRedisCache(TestCase):
         except cache.RemoteCacheCommError:
             self.fail("RemoteCacheCommError raised")
 
+    def test_add(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.set.return_value = True
+        inst = self._cls(redis_conn, prefix='app')
+
+        result = inst._add('key_a', b'value', 9.6)
+
+        self.assertIs(result, True)
+        redis_conn.set.assert_called_once_with(
+                'app:key_a', b'value', ex=10, nx=True)
+
+    def test_add_exists(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.set.return_value = None
+        inst = self._cls(redis_conn)
+
+        self.assertIs(inst._add('key_a', b'value', 5), False)
+
+    def test_incr(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        pipe = redis_conn.pipeline.return_value
+        pipe.execute.return_value = [None, 4]
+        inst = self._cls(redis_conn, prefix='app')
+        inst._default_ttl = 1000
+
+        result = inst.incr('key_a', 3)
+
+        self.assertEqual(result, 4)
+        pipe.set.assert_called_once_with('app:key_a', 0, ex=1000, nx=True)
+        pipe.incrby.assert_called_once_with('app:key_a', 3)
+        pipe.execute.assert_called_once_with()
+        redis_conn.get.assert_not_called()
+
+    def test_incr_redis_error_not_raised_externally(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.pipeline.return_value.execute.side_effect = \
+            Exception("CATCH ME")
+        inst = self._cls(redis_conn)
+
+        self.assertIs(inst.decr('key_a', ttl_seconds=5), None)
+
+    def test_touch(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        script = redis_conn.register_script.return_value
+        script.return_value = 1
+        inst = self._cls(redis_conn, prefix='app')
+
+        result = inst._touch('key_a', 5.4)
+
+        self.assertIs(result, True)
+        redis_conn.register_script.assert_called_once_with(
+                cache._TOUCH_SCRIPT)
+        script.assert_called_once_with(
+                keys=['app:key_a'], args=[5, 5, cache._ABSENT_MARKER])
+
+    def test_touch_absent_ttl(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        script = redis_conn.register_script.return_value
+        inst = self._cls(redis_conn)
+        inst.negative_ttl_seconds = 10
+
+        inst._touch('key_a', 300)
+        inst._touch('key_b', None)
+
+        script.assert_has_calls([
+            mock.call(keys=['key_a'], args=[300, 10, cache._ABSENT_MARKER]),
+            mock.call(keys=['key_b'], args=[60, 10, cache._ABSENT_MARKER]),
+        ])
+
+    def test_touch_many(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        pipe = redis_conn.pipeline.return_value
+        pipe.execute.return_value = [1, 0]
+        inst = self._cls(redis_conn, prefix='app')
+
+        result = inst._touch_many(['key_a', 'key_b'], 5)
+
+        self.assertEqual(result, 1)
+        redis_conn.pipeline.assert_called_once_with(transaction=False)
+        # A script per key, so each only touches one, run with EVALSHA
+        # in the pipeline so it's a single round trip.
+        sha = cache._script_sha(cache._TOUCH_SCRIPT)
+        pipe.evalsha.assert_has_calls([
+            mock.call(sha, 1, 'app:key_a', 5, 5, cache._ABSENT_MARKER),
+            mock.call(sha, 1, 'app:key_b', 5, 5, cache._ABSENT_MARKER),
+        ])
+        pipe.execute.assert_called_once_with(raise_on_error=False)
+        redis_conn.register_script.assert_not_called()
+        redis_conn.script_load.assert_not_called()
+
+    def test_scripts_loaded_if_missing(self):
+        class NoScriptError(Exception):
+            pass
+
+        redis_conn = mock.Mock(name='redis_conn')
+        pipe = redis_conn.pipeline.return_value
+        pipe.execute.side_effect = [[1, NoScriptError("No matching script")],
+                                    [1, 1]]
+        inst = self._cls(redis_conn)
+
+        result = inst._touch_many(['key_a', 'key_b'], 5)
+
+        self.assertEqual(result, 2)
+        redis_conn.script_load.assert_called_once_with(cache._TOUCH_SCRIPT)
+        self.assertEqual(pipe.execute.call_count, 2)
+
+    def test_script_error_raised_internally(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.pipeline.return_value.execute.return_value = [
+            1, ValueError("WRONGTYPE")]
+        inst = self._cls(redis_conn)
+
+        with self.assertRaises(cache.RemoteCacheCommError):
+            inst._touch_many(['key_a', 'key_b'], 5)
+        redis_conn.script_load.assert_not_called()
+
+    def test_get_and_touch(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        script = redis_conn.register_script.return_value
+        script.return_value = b'value'
+        inst = self._cls(redis_conn, prefix='app')
+
+        result = inst._get_and_touch('key_a', 5, cache._DEFAULT)
+
+        self.assertEqual(result, b'value')
+        redis_conn.register_script.assert_called_once_with(
+                cache._GET_AND_TOUCH_SCRIPT)
+        script.assert_called_once_with(
+                keys=['app:key_a'], args=[5, 5, cache._ABSENT_MARKER])
+        redis_conn.set.assert_not_called()
+
+    def test_get_and_touch_not_exists(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.register_script.return_value.return_value = None
+        inst = self._cls(redis_conn)
+        default = mock.Mock(name='default')
+
+        self.assertIs(inst._get_and_touch('key_a', 5, default), default)
+
+    def test_get_many_and_touch(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        pipe = redis_conn.pipeline.return_value
+        pipe.execute.return_value = [b'value', None]
+        inst = self._cls(redis_conn, prefix='app')
+        default = mock.Mock(name='default')
+
+        result = inst._get_many_and_touch(['key_a', 'key_b'], 5, default)
+
+        self.assertEqual(result, [b'value', default])
+        sha = cache._script_sha(cache._GET_AND_TOUCH_SCRIPT)
+        pipe.evalsha.assert_has_calls([
+            mock.call(sha, 1, 'app:key_a', 5, 5, cache._ABSENT_MARKER),
+            mock.call(sha, 1, 'app:key_b', 5, 5, cache._ABSENT_MARKER),
+        ])
+        pipe.execute.assert_called_once_with(raise_on_error=False)
+
+    def test_touch_redis_error_not_raised_externally(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.register_script.return_value.side_effect = \
+            Exception("CATCH ME")
+        redis_conn.pipeline.return_value.execute.side_effect = \
+            Exception("CATCH ME")
+        inst = self._cls(redis_conn)
+
+        self.assertIs(inst.touch('key_a', 5), False)
+        self.assertEqual(inst.touch_many(['key_a'], 5), 0)
+        self.assertIs(inst.get_and_touch('key_a', 5), None)
+        self.assertEqual(inst.get_many_and_touch(['key_a'], 5),
+                         {'key_a': None})
+
+    def test_set_tagged(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        script = redis_conn.register_script.return_value
+        inst = self._cls(redis_conn, prefix='app')
+
+        inst._set_tagged('key_a', b'value', 56.6, ['article:1', 'news'])
+        inst._set_tagged('key_b', b'value', 56.6, ['news'])
+
+        redis_conn.register_script.assert_called_once_with(
+                cache._SET_TAGGED_SCRIPT)
+        script.assert_has_calls([
+            mock.call(keys=['app:key_a', 'app:__tag__:article:1',
+                            'app:__tag__:news'],
+                      args=[b'value', 57]),
+            mock.call(keys=['app:key_b', 'app:__tag__:news'],
+                      args=[b'value', 57]),
+        ])
+        redis_conn.eval.assert_not_called()
+        redis_conn.set.assert_not_called()
+
+    def test_set_tagged_namespaced(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.get.return_value = b'2'
+        script = redis_conn.register_script.return_value
+        inst = self._cls(redis_conn, namespace='news')
+        inst._default_ttl = 1000
+
+        inst._set_tagged('key_a', b'value', None, ['tag'])
+
+        script.assert_called_once_with(
+                keys=['__ns__:news:2:key_a', '__tag__:tag'],
+                args=[b'value', 1000])
+
+    def test_invalidate_tags(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        read_pipe, delete_pipe = mock.Mock(name='read'), mock.Mock(name='del')
+        redis_conn.pipeline.side_effect = [read_pipe, delete_pipe]
+        members = ['app:key_{}'.format(i).encode() for i in range(1500)]
+        read_pipe.execute.return_value = [set(members), set()]
+        delete_pipe.execute.return_value = [1000, 2]
+        inst = self._cls(redis_conn, prefix='app')
+
+        result = inst.invalidate_tags(['article:1', 'news'])
+
+        self.assertEqual(result, 1002)
+        read_pipe.smembers.assert_has_calls([
+            mock.call('app:__tag__:article:1'), mock.call('app:__tag__:news'),
+        ])
+        # Every key touched is passed in KEYS, in batches.
+        self.assertEqual(delete_pipe.evalsha.call_count, 2)
+        removed = []
+        for call in delete_pipe.evalsha.call_args_list:
+            sha, numkeys, tag_key = call[0][:3]
+            self.assertEqual(
+                sha, cache._script_sha(cache._INVALIDATE_TAG_SCRIPT))
+            self.assertEqual(tag_key, 'app:__tag__:article:1')
+            self.assertEqual(numkeys, len(call[0]) - 2)
+            self.assertLessEqual(numkeys - 1,
+                                 cache._INVALIDATE_TAG_BATCH_SIZE)
+            removed.extend(call[0][3:])
+        self.assertEqual(sorted(removed), sorted(members))
+        delete_pipe.execute.assert_called_once_with(raise_on_error=False)
+        redis_conn.eval.assert_not_called()
+
+    def test_tags_redis_error_not_raised_externally(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.register_script.return_value.side_effect = \
+            Exception("CATCH ME")
+        redis_conn.pipeline.return_value.execute.side_effect = \
+            Exception("CATCH ME")
+        inst = self._cls(redis_conn)
+
+        inst.set('key_a', b'value', 5, tags=['tag'])
+        self.assertEqual(inst.invalidate_tags(['tag']), 0)
+
+    def _namespaced(self, version=None):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.get.side_effect = lambda key: (
+                version if key == 'app:__ns__:news' else 'val')
+        redis_conn.incr.return_value = 8
+        inst = self._cls(redis_conn, prefix='app', namespace='news')
+        return inst, redis_conn
+
+    def test_namespace_key(self):
+        inst, redis_conn = self._namespaced(b'7')
+
+        self.assertEqual(inst._make_key('key_a'), 'app:__ns__:news:7:key_a')
+        self.assertEqual(inst._make_key('key_b'), 'app:__ns__:news:7:key_b')
+        # The version is only read once while it's cached.
+        redis_conn.get.assert_called_once_with('app:__ns__:news')
+
+    def test_namespace_key_no_version(self):
+        inst, redis_conn = self._namespaced(None)
+
+        self.assertEqual(inst._make_key('key_a'), 'app:__ns__:news:0:key_a')
+
+    def test_namespace_version_expires(self):
+        inst, redis_conn = self._namespaced(b'7')
+        inst.namespace_version_ttl = 0
+
+        inst._make_key('key_a')
+        inst._make_key('key_a')
+
+        self.assertEqual(redis_conn.get.call_count, 2)
+
+    def test_bump_namespace(self):
+        inst, redis_conn = self._namespaced(b'7')
+        inst._make_key('key_a')
+
+        result = inst.bump_namespace()
+
+        self.assertEqual(result, 8)
+        redis_conn.incr.assert_called_once_with('app:__ns__:news')
+        self.assertEqual(inst._make_key('key_a'), 'app:__ns__:news:8:key_a')
+        redis_conn.get.assert_called_once_with('app:__ns__:news')
+
+    def test_bump_namespace_error(self):
+        inst, redis_conn = self._namespaced(b'7')
+        redis_conn.incr.side_effect = Exception("CATCH ME")
+
+        self.assertIs(inst.bump_namespace(), None)
+
+    def test_bump_namespace_without_namespace(self):
+        inst = self._cls(mock.Mock(name='redis_conn'))
+
+        with self.assertRaises(ValueError):
+            inst.bump_namespace()
+
+    def test_namespace_version_error_not_raised_externally(self):
+        inst, redis_conn = self._namespaced()
+        redis_conn.get.side_effect = Exception("CATCH ME")
+        default = mock.Mock(name='default')
+
+        self.assertIs(inst.get('key_a', default), default)
+
+    def test_namespace_version_invalid(self):
+        inst, redis_conn = self._namespaced(b'not a number')
+        default = mock.Mock(name='default')
+
+        with self.assertRaises(cache.CacheError):
+            inst._make_key('key_a')
+        self.assertIs(inst.get('key_a', default), default)
+
+    def test_namespace_with_separator(self):
+        redis_conn = mock.Mock(name='redis_conn')
+
+        with self.assertRaises(ValueError):
+            self._cls(redis_conn, namespace='news:uk')
+        with self.assertRaises(ValueError):
+            self._cls(redis_conn).in_namespace('news:uk')
+
+    def test_in_namespace(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.get.return_value = b'3'
+        inst = self._cls(redis_conn, prefix='app')
+
+        news = inst.in_namespace('news')
+
+        self.assertEqual(inst._make_key('key_a'), 'app:key_a')
+        self.assertEqual(news._make_key('key_a'), 'app:__ns__:news:3:key_a')
+        self.assertIs(news._conn, redis_conn)
+
 
 class TestBaseContextCache(TestCase):
     _cls = cache.BaseContextCache
@@ -288,6 +645,63 @@ class TestLocalContextCache(TestCase):
         get_result = inst.get('key_a', default)
         self.assertIs(get_result, default)
 
+    def test_add(self):
+        inst = self._cls()
+
+        with inst:
+            result_1 = inst.add('key_a', 'val_1')
+            result_2 = inst.add('key_a', 'val_2')
+            value = inst.get('key_a')
+
+        self.assertIs(result_1, True)
+        self.assertIs(result_2, False)
+        self.assertEqual(value, 'val_1')
+
+    def test_incr(self):
+        inst = self._cls()
+
+        with inst:
+            results = [inst.incr('key_a'), inst.incr('key_a', 5),
+                       inst.decr('key_a', 2)]
+            value = inst.get('key_a')
+
+        self.assertEqual(results, [1, 6, 4])
+        self.assertEqual(value, 4)
+
+    def test_add_and_incr_not_entered(self):
+        inst = self._cls()
+
+        self.assertIs(inst.add('key_a', 'val_1'), False)
+        self.assertIs(inst.incr('key_b'), None)
+        self.assertEqual(inst._cache, {})
+
+    def test_incr_not_integer(self):
+        inst = self._cls()
+
+        with inst:
+            inst.set('key_a', 'val_1')
+            inst.set('key_b', True)
+
+            self.assertIs(inst.incr('key_a'), None)
+            self.assertIs(inst.incr('key_b'), None)
+            self.assertEqual(inst.get('key_a'), 'val_1')
+
+    def test_incr_concurrent(self):
+        inst = self._cls()
+
+        def incr():
+            for _ in range(1000):
+                inst.incr('key_a')
+
+        with inst:
+            threads = [threading.Thread(target=incr) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(5)
+
+            self.assertEqual(inst.get('key_a'), 4000)
+
     def test_remove(self):
         inst = self._cls()
 
@@ -533,6 +947,263 @@ class TestLocalContextAndRemoteTTLCache(TestCase):
         remote_cache.get_many.assert_not_called()
         self.assertEqual(expected, result)
 
+    def test_set_many_not_entered(self):
+        remote_cache = mock.Mock(name='remote_cache')
+        remote_cache.get.return_value = self._default
+        inst = self._cls(remote_cache)
+        values = {'key_1': mock.Mock(name='val_1')}
+
+        inst.set_many(values, 5)
+
+        remote_cache.set_many.assert_called_once_with(values, 5.0)
+        self.assertIs(inst.get('key_1'), None)
+
+    def test_set_many_entered(self):
+        remote_cache = mock.Mock(name='remote_cache')
+        inst = self._cls(remote_cache)
+        values = {'key_1': mock.Mock(name='val_1')}
+
+        with inst:
+            inst.set_many(values, 5)
+            result = inst.get('key_1')
+
+        remote_cache.set_many.assert_called_once_with(values, 5.0)
+        remote_cache.get.assert_not_called()
+        self.assertIs(result, values['key_1'])
+
+    def test_get_and_touch_entered(self):
+        remote_cache = mock.Mock(name='remote_cache')
+        remote_cache.get_and_touch.return_value = 'val_a'
+        inst = self._cls(remote_cache)
+
+        with inst:
+            result_1 = inst.get_and_touch('key_a', 5)
+            result_2 = inst.get_and_touch('key_a', 6)
+
+        self.assertEqual([result_1, result_2], ['val_a', 'val_a'])
+        remote_cache.get_and_touch.assert_called_once_with(
+                'key_a', 5.0, self._default)
+        remote_cache.touch.assert_called_once_with('key_a', 6.0)
+
+    def test_get_many_and_touch_entered(self):
+        remote_cache = mock.Mock(name='remote_cache')
+        remote_cache.get_many_and_touch.return_value = {
+            'key_b': 'val_b', 'key_c': self._default}
+        inst = self._cls(remote_cache)
+
+        with inst:
+            inst.set('key_a', 'val_a', 5)
+            result = inst.get_many_and_touch(['key_a', 'key_b', 'key_c'], 7)
+
+        self.assertEqual(
+                result, {'key_a': 'val_a', 'key_b': 'val_b', 'key_c': None})
+        remote_cache.touch_many.assert_called_once_with(['key_a'], 7.0)
+        remote_cache.get_many_and_touch.assert_called_once_with(
+                ['key_b', 'key_c'], 7.0, self._default)
+
+    def test_touch(self):
+        remote_cache = mock.Mock(name='remote_cache')
+        inst = self._cls(remote_cache)
+
+        result = inst.touch('key_a', 5)
+        many_result = inst.touch_many(['key_a'], 5)
+
+        self.assertIs(result, remote_cache.touch.return_value)
+        self.assertIs(many_result, remote_cache.touch_many.return_value)
+        remote_cache.touch.assert_called_once_with('key_a', 5.0)
+        remote_cache.touch_many.assert_called_once_with(['key_a'], 5.0)
+
+    def test_add_entered(self):
+        remote_cache = mock.Mock(name='remote_cache')
+        remote_cache.add.side_effect = [True, False]
+        inst = self._cls(remote_cache)
+
+        with inst:
+            result_1 = inst.add('key_a', 'val_a', 5)
+            result_2 = inst.add('key_b', 'val_b', 5)
+            self.assertEqual(inst.get('key_a'), 'val_a')
+
+        self.assertIs(result_1, True)
+        self.assertIs(result_2, False)
+        remote_cache.add.assert_has_calls([
+            mock.call('key_a', 'val_a', 5.0), mock.call('key_b', 'val_b', 5.0),
+        ])
+        remote_cache.get.assert_not_called()
+
+    def test_incr(self):
+        remote_cache = mock.Mock(name='remote_cache')
+        inst = self._cls(remote_cache)
+
+        with inst:
+            inst.set('key_a', 5, 10)
+            result = inst.incr('key_a', 2, 10)
+            self.assertNotIn('key_a', inst._cache)
+
+        self.assertIs(result, remote_cache.incr.return_value)
+        remote_cache.incr.assert_called_once_with('key_a', 2, 10.0)
+
+    def test_set_tags_entered(self):
+        remote_cache = mock.Mock(name='remote_cache')
+        remote_cache.get.return_value = self._default
+        remote_cache.invalidate_tags.return_value = 2
+        inst = self._cls(remote_cache)
+
+        with inst:
+            inst.set('key_a', 'val_a', 5, tags=['tag_a'])
+            inst.set('key_b', 'val_b', 5, tags=['tag_b'])
+            self.assertEqual(inst.get('key_a'), 'val_a')
+
+            result = inst.invalidate_tags(['tag_a'])
+
+            self.assertEqual(inst.get('key_a'), None)
+
+        self.assertEqual(result, 2)
+        remote_cache.set.assert_has_calls([
+            mock.call('key_a', 'val_a', 5.0, tags=['tag_a']),
+            mock.call('key_b', 'val_b', 5.0, tags=['tag_b']),
+        ])
+        remote_cache.invalidate_tags.assert_called_once_with(['tag_a'])
+        remote_cache.get.assert_called_once_with('key_a', self._default)
+
+    def test_invalidate_tags_drops_fetched_values(self):
+        # Values fetched from the remote cache may have been set with the
+        # tags elsewhere, so aren't kept either.
+        remote_cache = mock.Mock(name='remote_cache')
+        remote_cache.get.side_effect = ['stale', 'fresh']
+        inst = self._cls(remote_cache)
+
+        with inst:
+            self.assertEqual(inst.get('key_a'), 'stale')
+            inst.invalidate_tags(['tag_a'])
+            self.assertEqual(inst.get('key_a'), 'fresh')
+
+        self.assertEqual(remote_cache.get.call_count, 2)
+
+    def test_set_tags_not_entered(self):
+        remote_cache = mock.Mock(name='remote_cache')
+        inst = self._cls(remote_cache)
+
+        inst.set('key_a', 'val_a', 5, tags=['tag_a'])
+        inst.invalidate_tags(['tag_a'])
+
+        remote_cache.set.assert_called_once_with(
+                'key_a', 'val_a', 5.0, tags=['tag_a'])
+        remote_cache.invalidate_tags.assert_called_once_with(['tag_a'])
+        self.assertEqual(inst._cache, {})
+
+    def _prefetch_remote(self, values):
+        remote_cache = mock.Mock(name='remote_cache')
+        remote_cache.get_many.side_effect = lambda keys, default: {
+            key: values.get(key, default) for key in keys
+        }
+        remote_cache.get.side_effect = \
+            lambda key, default: values.get(key, default)
+        return remote_cache
+
+    def test_prefetch(self):
+        remote_cache = self._prefetch_remote({'key_1': 'val_1'})
+        inst = self._cls(remote_cache)
+
+        with inst:
+            result = inst.prefetch(['key_1', 'key_2', 'key_1'])
+            val_1 = inst.get('key_1')
+            val_2 = inst.get('key_2', 'default')
+            many = inst.get_many(['key_1', 'key_2'])
+
+        self.assertIs(result, None)
+        self.assertEqual(
+                sorted(remote_cache.get_many.call_args_list[0][0][0]),
+                ['key_1', 'key_2'])
+        # Misses aren't held, so are looked up again.
+        remote_cache.get.assert_called_once_with('key_2', self._default)
+        remote_cache.get_many.assert_called_with(['key_2'], self._default)
+        self.assertEqual(val_1, 'val_1')
+        self.assertEqual(val_2, 'default')
+        self.assertEqual(many, {'key_1': 'val_1', 'key_2': None})
+
+    def test_failed_fetch_retried(self):
+        remote_cache = self._prefetch_remote({'key_1': 'val_1'})
+        get_many = remote_cache.get_many.side_effect
+        # As a remote cache returns every key as missing on a CacheError.
+        remote_cache.get_many.side_effect = \
+            lambda keys, default: {key: default for key in keys}
+        inst = self._cls(remote_cache)
+
+        with inst:
+            inst.prefetch(['key_1'])
+            inst.get_many(['key_1'])
+            remote_cache.get_many.side_effect = get_many
+            result = inst.get('key_1')
+            many = inst.get_many(['key_1'])
+
+        self.assertEqual(result, 'val_1')
+        self.assertEqual(many, {'key_1': 'val_1'})
+        remote_cache.get.assert_called_once_with('key_1', self._default)
+        self.assertEqual(remote_cache.get_many.call_count, 2)
+
+    def test_prefetch_skips_local_keys(self):
+        remote_cache = self._prefetch_remote({})
+        inst = self._cls(remote_cache)
+
+        with inst:
+            inst.set('key_1', 'val_1', 5)
+            inst.prefetch(['key_1'])
+
+        remote_cache.get_many.assert_not_called()
+
+    def test_prefetch_not_entered(self):
+        remote_cache = self._prefetch_remote({'key_1': 'val_1'})
+        inst = self._cls(remote_cache)
+
+        inst.prefetch(['key_1'])
+        done = inst.prefetch(['key_1'], background=True)
+
+        self.assertTrue(done.is_set())
+        remote_cache.get_many.assert_not_called()
+
+    def test_prefetch_invalid_keys(self):
+        inst = self._cls(mock.Mock(name='remote_cache'))
+
+        with inst:
+            with self.assertRaises(TypeError):
+                inst.prefetch(['key_1', 2])
+
+    def test_prefetch_background(self):
+        release = threading.Event()
+        remote_cache = self._prefetch_remote({'key_1': 'val_1'})
+        get_many = remote_cache.get_many.side_effect
+        remote_cache.get_many.side_effect = \
+            lambda keys, default: release.wait(5) and get_many(keys, default)
+        inst = self._cls(remote_cache)
+
+        with inst:
+            done = inst.prefetch(['key_1'], background=True)
+            self.assertFalse(done.is_set())
+            threading.Timer(0.05, release.set).start()
+            # waits for the prefetch rather than going to the remote.
+            result = inst.get('key_1')
+
+        self.assertTrue(done.is_set())
+        self.assertEqual(result, 'val_1')
+        remote_cache.get.assert_not_called()
+
+    def test_prefetch_background_discarded_on_exit(self):
+        release = threading.Event()
+        remote_cache = self._prefetch_remote({'key_1': 'val_1'})
+        get_many = remote_cache.get_many.side_effect
+        remote_cache.get_many.side_effect = \
+            lambda keys, default: release.wait(5) and get_many(keys, default)
+        inst = self._cls(remote_cache)
+
+        with inst:
+            done = inst.prefetch(['key_1'], background=True)
+        with inst:
+            release.set()
+            done.wait(5)
+            inst.get('key_1')
+
+        remote_cache.get.assert_called_once_with('key_1', self._default)
+
     def test_remove_not_entered_exist_remotely(self):
         remote_cache = mock.Mock(name='remote_cache')
         remote_cache.remove.return_value = True
@@ -598,3 +1269,229 @@ class TestLocalContextAndRemoteTTLCache(TestCase):
 
         self.assertIs(result, True)
         remote_cache.remove.assert_called_once_with('key')
+
+
+class TestParallelDecode(TestCase):
+    def test_same_result_as_sequential(self):
+        class SequentialCache(cache.ZLibJsonRedisCache):
+            parallel_decode = False
+
+        class ParallelCache(cache.ZLibJsonRedisCache):
+            parallel_decode = True
+            parallel_decode_min_items = 1
+            parallel_decode_min_bytes = 0
+
+        values = [{'id': i, 'body': 'x' * i} for i in range(50)]
+        encoded = [cache.ZLibJsonRedisCache._encode(v) for v in values]
+        encoded[3] = None
+        encoded[7] = b'not zlib'
+        keys = ['key_{}'.format(i) for i in range(50)]
+
+        results = []
+        for cls in (SequentialCache, ParallelCache):
+            redis_conn = mock.Mock(name='redis_conn')
+            redis_conn.mget.return_value = encoded
+            results.append(cls(redis_conn).get_many(keys, 'missing'))
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[1]['key_3'], 'missing')
+        self.assertEqual(results[1]['key_7'], 'missing')
+        self.assertEqual(results[1]['key_10'], values[10])
+
+    def test_chunk_per_worker(self):
+        class ParallelCache(cache.ZLibJsonRedisCache):
+            parallel_decode = True
+            parallel_decode_min_items = 1
+            parallel_decode_min_bytes = 0
+
+        values = list(range(10))
+        encoded = [ParallelCache._encode(v) for v in values]
+        inst = ParallelCache(mock.Mock(name='redis_conn'))
+
+        with mock.patch.object(cache, '_get_decode_pool') as get_pool, \
+                mock.patch.object(cache, '_decode_pool_workers', 4):
+            pool = get_pool.return_value
+            pool.map.side_effect = lambda func, chunks: map(func, chunks)
+            result = inst._decode_many(encoded, None)
+
+        self.assertEqual(result, values)
+        pool.map.assert_called_once()
+        chunks = pool.map.call_args[0][1]
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 3, 1])
+
+
+class TestGetStream(TestCase):
+    def test_stream_json_array(self):
+        value = [{'id': i, 'title': 'Article {}'.format(i)} for i in range(1000)]
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.get.return_value = cache.ZLibJsonRedisCache._encode(value)
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+
+        chunks = inst.get_stream('sitemap', chunk_size=512)
+        result = list(cache.JSONSerializer.iter_array(chunks))
+
+        self.assertEqual(result, value)
+
+    def test_stream_pickle_no_compressor(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.get.return_value = cache.PickleRedisCache._encode('value')
+        inst = cache.PickleRedisCache(redis_conn)
+
+        result = b''.join(inst.get_stream('key', chunk_size=4))
+
+        self.assertEqual(result, redis_conn.get.return_value)
+
+    def test_context_cache_not_supported(self):
+        inst = cache.LocalContextCache()
+
+        with inst:
+            inst.set('key', ['value'])
+            with self.assertRaises(NotImplementedError):
+                inst.get_stream('key')
+
+
+class TestAbsent(TestCase):
+    def test_absent(self):
+        self.assertFalse(cache.ABSENT)
+        self.assertEqual(repr(cache.ABSENT), 'ABSENT')
+        self.assertIs(
+                pickle.loads(pickle.dumps(cache.ABSENT)), cache.ABSENT)
+
+    def test_redis_round_trip(self):
+        for cls in [cache.ZLibJsonRedisCache, cache.ZLibPickleRedisCache,
+                    cache.PickleRedisCache, cache.NumpyRedisCache]:
+            redis_conn = mock.Mock(name='redis_conn')
+            inst = cls(redis_conn)
+
+            inst.set('key_a', cache.ABSENT, 3600)
+            redis_conn.set.assert_called_once_with(
+                    'key_a', cache._ABSENT_MARKER, ex=30)
+
+            redis_conn.get.return_value = redis_conn.set.call_args[0][1]
+            redis_conn.mget.return_value = [redis_conn.get.return_value, None]
+            self.assertIs(inst.get('key_a'), cache.ABSENT)
+            self.assertEqual(inst.get_many(['key_a', 'key_b']),
+                             {'key_a': cache.ABSENT, 'key_b': None})
+
+    def test_context_and_remote(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.mget.return_value = [cache._ABSENT_MARKER]
+        inst = cache.LocalContextAndRemoteTTLCache(
+                cache.ZLibJsonRedisCache(redis_conn))
+
+        with inst:
+            inst.set('key_a', cache.ABSENT, 3600)
+            local_result = inst.get('key_a')
+        remote_result = inst.get_many(['key_a'])
+
+        self.assertIs(local_result, cache.ABSENT)
+        self.assertEqual(remote_result, {'key_a': cache.ABSENT})
+        redis_conn.set.assert_called_once_with(
+                'key_a', cache._ABSENT_MARKER, ex=30)
+
+
+class TestErrorLogging(TestCase):
+    def setUp(self):
+        cache._error_counts.clear()
+        self.redis_conn = mock.Mock(name='redis_conn')
+        self.redis_conn.get.side_effect = Exception("DOWN")
+        self.redis_conn.set.side_effect = Exception("DOWN")
+        self.cache = cache.ZLibJsonRedisCache(self.redis_conn)
+        self.now = 1000.0
+        patches = [
+            mock.patch.object(cache, 'logger'),
+            mock.patch.object(cache, '_clock', lambda: self.now),
+            mock.patch.object(cache.threading, 'Timer'),
+        ]
+        self.logger = patches[0].start()
+        patches[1].start()
+        self.timer = patches[2].start()
+        self.timer.return_value.is_alive.return_value = True
+        for patch in patches:
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        cache._error_counts.clear()
+        cache._error_flush_timer = None
+
+    def _messages(self):
+        return [
+            call[0][0] % call[0][1:]
+            for call in self.logger.error.call_args_list
+        ]
+
+    def test_first_error_logged(self):
+        self.cache.get('key_a')
+
+        self.assertEqual(self._messages(), [
+            "Error during cache get: Failed to talk to redis Exception: DOWN",
+        ])
+
+    def test_repeats_summarised(self):
+        for _ in range(5):
+            self.cache.get('key_a')
+        self.now += 61
+        self.cache.get('key_a')
+        self.cache.get('key_a')
+
+        messages = self._messages()
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(
+            messages[1],
+            "Error during cache get: Failed to talk to redis Exception: DOWN "
+            "(and 4 more RemoteCacheCommError in the last 61s)")
+
+    def test_per_operation(self):
+        self.cache.get('key_a')
+        self.cache.set('key_a', 1, 5)
+        self.cache.get('key_a')
+
+        self.assertEqual(len(self._messages()), 2)
+        self.assertTrue(self._messages()[1].startswith(
+            "(TTL) Error during cache set:"))
+
+    def test_logged_again_after_quiet_interval(self):
+        self.cache.get('key_a')
+        self.now += 61
+        self.cache.get('key_a')
+
+        self.assertEqual(self._messages(), [
+            "Error during cache get: Failed to talk to redis Exception: DOWN",
+        ] * 2)
+        self.timer.assert_not_called()
+
+    def test_summary_logged_after_errors_stop(self):
+        for _ in range(3):
+            self.cache.get('key_a')
+            self.now += 10
+
+        self.timer.assert_called_once_with(50, cache._flush_error_counts)
+        self.assertTrue(self.timer.return_value.daemon)
+        self.timer.return_value.start.assert_called_once_with()
+
+        self.now = 1060.0
+        cache._flush_error_counts()
+        cache._flush_error_counts()
+
+        self.assertEqual(self._messages(), [
+            "Error during cache get: Failed to talk to redis Exception: DOWN",
+            "Error during cache get: Failed to talk to redis Exception: DOWN "
+            "(and 2 more RemoteCacheCommError in the last 60s)",
+        ])
+        self.assertEqual(self.timer.call_count, 1)
+
+    def test_summary_flush_rescheduled(self):
+        self.cache.get('key_a')
+        self.now += 30
+        self.cache.get('key_a')
+        self.cache.set('key_a', 1, 5)
+        self.now += 10
+        self.cache.set('key_a', 1, 5)
+
+        self.now += 20
+        cache._flush_error_counts()
+
+        self.assertEqual(len(self._messages()), 3)
+        self.assertTrue(self._messages()[2].endswith(
+            "(and 1 more RemoteCacheCommError in the last 60s)"))
+        self.assertEqual(self.timer.call_args[0][0], 30)
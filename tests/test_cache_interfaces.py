@@ -203,6 +203,143 @@ class TestBaseCache(TestCase):
         except cache.CacheError:
             self.fail("CacheError was raised")
 
+    def test_get_many_parallel_decode(self):
+        class TestClass(self._higher_test_cls):
+            parallel_decode = True
+            parallel_decode_min_items = 2
+            parallel_decode_min_bytes = 0
+        inst = TestClass()
+        keys = ['key_a', 'key_b', 'key_c']
+        value_1, value_2 = mock.Mock(name='val_1'), mock.Mock(name='val_2')
+        default = mock.Mock(name='default')
+        inst._get_many.return_value = [value_1, self._default, value_2]
+        inst._decode.side_effect = lambda value, fallback: (value, fallback)
+
+        result = inst.get_many(keys, default)
+
+        inst._decode.assert_has_calls(
+                [mock.call(value_1, default), mock.call(value_2, default)],
+                any_order=True)
+        self.assertEqual(result, {
+            'key_a': (value_1, default),
+            'key_b': default,
+            'key_c': (value_2, default),
+        })
+
+    def test_get_many_parallel_decode_thresholds(self):
+        class TestClass(self._higher_test_cls):
+            parallel_decode = True
+            parallel_decode_min_items = 2
+            parallel_decode_min_bytes = 10
+        inst = TestClass()
+
+        self.assertIs(inst._use_decode_pool([b'12345', b'67890']), True)
+        self.assertIs(inst._use_decode_pool([b'12345', self._default]), False)
+        # Both thresholds must be met.
+        self.assertIs(inst._use_decode_pool([b'1234567890']), False)
+        self.assertIs(inst._use_decode_pool([b'1', b'2', b'3']), False)
+
+    def test_get_many_parallel_decode_below_threshold(self):
+        class TestClass(self._higher_test_cls):
+            parallel_decode = True
+        inst = TestClass()
+        inst._get_many.return_value = [mock.Mock(name='val_1')]
+
+        with mock.patch.object(cache, '_get_decode_pool') as get_pool:
+            inst.get_many(['key_a'])
+
+        get_pool.assert_not_called()
+
+    def test_get_stream_exists(self):
+        class TestClass(self._higher_test_cls):
+            serializer = mock.Mock(name='serializer')
+            _decode_stream = mock.Mock(name='_decode_stream')
+        inst = TestClass()
+
+        result = inst.get_stream('key_a', chunk_size=10)
+
+        inst._get.assert_called_once_with('key_a', self._default)
+        inst._decode_stream.assert_called_once_with(
+                inst._get.return_value, 10)
+        self.assertIs(result, inst._decode_stream.return_value)
+
+    def test_get_stream_not_exist(self):
+        class TestClass(self._higher_test_cls):
+            serializer = mock.Mock(name='serializer')
+        inst = TestClass()
+        inst._get.return_value = self._default
+        default = mock.Mock(name='default')
+
+        result = inst.get_stream('key_a', default)
+
+        self.assertIs(result, default)
+
+    def test_get_stream_invalid_key(self):
+        inst = self._higher_test_cls()
+        for input_ in [4, None, []]:
+            with self.assertRaises(TypeError):
+                inst.get_stream(input_)
+            inst._get.assert_not_called()
+
+    def test_get_stream_cache_error(self):
+        class TestClass(self._higher_test_cls):
+            serializer = mock.Mock(name='serializer')
+
+            def _get(*args, **kwargs):
+                raise cache.CacheError("TEST")
+        inst = TestClass()
+        default = mock.Mock(name='default')
+
+        self.assertIs(inst.get_stream('key_a', default), default)
+
+    def test_encode_absent(self):
+        class TestClass(self._test_cls):
+            compressor = mock.Mock(name='compressor')
+            serializer = mock.Mock(name='serializer')
+
+        result = TestClass()._encode(cache.ABSENT)
+
+        self.assertEqual(result, cache._ABSENT_MARKER)
+        TestClass.serializer.serialize.assert_not_called()
+        TestClass.compressor.compress.assert_not_called()
+
+    def test_encode_absent_no_serializer(self):
+        self.assertIs(self._test_cls()._encode(cache.ABSENT), cache.ABSENT)
+
+    def test_decode_absent(self):
+        class TestClass(self._test_cls):
+            compressor = mock.Mock(name='compressor')
+            serializer = mock.Mock(name='serializer')
+        inst = TestClass()
+        marker = cache._ABSENT_MARKER
+
+        for encoded in [marker, bytearray(marker), memoryview(marker)]:
+            self.assertIs(inst._decode(encoded), cache.ABSENT)
+        TestClass.serializer.deserialize.assert_not_called()
+        TestClass.compressor.decompress.assert_not_called()
+
+    def test_get_stream_absent(self):
+        class TestClass(self._test_cls):
+            serializer = mock.Mock(name='serializer')
+            _get = mock.Mock(name='_get', return_value=cache._ABSENT_MARKER)
+        inst = TestClass()
+
+        self.assertIs(inst.get_stream('key_a'), cache.ABSENT)
+
+    def test_get_stream_no_serializer(self):
+        inst = self._higher_test_cls()
+
+        with self.assertRaises(NotImplementedError):
+            inst.get_stream('key_a')
+        inst._get.assert_not_called()
+
+    def test_decode_stream_no_compressor(self):
+        inst = self._test_cls()
+
+        result = list(inst._decode_stream(b'abcdefg', 3))
+
+        self.assertEqual(result, [b'abc', b'def', b'g'])
+
     def test_remove(self):
         inst = self._higher_test_cls()
         result = inst.remove('key_a')
@@ -547,6 +684,67 @@ class TestBaseNoTTLCache(TestBaseCache):
         with self.assertRaises(NotImplementedError):
             self._cls._set(None, 'key_a', object())
 
+    def test_add(self):
+        class TestClass(self._higher_test_cls):
+            _add = mock.Mock(name='_add')
+        inst = TestClass()
+        val = mock.Mock(name='val')
+
+        result = inst.add('key_a', val)
+
+        inst._encode.assert_called_once_with(val)
+        inst._add.assert_called_once_with('key_a', inst._encode.return_value)
+        self.assertIs(result, inst._add.return_value)
+
+    def test_add_cache_error(self):
+        class TestClass(self._higher_test_cls):
+            def _add(*args, **kwargs):
+                raise cache.CacheError("TEST")
+        inst = TestClass()
+
+        self.assertIs(inst.add('key_a', mock.Mock(name='val')), False)
+
+    def test_add_not_implemented(self):
+        inst = self._higher_test_cls()
+
+        with self.assertRaises(NotImplementedError):
+            inst.add('key_a', mock.Mock(name='val'))
+
+    def test_incr_decr(self):
+        class TestClass(self._higher_test_cls):
+            _incr = mock.Mock(name='_incr')
+        inst = TestClass()
+
+        incr_result = inst.incr('key_a')
+        decr_result = inst.decr('key_a', 3)
+
+        inst._incr.assert_has_calls(
+                [mock.call('key_a', 1), mock.call('key_a', -3)])
+        self.assertIs(incr_result, inst._incr.return_value)
+        self.assertIs(decr_result, inst._incr.return_value)
+
+    def test_incr_bad_args(self):
+        class TestClass(self._higher_test_cls):
+            _incr = mock.Mock(name='_incr')
+        inst = TestClass()
+
+        for delta in [1.5, '1', True, None]:
+            with self.assertRaises(TypeError):
+                inst.incr('key_a', delta)
+            with self.assertRaises(TypeError):
+                inst.decr('key_a', delta)
+        with self.assertRaises(TypeError):
+            inst.incr(5)
+        inst._incr.assert_not_called()
+
+    def test_incr_cache_error(self):
+        class TestClass(self._higher_test_cls):
+            def _incr(*args, **kwargs):
+                raise cache.CacheError("TEST")
+        inst = TestClass()
+
+        self.assertIs(inst.incr('key_a'), None)
+
     def test_set(self):
         inst = self._higher_test_cls()
         key, val = 'key_a', mock.Mock(name='val')
@@ -772,6 +970,172 @@ class TestBaseTTLCache(TestBaseCache):
         with self.assertRaises(NotImplementedError):
             self._cls._set(None, 'key_a', object(), 3)
 
+    def test_set_absent(self):
+        inst = self._higher_test_cls()
+
+        inst.set('key_a', cache.ABSENT, None)
+        inst.set('key_b', cache.ABSENT, 3600)
+        inst.set('key_c', cache.ABSENT, 10)
+
+        inst._set.assert_has_calls([
+            mock.call('key_a', inst._encode.return_value, 30.0),
+            mock.call('key_b', inst._encode.return_value, 30.0),
+            mock.call('key_c', inst._encode.return_value, 10.0),
+        ])
+
+    def test_set_absent_no_negative_ttl(self):
+        inst = self._higher_test_cls()
+        inst.negative_ttl_seconds = None
+
+        inst.set('key_a', cache.ABSENT, 3600)
+
+        inst._set.assert_called_once_with(
+                'key_a', inst._encode.return_value, 3600.0)
+
+    def test_set_many_absent(self):
+        class TestClass(self._higher_test_cls):
+            _set_many = mock.Mock(name='_set_many')
+            _encode = mock.Mock(name='_encode', side_effect=lambda v: v)
+        inst = TestClass()
+        val_a = mock.Mock(name='val_a')
+
+        inst.set_many({'key_a': val_a, 'key_b': cache.ABSENT}, 3600)
+
+        inst._set_many.assert_has_calls([
+            mock.call({'key_a': val_a}, 3600.0),
+            mock.call({'key_b': cache.ABSENT}, 30.0),
+        ])
+
+    def test_set_many_only_absent(self):
+        class TestClass(self._higher_test_cls):
+            _set_many = mock.Mock(name='_set_many')
+            _encode = mock.Mock(name='_encode', side_effect=lambda v: v)
+        inst = TestClass()
+
+        inst.set_many({'key_a': cache.ABSENT}, 5)
+
+        inst._set_many.assert_called_once_with({'key_a': cache.ABSENT}, 5.0)
+
+    def test_set_many(self):
+        class TestClass(self._higher_test_cls):
+            _set_many = mock.Mock(name='_set_many')
+        inst = TestClass()
+
+        input = [('key_a', mock.Mock(name='val_a')),
+                 ('key_b', mock.Mock(name='val_b'))]
+        result = inst.set_many(input, 5)
+
+        inst._encode.assert_has_calls(
+                [mock.call(v) for _, v in input], any_order=True)
+        inst._set_many.assert_called_once_with({
+            'key_a': inst._encode.return_value,
+            'key_b': inst._encode.return_value,
+        }, 5.0)
+        self.assertIs(result, None)
+
+    def test_set_many_empty(self):
+        class TestClass(self._higher_test_cls):
+            _set_many = mock.Mock(name='_set_many')
+        inst = TestClass()
+
+        inst.set_many({}, 5)
+
+        inst._set_many.assert_not_called()
+
+    def test_set_many_invalid(self):
+        inst = self._higher_test_cls()
+
+        with self.assertRaises(TypeError):
+            inst.set_many(4.3, 1)
+        with self.assertRaises(ValueError):
+            inst.set_many([('too', 'many', 'values')], 1)
+        with self.assertRaises(TypeError):
+            inst.set_many([('a', 'b'), (4, 'c')], 1)
+        with self.assertRaises(ValueError):
+            inst.set_many({'a': 'b'}, 'hello!')
+        inst._set.assert_not_called()
+
+    def test_set_many_cache_error(self):
+        class TestClass(self._higher_test_cls):
+            def _set_many(*args, **kwargs):
+                raise cache.CacheError("TEST")
+        inst = TestClass()
+
+        try:
+            inst.set_many({"key_a": mock.Mock(name="val")}, 1)
+        except cache.CacheError:
+            self.fail("CacheError was raised")
+
+    def test_set_many_internal(self):
+        inst = self._test_cls()
+
+        input = {'key_a': mock.Mock(name='a'), 'key_b': mock.Mock(name='b')}
+        inst._set_many(input, 3)
+
+        inst._set.assert_has_calls(
+                [mock.call(k, v, 3) for k, v in input.items()], any_order=True)
+
+    def test_add(self):
+        class TestClass(self._higher_test_cls):
+            _add = mock.Mock(name='_add')
+        inst = TestClass()
+        val = mock.Mock(name='val')
+
+        result = inst.add('key_a', val, 5)
+
+        inst._encode.assert_called_once_with(val)
+        inst._add.assert_called_once_with(
+                'key_a', inst._encode.return_value, 5.0)
+        self.assertIs(result, inst._add.return_value)
+
+    def test_add_cache_error(self):
+        class TestClass(self._higher_test_cls):
+            def _add(*args, **kwargs):
+                raise cache.CacheError("TEST")
+        inst = TestClass()
+
+        self.assertIs(inst.add('key_a', mock.Mock(name='val'), 5), False)
+
+    def test_add_not_implemented(self):
+        inst = self._higher_test_cls()
+
+        with self.assertRaises(NotImplementedError):
+            inst.add('key_a', mock.Mock(name='val'), 5)
+
+    def test_incr_decr(self):
+        class TestClass(self._higher_test_cls):
+            _incr = mock.Mock(name='_incr')
+        inst = TestClass()
+
+        incr_result = inst.incr('key_a')
+        decr_result = inst.decr('key_a', 3, ttl_seconds=60)
+
+        inst._incr.assert_has_calls([
+            mock.call('key_a', 1, None), mock.call('key_a', -3, 60.0),
+        ])
+        self.assertIs(incr_result, inst._incr.return_value)
+        self.assertIs(decr_result, inst._incr.return_value)
+
+    def test_incr_bad_args(self):
+        class TestClass(self._higher_test_cls):
+            _incr = mock.Mock(name='_incr')
+        inst = TestClass()
+
+        for delta in [1.5, '1', True, None]:
+            with self.assertRaises(TypeError):
+                inst.incr('key_a', delta)
+        with self.assertRaises(ValueError):
+            inst.incr('key_a', 1, 'hello!')
+        inst._incr.assert_not_called()
+
+    def test_incr_cache_error(self):
+        class TestClass(self._higher_test_cls):
+            def _incr(*args, **kwargs):
+                raise cache.CacheError("TEST")
+        inst = TestClass()
+
+        self.assertIs(inst.incr('key_a', 1, 5), None)
+
     def test_set(self):
         inst = self._higher_test_cls()
 
@@ -794,6 +1158,215 @@ class TestBaseTTLCache(TestBaseCache):
         inst._set.assert_called_once_with(key, inst._encode.return_value, None)
         self.assertIs(result, None)
 
+    def test_set_tags(self):
+        class TestClass(self._higher_test_cls):
+            _set_tagged = mock.Mock(name='_set_tagged')
+        inst = TestClass()
+
+        key, val = 'key_a', mock.Mock(name='object_a')
+
+        result = inst.set(key, val, 1, tags=iter(['tag_a', 'tag_b']))
+
+        inst._set_tagged.assert_called_once_with(
+                key, inst._encode.return_value, 1.0, ['tag_a', 'tag_b'])
+        inst._set.assert_not_called()
+        self.assertIs(result, None)
+
+    def test_set_empty_tags(self):
+        class TestClass(self._higher_test_cls):
+            _set_tagged = mock.Mock(name='_set_tagged')
+        inst = TestClass()
+
+        inst.set('key_a', mock.Mock(name='object_a'), 1, tags=[])
+
+        inst._set.assert_called_once_with(
+                'key_a', inst._encode.return_value, 1.0)
+        inst._set_tagged.assert_not_called()
+
+    def test_set_bad_tags(self):
+        inst = self._higher_test_cls()
+
+        for tags in ['tag_a', [1], 5]:
+            with self.assertRaises(TypeError):
+                inst.set('key_a', mock.Mock(), 1, tags=tags)
+        inst._encode.assert_not_called()
+
+    def test_set_tags_not_implemented(self):
+        inst = self._higher_test_cls()
+
+        with self.assertRaises(NotImplementedError):
+            inst.set('key_a', mock.Mock(), 1, tags=['tag_a'])
+
+    def test_touch(self):
+        class TestClass(self._higher_test_cls):
+            _touch = mock.Mock(name='_touch')
+        inst = TestClass()
+
+        result = inst.touch('key_a', 5)
+
+        inst._touch.assert_called_once_with('key_a', 5.0)
+        self.assertIs(result, inst._touch.return_value)
+
+    def test_touch_cache_error(self):
+        class TestClass(self._higher_test_cls):
+            def _touch(*args, **kwargs):
+                raise cache.CacheError("TEST")
+        inst = TestClass()
+
+        self.assertIs(inst.touch('key_a', 5), False)
+        self.assertEqual(inst.touch_many(['key_a'], 5), 0)
+
+    def test_touch_not_implemented(self):
+        inst = self._higher_test_cls()
+
+        with self.assertRaises(NotImplementedError):
+            inst.touch('key_a', 5)
+
+    def test_touch_many(self):
+        class TestClass(self._higher_test_cls):
+            _touch = mock.Mock(name='_touch', side_effect=[True, False, True])
+        inst = TestClass()
+
+        result = inst.touch_many(iter(['key_a', 'key_b', 'key_c']), 5)
+
+        self.assertEqual(result, 2)
+        inst._touch.assert_has_calls([
+            mock.call('key_a', 5.0), mock.call('key_b', 5.0),
+            mock.call('key_c', 5.0),
+        ])
+
+    def test_touch_many_empty(self):
+        class TestClass(self._higher_test_cls):
+            _touch_many = mock.Mock(name='_touch_many')
+        inst = TestClass()
+
+        self.assertEqual(inst.touch_many([], 5), 0)
+        inst._touch_many.assert_not_called()
+
+    def test_touch_bad_keys(self):
+        inst = self._higher_test_cls()
+
+        with self.assertRaises(TypeError):
+            inst.touch(3, 5)
+        with self.assertRaises(TypeError):
+            inst.touch_many(['key_a', 3], 5)
+        with self.assertRaises(TypeError):
+            inst.get_and_touch(3, 5)
+        with self.assertRaises(TypeError):
+            inst.get_many_and_touch(['key_a', 3], 5)
+
+    def test_get_and_touch(self):
+        class TestClass(self._higher_test_cls):
+            _touch = mock.Mock(name='_touch')
+        inst = TestClass()
+        default = mock.Mock(name='default')
+
+        result = inst.get_and_touch('key_a', 5, default)
+
+        inst._get.assert_called_once_with('key_a', cache._DEFAULT)
+        inst._touch.assert_called_once_with('key_a', 5.0)
+        inst._decode.assert_called_once_with(inst._get.return_value, default)
+        self.assertIs(result, inst._decode.return_value)
+
+    def test_get_and_touch_not_exist(self):
+        class TestClass(self._higher_test_cls):
+            _touch = mock.Mock(name='_touch')
+            _get = mock.Mock(name='_get', return_value=cache._DEFAULT)
+        inst = TestClass()
+        default = mock.Mock(name='default')
+
+        result = inst.get_and_touch('key_a', 5, default)
+
+        inst._touch.assert_not_called()
+        self.assertIs(result, default)
+
+    def test_get_and_touch_cache_error(self):
+        class TestClass(self._higher_test_cls):
+            def _get(*args, **kwargs):
+                raise cache.CacheError("TEST")
+        inst = TestClass()
+        default = mock.Mock(name='default')
+
+        self.assertIs(inst.get_and_touch('key_a', 5, default), default)
+
+    def test_get_many_and_touch(self):
+        class TestClass(self._higher_test_cls):
+            _touch_many = mock.Mock(name='_touch_many')
+            _get_many = mock.Mock(name='_get_many', return_value=[
+                'val_a', cache._DEFAULT, 'val_c'])
+            _decode = mock.Mock(
+                    name='_decode', side_effect=lambda val, default: val)
+        inst = TestClass()
+
+        result = inst.get_many_and_touch(['key_a', 'key_b', 'key_c'], 5, 'x')
+
+        inst._touch_many.assert_called_once_with(['key_a', 'key_c'], 5.0)
+        self.assertEqual(result, {
+            'key_a': 'val_a', 'key_b': 'x', 'key_c': 'val_c'})
+
+    def test_get_and_touch_absent(self):
+        class TestClass(self._higher_test_cls):
+            _touch = mock.Mock(name='_touch')
+            _get = mock.Mock(name='_get', return_value=cache._ABSENT_MARKER)
+            negative_ttl_seconds = 10
+        inst = TestClass()
+
+        inst.get_and_touch('key_a', 300)
+
+        inst._touch.assert_called_once_with('key_a', 10.0)
+
+    def test_get_many_and_touch_absent(self):
+        class TestClass(self._higher_test_cls):
+            _touch_many = mock.Mock(name='_touch_many')
+            _get_many = mock.Mock(name='_get_many', return_value=[
+                'val_a', cache._ABSENT_MARKER, 'val_c'])
+            negative_ttl_seconds = 10
+        inst = TestClass()
+
+        inst.get_many_and_touch(['key_a', 'key_b', 'key_c'], 300)
+
+        self.assertEqual(inst._touch_many.call_count, 2)
+        inst._touch_many.assert_has_calls([
+            mock.call(['key_a', 'key_c'], 300.0),
+            mock.call(['key_b'], 10.0),
+        ], any_order=True)
+
+    def test_get_many_and_touch_cache_error(self):
+        class TestClass(self._higher_test_cls):
+            def _get_many(*args, **kwargs):
+                raise cache.CacheError("TEST")
+        inst = TestClass()
+
+        result = inst.get_many_and_touch(['key_a'], 5, 'x')
+
+        self.assertEqual(result, {'key_a': 'x'})
+
+    def test_invalidate_tags(self):
+        class TestClass(self._higher_test_cls):
+            _invalidate_tags = mock.Mock(name='_invalidate_tags')
+        inst = TestClass()
+
+        result = inst.invalidate_tags(('tag_a', 'tag_b'))
+
+        inst._invalidate_tags.assert_called_once_with(['tag_a', 'tag_b'])
+        self.assertIs(result, inst._invalidate_tags.return_value)
+
+    def test_invalidate_tags_empty(self):
+        class TestClass(self._higher_test_cls):
+            _invalidate_tags = mock.Mock(name='_invalidate_tags')
+        inst = TestClass()
+
+        self.assertEqual(inst.invalidate_tags([]), 0)
+        inst._invalidate_tags.assert_not_called()
+
+    def test_invalidate_tags_cache_error(self):
+        class TestClass(self._higher_test_cls):
+            def _invalidate_tags(*args, **kwargs):
+                raise cache.CacheError("TEST")
+        inst = TestClass()
+
+        self.assertEqual(inst.invalidate_tags(['tag_a']), 0)
+
     def test_bad_key(self):
         inst = self._higher_test_cls()
 
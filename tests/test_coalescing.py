@@ -0,0 +1,118 @@
+import threading
+import time
+from unittest import TestCase
+
+import mock
+
+from condecache import cache, coalescing
+
+
+class TestCoalescingCache(TestCase):
+    def _remote(self, values):
+        remote = mock.Mock(name='remote_cache')
+        remote.get_many.side_effect = lambda keys, default: {
+            key: values.get(key, default) for key in keys
+        }
+        return remote
+
+    def test_get(self):
+        remote = self._remote({'key_a': 'val_a'})
+        inst = coalescing.CoalescingCache(remote)
+        default = mock.Mock(name='default')
+
+        self.assertEqual(inst.get('key_a'), 'val_a')
+        self.assertIs(inst.get('key_b', default), default)
+        remote.get_many.assert_has_calls([
+            mock.call(['key_a'], cache._DEFAULT),
+            mock.call(['key_b'], cache._DEFAULT),
+        ])
+        remote.get.assert_not_called()
+
+    def test_getitem(self):
+        inst = coalescing.CoalescingCache(self._remote({'key_a': 'val_a'}))
+
+        self.assertEqual(inst['key_a'], 'val_a')
+        with self.assertRaises(KeyError):
+            inst['key_b']
+
+    def test_invalid_key(self):
+        remote = self._remote({})
+        inst = coalescing.CoalescingCache(remote)
+
+        with self.assertRaises(TypeError):
+            inst.get(4)
+        remote.get_many.assert_not_called()
+
+    def test_concurrent_gets_are_batched(self):
+        values = {'key_{}'.format(i): i for i in range(5)}
+        fetching = threading.Event()
+        release = threading.Event()
+        def get_many(keys, default):
+            fetching.set()
+            release.wait(5)
+            return {key: values.get(key, default) for key in keys}
+        remote = mock.Mock(name='remote_cache')
+        remote.get_many.side_effect = get_many
+        inst = coalescing.CoalescingCache(remote, window_seconds=5)
+
+        results = {}
+        def get(key):
+            results[key] = inst.get(key)
+
+        # The first get is fetched straight away. The rest are called while
+        # it's being fetched, so wait for it and are fetched together.
+        keys = sorted(values) + ['key_0', 'key_missing']
+        threads = [threading.Thread(target=get, args=(k,)) for k in keys]
+        threads[0].start()
+        fetching.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        deadline = time.time() + 5
+        while len(inst._batch or ()) < len(set(keys)) and \
+                time.time() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(remote.get_many.call_count, 2)
+        self.assertEqual(remote.get_many.call_args_list[0][0][0], ['key_0'])
+        fetched = remote.get_many.call_args_list[1][0][0]
+        self.assertEqual(sorted(fetched), sorted(set(keys)))
+        self.assertEqual(results, dict(values, key_missing=None))
+
+    def test_uncontended_get_does_not_wait(self):
+        remote = self._remote({'key_a': 'val_a'})
+        inst = coalescing.CoalescingCache(remote, window_seconds=5)
+
+        start = time.time()
+        self.assertEqual(inst.get('key_a'), 'val_a')
+        self.assertLess(time.time() - start, 1)
+
+    def test_error_is_raised_to_all_callers(self):
+        remote = mock.Mock(name='remote_cache')
+        remote.get_many.side_effect = RuntimeError("TEST")
+        inst = coalescing.CoalescingCache(remote, window_seconds=0.1)
+
+        errors = []
+        def get():
+            try:
+                inst.get('key_a')
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=get) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(errors), 3)
+
+    def test_delegates_other_methods(self):
+        remote = self._remote({})
+        inst = coalescing.CoalescingCache(remote)
+
+        inst.set('key_a', 'val_a', 10)
+
+        remote.set.assert_called_once_with('key_a', 'val_a', 10)
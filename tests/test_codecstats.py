@@ -0,0 +1,147 @@
+from unittest import TestCase
+
+import mock
+
+from condecache import cache, codecstats
+from condecache.errors import CacheDecodeError
+
+
+class TestCodecStats(TestCase):
+    def setUp(self):
+        self.redis_conn = mock.Mock(name='redis_conn')
+        self.cache = cache.ZLibJsonRedisCache(self.redis_conn)
+        self.stats = self.cache.enable_codec_stats()
+
+    def tearDown(self):
+        self.cache.disable_codec_stats()
+
+    def test_enable_disable(self):
+        self.assertIs(self.cache.codec_stats, self.stats)
+        self.assertIs(self.cache.enable_codec_stats(), self.stats)
+        self.assertEqual(cache._codec_stats_enabled, 1)
+
+        self.cache.disable_codec_stats()
+
+        self.assertIs(self.cache.codec_stats, None)
+        self.assertEqual(self.cache._listeners, ())
+        self.assertEqual(cache._codec_stats_enabled, 0)
+
+    def test_not_used_when_disabled(self):
+        self.cache.disable_codec_stats()
+        with mock.patch.object(cache, '_codec_stats_op') as codec_stats_op:
+            self.cache.set('article:1', {'a': 1}, 5)
+
+        codec_stats_op.assert_not_called()
+
+    def test_encode(self):
+        value = {'body': 'x' * 1000}
+
+        self.cache.set('article:1:body', value, 5)
+        self.cache.set_many({'article:2': value, 'article:3': value}, 5)
+
+        snapshot = self.stats.snapshot()
+        self.assertEqual(list(snapshot['prefixes']), ['article'])
+        stats = snapshot['prefixes']['article']
+        self.assertEqual(stats['encodes'], 3)
+        self.assertEqual(stats['decodes'], 0)
+        self.assertGreater(stats['raw_bytes'], 3000)
+        self.assertEqual(stats['serialized_bytes'],
+                         3 * len(cache.JSONSerializer.serialize(value)))
+        self.assertEqual(stats['compressed_bytes'],
+                         3 * len(self.cache._encode(value)))
+        self.assertGreater(stats['compression_ratio'], 10)
+        self.assertGreater(stats['serialize_seconds'], 0)
+        self.assertGreater(stats['compress_seconds'], 0)
+        self.assertEqual(stats['cpu_seconds'], stats['serialize_seconds'] +
+                         stats['compress_seconds'])
+
+    def test_encoded_unchanged(self):
+        self.cache.set('article:1', {'a': 1}, 5)
+
+        self.cache.disable_codec_stats()
+        self.redis_conn.set.assert_called_once_with(
+            'article:1', self.cache._encode({'a': 1}), ex=5)
+
+    def test_decode(self):
+        encoded = self.cache._encode({'a': 1})
+        self.redis_conn.get.return_value = encoded
+        self.redis_conn.mget.return_value = [encoded, None]
+
+        self.assertEqual(self.cache.get('user:1'), {'a': 1})
+        self.assertEqual(self.cache.get_many(['user:1', 'user:2']),
+                         {'user:1': {'a': 1}, 'user:2': None})
+
+        stats = self.stats.snapshot()['prefixes']['user']
+        self.assertEqual(stats['decodes'], 2)
+        self.assertEqual(stats['raw_bytes'], 0)
+        self.assertEqual(stats['compressed_bytes'], 2 * len(encoded))
+        self.assertEqual(stats['serialized_bytes'],
+                         2 * len(cache.JSONSerializer.serialize({'a': 1})))
+        self.assertGreater(stats['decompress_seconds'], 0)
+        self.assertGreater(stats['deserialize_seconds'], 0)
+
+    def test_decode_error(self):
+        self.redis_conn.get.return_value = b'not zlib'
+
+        self.assertIs(self.cache.get('user:1', 'DEFAULT'), 'DEFAULT')
+        with self.assertRaises(CacheDecodeError):
+            self.cache._decode(b'not zlib')
+
+        stats = self.stats.snapshot()['prefixes']['user']
+        self.assertEqual(stats['decode_errors'], 1)
+
+    def test_no_compressor(self):
+        pickle_cache = cache.PickleRedisCache(self.redis_conn)
+        stats = pickle_cache.enable_codec_stats()
+        try:
+            pickle_cache.set('a:1', [1, 2, 3], 5)
+        finally:
+            pickle_cache.disable_codec_stats()
+
+        prefix_stats = stats.snapshot()['prefixes']['a']
+        self.assertEqual(prefix_stats['compression_ratio'], 1.0)
+        self.assertEqual(prefix_stats['compress_seconds'], 0)
+
+    def test_prefix_depth(self):
+        self.cache.disable_codec_stats()
+        stats = self.cache.enable_codec_stats(prefix_depth=2, separator='/')
+
+        self.cache.set('article/1/body', 'a', 5)
+        self.cache.set_many({'user/1': 'a', 'article/1': 'b'}, 5)
+
+        self.assertEqual(sorted(stats.snapshot()['prefixes']),
+                         [codecstats.MIXED_PREFIX, 'article/1'])
+
+    def test_nested_caches(self):
+        context = cache.LocalContextAndRemoteTTLCache(self.cache)
+        self.redis_conn.get.return_value = None
+
+        context.enable_codec_stats()
+        try:
+            with context:
+                context.set('article:1', {'a': 1}, 5)
+                context.get('user:1')
+        finally:
+            context.disable_codec_stats()
+
+        stats = self.stats.snapshot()['prefixes']
+        self.assertEqual(stats['article']['encodes'], 1)
+        self.assertEqual(cache._current.op, None)
+
+    def test_report(self):
+        self.cache.set('article:1', {'body': 'x' * 1000}, 5)
+        self.cache.set('user:1', {'name': 'a'}, 5)
+
+        lines = self.stats.report().splitlines()
+
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith('prefix'))
+        self.assertEqual(sorted(line.split()[0] for line in lines[1:]),
+                         ['article', 'user'])
+
+    def test_reset(self):
+        self.cache.set('article:1', {'a': 1}, 5)
+
+        self.stats.reset()
+
+        self.assertEqual(self.stats.snapshot()['prefixes'], {})
@@ -0,0 +1,360 @@
+import threading
+import time
+from unittest import TestCase
+
+import mock
+
+from condecache import cache, decorators
+
+
+class TestCached(TestCase):
+    def setUp(self):
+        self.cache = cache.LocalContextCache()
+        self.cache.__enter__()
+        self.calls = []
+
+    def tearDown(self):
+        self.cache.__exit__(None, None, None)
+
+    def _decorate(self, **kwargs):
+        @decorators.cached(self.cache, **kwargs)
+        def load(a, b=2, *args, **kw):
+            self.calls.append((a, b, args, kw))
+            return [a, b, args, kw]
+        return load
+
+    def test_caches_result(self):
+        load = self._decorate()
+
+        result_1 = load(1)
+        result_2 = load(1)
+
+        self.assertEqual(result_1, [1, 2, (), {}])
+        self.assertEqual(result_2, [1, 2, (), {}])
+        self.assertEqual(len(self.calls), 1)
+
+    def test_caches_none(self):
+        calls = []
+
+        @decorators.cached(self.cache)
+        def load():
+            calls.append(1)
+
+        self.assertIs(load(), None)
+        self.assertIs(load(), None)
+        self.assertEqual(len(calls), 1)
+
+    def test_equivalent_calls_share_key(self):
+        load = self._decorate()
+
+        load(1)
+        load(a=1)
+        load(1, 2)
+        load(1, b=2)
+
+        self.assertEqual(len(self.calls), 1)
+
+    def test_different_args_different_keys(self):
+        load = self._decorate()
+
+        keys = set([
+            load.make_key(1), load.make_key('1'), load.make_key(True),
+            load.make_key(1, 3), load.make_key(1, 2, 3),
+            load.make_key(1, x=1), load.make_key(None),
+            load.make_key([1, 2]), load.make_key({'a': 1}),
+            load.make_key({'a': '1'}),
+        ])
+
+        self.assertEqual(len(keys), 10)
+
+    def test_key_format(self):
+        load = self._decorate()
+
+        self.assertEqual(load.make_key(1, 'a'),
+                __name__ + '.TestCached._decorate.<locals>.load' + ":1,'a'")
+
+    def test_key_deterministic_for_unordered(self):
+        load = self._decorate()
+
+        self.assertEqual(
+                load.make_key({'a': 1, 'b': 2, 'c': 3}, x={3, 2, 1}, y=1),
+                load.make_key({'c': 3, 'b': 2, 'a': 1}, y=1, x={1, 2, 3}))
+
+    def test_long_key_is_hashed(self):
+        load = self._decorate(prefix='load')
+
+        key = load.make_key('x' * 1000)
+
+        self.assertEqual(len(key), len('load:') + 40)
+        self.assertNotEqual(key, load.make_key('x' * 1001))
+
+    def test_unsupported_argument(self):
+        load = self._decorate()
+
+        with self.assertRaises(TypeError):
+            load(object())
+        self.assertEqual(self.calls, [])
+
+    def test_custom_key(self):
+        class Loader(object):
+            def __init__(self, name):
+                self.name = name
+
+            @decorators.cached(self.cache, prefix='loader',
+                    key=lambda self, item_id: '{}:{}'.format(self.name, item_id))
+            def load(self, item_id):
+                return (self.name, item_id)
+
+        self.assertEqual(Loader('a').load(1), ('a', 1))
+        self.assertEqual(Loader('b').load(1), ('b', 1))
+        self.assertEqual(self.cache.get('loader:a:1'), ('a', 1))
+
+    def test_invalidate(self):
+        load = self._decorate()
+
+        load(1)
+        removed = load.invalidate(a=1)
+        load(1)
+
+        self.assertIs(removed, True)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_exception_not_cached(self):
+        calls = []
+
+        @decorators.cached(self.cache)
+        def load():
+            calls.append(1)
+            raise ValueError("TEST")
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                load()
+        self.assertEqual(len(calls), 2)
+
+    def test_ttl_cache(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.get.return_value = None
+        remote = cache.ZLibJsonRedisCache(redis_conn, prefix='app')
+
+        @decorators.cached(remote, 30, prefix='load')
+        def load(a):
+            return {'a': a}
+
+        result = load(5)
+
+        self.assertEqual(result, {'a': 5})
+        redis_conn.get.assert_called_once_with('app:load:5')
+        redis_conn.set.assert_called_once_with(
+                'app:load:5', remote._encode({'a': 5}), ex=30)
+
+    def test_ttl_cache_hit(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        remote = cache.ZLibJsonRedisCache(redis_conn)
+        redis_conn.get.return_value = remote._encode({'a': 'cached'})
+        load = mock.Mock(name='load', __name__='load', __module__='mod')
+
+        result = decorators.cached(remote, 30)(load)(5)
+
+        self.assertEqual(result, {'a': 'cached'})
+        load.assert_not_called()
+
+    def test_cache_errors_are_misses(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.get.side_effect = Exception("DOWN")
+        redis_conn.set.side_effect = Exception("DOWN")
+        remote = cache.ZLibJsonRedisCache(redis_conn)
+
+        @decorators.cached(remote, 30)
+        def load(a):
+            return a * 2
+
+        self.assertEqual(load(4), 8)
+
+    def test_context_and_remote_cache(self):
+        remote = mock.Mock(name='remote_cache')
+        remote.get.return_value = cache._DEFAULT
+        context = cache.LocalContextAndRemoteTTLCache(remote)
+
+        with context:
+            decorated = decorators.cached(context, 10, prefix='load')(
+                    lambda a: a)
+            decorated(1)
+            decorated(1)
+
+        remote.get.assert_called_once_with('load:1', cache._DEFAULT)
+        remote.set.assert_called_once_with('load:1', 1, 10)
+
+    def test_single_flight(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        @decorators.cached(self.cache, single_flight=True)
+        def load(a):
+            calls.append(a)
+            started.set()
+            release.wait(5)
+            return a * 2
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(load(3)))
+            for _ in range(5)
+        ]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(calls, [3])
+        self.assertEqual(results, [6] * 5)
+
+    def test_single_flight_error(self):
+        @decorators.cached(self.cache, single_flight=True)
+        def load(a):
+            raise ValueError("TEST")
+
+        with self.assertRaises(ValueError):
+            load(1)
+        with self.assertRaises(ValueError):
+            load(1)
+
+
+class TestCachedBatch(TestCase):
+    def setUp(self):
+        self.cache = cache.LocalContextCache()
+        self.cache.__enter__()
+        self.calls = []
+
+    def tearDown(self):
+        self.cache.__exit__(None, None, None)
+
+    def _decorate(self, returns_dict=True, **kwargs):
+        @decorators.cached_batch(self.cache, prefix='article', **kwargs)
+        def load_articles(ids):
+            self.calls.append(list(ids))
+            if returns_dict:
+                return {i: {'id': i} for i in ids if i != 404}
+            return [{'id': i} for i in ids]
+        return load_articles
+
+    def test_all_missing(self):
+        load = self._decorate()
+
+        result = load([3, 1, 2])
+
+        self.assertEqual(result, [{'id': 3}, {'id': 1}, {'id': 2}])
+        self.assertEqual(self.calls, [[3, 1, 2]])
+        self.assertEqual(self.cache.get('article:1'), {'id': 1})
+
+    def test_partial_hits(self):
+        load = self._decorate()
+        load([1, 2])
+
+        result = load([4, 2, 1, 3])
+
+        self.assertEqual(result, [{'id': 4}, {'id': 2}, {'id': 1}, {'id': 3}])
+        self.assertEqual(self.calls, [[1, 2], [4, 3]])
+
+    def test_all_hits(self):
+        load = self._decorate()
+        load([1, 2])
+
+        result = load(iter([2, 1]))
+
+        self.assertEqual(result, [{'id': 2}, {'id': 1}])
+        self.assertEqual(len(self.calls), 1)
+
+    def test_duplicate_ids(self):
+        load = self._decorate()
+
+        result = load([1, 2, 1])
+
+        self.assertEqual(result, [{'id': 1}, {'id': 2}, {'id': 1}])
+        self.assertEqual(self.calls, [[1, 2]])
+
+    def test_missing_from_result(self):
+        load = self._decorate()
+
+        result = load([1, 404])
+        load([404])
+
+        self.assertEqual(result, [{'id': 1}, None])
+        self.assertEqual(self.calls, [[1, 404], [404]])
+
+    def test_list_result(self):
+        load = self._decorate(returns_dict=False)
+        load([2])
+
+        result = load([1, 2, 3])
+
+        self.assertEqual(result, [{'id': 1}, {'id': 2}, {'id': 3}])
+        self.assertEqual(self.calls, [[2], [1, 3]])
+
+    def test_list_result_wrong_length(self):
+        @decorators.cached_batch(self.cache)
+        def load(ids):
+            return [1]
+
+        with self.assertRaises(ValueError):
+            load([1, 2])
+
+    def test_empty(self):
+        load = self._decorate()
+
+        self.assertEqual(load([]), [])
+        self.assertEqual(self.calls, [])
+
+    def test_custom_key_and_invalidate(self):
+        load = self._decorate(key=lambda id_: 'id-{}'.format(id_))
+        load([1, 2])
+
+        removed = load.invalidate([1])
+        load([1, 2])
+
+        self.assertEqual(load.make_key(1), 'article:id-1')
+        self.assertEqual(removed, 1)
+        self.assertEqual(self.calls, [[1, 2], [1]])
+
+    def test_ttl_cache_one_round_trip_each(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        remote = cache.ZLibJsonRedisCache(redis_conn)
+        redis_conn.mget.return_value = [remote._encode({'id': 1}), None]
+
+        @decorators.cached_batch(remote, 60, prefix='article')
+        def load(ids):
+            return {i: {'id': i} for i in ids}
+
+        result = load([1, 2])
+
+        self.assertEqual(result, [{'id': 1}, {'id': 2}])
+        redis_conn.mget.assert_called_once_with(['article:1', 'article:2'])
+        pipe = redis_conn.pipeline.return_value
+        pipe.set.assert_called_once_with(
+                'article:2', remote._encode({'id': 2}), ex=60)
+        pipe.execute.assert_called_once_with()
+
+    def test_cache_missing(self):
+        load = self._decorate(cache_missing=True)
+
+        result_1 = load([1, 404])
+        result_2 = load([1, 404])
+
+        self.assertEqual(result_1, [{'id': 1}, None])
+        self.assertEqual(result_2, [{'id': 1}, None])
+        self.assertEqual(self.calls, [[1, 404]])
+        self.assertIs(self.cache.get('article:404'), cache.ABSENT)
+
+    def test_cached_absent(self):
+        load = self._decorate()
+        self.cache.set('article:2', cache.ABSENT)
+
+        result = load([1, 2])
+
+        self.assertEqual(result, [{'id': 1}, None])
+        self.assertEqual(self.calls, [[1]])
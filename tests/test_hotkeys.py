@@ -0,0 +1,109 @@
+import random
+from unittest import TestCase
+
+import mock
+
+from condecache import cache, hotkeys
+
+
+def _op(keys, bytes_read=0, bytes_written=0):
+    return mock.Mock(name='op', keys=keys, bytes_read=bytes_read,
+                     bytes_written=bytes_written)
+
+
+class TestHotKeyTracker(TestCase):
+    def test_exact_within_capacity(self):
+        tracker = hotkeys.HotKeyTracker(capacity=10)
+
+        for key, count in [('a', 5), ('b', 3), ('c', 1)]:
+            for _ in range(count):
+                tracker.on_operation(_op(('key_' + key,)))
+
+        self.assertEqual(tracker.top_by_count(2), [
+            ('key_a', 5, 0), ('key_b', 3, 0),
+        ])
+
+    def test_heavy_hitters_found(self):
+        rng = random.Random(42)
+        tracker = hotkeys.HotKeyTracker(capacity=20)
+        hot = ['hot_{}'.format(i) for i in range(3)]
+
+        for _ in range(20000):
+            if rng.random() < 0.5:
+                key = rng.choice(hot)
+            else:
+                key = 'cold_{}'.format(rng.randrange(100000))
+            tracker.on_operation(_op((key,)))
+
+        top = tracker.top_by_count(3)
+        self.assertEqual(sorted(key for key, _, _ in top), hot)
+        for key, count, error in top:
+            # True counts are around 3333.
+            self.assertGreater(count, 3000)
+            self.assertLess(count - error, 3700)
+
+    def test_bounded_memory(self):
+        tracker = hotkeys.HotKeyTracker(capacity=5)
+
+        for i in range(10000):
+            tracker.on_operation(_op(('key_{}'.format(i),), bytes_read=10))
+
+        self.assertEqual(len(tracker._counts._counts), 5)
+        self.assertLessEqual(len(tracker._counts._heap), 4 * 5 + 64)
+        self.assertEqual(len(tracker.top_by_count(100)), 5)
+
+    def test_top_by_bytes(self):
+        tracker = hotkeys.HotKeyTracker()
+
+        for _ in range(10):
+            tracker.on_operation(_op(('small',), bytes_read=10))
+        tracker.on_operation(_op(('big',), bytes_written=1000))
+        tracker.on_operation(_op(('a', 'b'), bytes_read=50))
+
+        self.assertEqual(tracker.top_by_count(1)[0][0], 'small')
+        self.assertEqual(tracker.top_by_bytes(4), [
+            ('big', 1000, 0), ('small', 100, 0), ('a', 25, 0), ('b', 25, 0),
+        ])
+
+    def test_sampling(self):
+        tracker = hotkeys.HotKeyTracker(sample_rate=0.5)
+
+        with mock.patch('random.random', side_effect=[0.1, 0.9, 0.2, 0.7]):
+            for _ in range(4):
+                tracker.on_operation(_op(('key_a',), bytes_read=3))
+
+        self.assertEqual(tracker.top_by_count(), [('key_a', 4, 0)])
+        self.assertEqual(tracker.top_by_bytes(), [('key_a', 12, 0)])
+
+    def test_invalid_args(self):
+        with self.assertRaises(ValueError):
+            hotkeys.HotKeyTracker(capacity=0)
+        with self.assertRaises(ValueError):
+            hotkeys.HotKeyTracker(sample_rate=0)
+
+    def test_with_cache(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.get.return_value = None
+        redis_conn.mget.return_value = [None, None]
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        tracker = hotkeys.HotKeyTracker()
+        inst.add_listener(tracker)
+
+        inst.get('key_a')
+        inst.get_many(['key_a', 'key_b'])
+        inst.set('key_b', 'x' * 1000, 5)
+        inst.invalidate_tags(['tag'])
+
+        self.assertEqual(tracker.top_by_count(), [
+            ('key_a', 2, 0), ('key_b', 2, 0),
+        ])
+        self.assertEqual([key for key, _, _ in tracker.top_by_bytes()],
+                         ['key_b'])
+
+    def test_reset(self):
+        tracker = hotkeys.HotKeyTracker()
+        tracker.on_operation(_op(('key_a',)))
+
+        tracker.reset()
+
+        self.assertEqual(tracker.top_by_count(), [])
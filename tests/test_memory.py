@@ -0,0 +1,136 @@
+import sys
+from unittest import TestCase
+
+import mock
+
+from condecache import cache, memory
+
+
+class _Slotted(object):
+    __slots__ = ('a', 'b')
+
+
+class _Plain(object):
+    def __init__(self, value):
+        self.value = value
+
+
+class TestDeepSize(TestCase):
+    def test_leaf(self):
+        value = 'x' * 1000
+        self.assertEqual(memory.deep_size(value), sys.getsizeof(value))
+
+    def test_containers(self):
+        inner = 'x' * 1000
+        value = {'key': [inner, (inner,)]}
+        self.assertGreater(memory.deep_size(value), 1000)
+        self.assertGreater(
+            memory.deep_size(value), memory.deep_size({'key': []}))
+
+    def test_shared_counted_once(self):
+        inner = 'x' * 1000
+        once = memory.deep_size([inner])
+        self.assertEqual(
+            memory.deep_size([inner, inner]),
+            once + sys.getsizeof([inner, inner]) - sys.getsizeof([inner]))
+
+    def test_cycles(self):
+        value = []
+        value.append(value)
+        self.assertEqual(memory.deep_size(value), sys.getsizeof(value))
+
+    def test_objects(self):
+        inner = 'x' * 1000
+        self.assertGreater(memory.deep_size(_Plain(inner)), 1000)
+
+        slotted = _Slotted()
+        slotted.a = inner
+        # b is unset.
+        self.assertEqual(
+            memory.deep_size(slotted),
+            sys.getsizeof(slotted) + sys.getsizeof(inner))
+
+    def test_shared_types_not_counted(self):
+        self.assertEqual(memory.deep_size(None), 0)
+        self.assertEqual(memory.deep_size(_Plain), 0)
+        value = [None, True, len]
+        self.assertEqual(memory.deep_size(value), sys.getsizeof(value))
+
+    def test_seen(self):
+        inner = 'x' * 1000
+        seen = set()
+        memory.deep_size(inner, seen)
+        self.assertEqual(memory.deep_size(inner, seen), 0)
+
+
+class TestMemoryReport(TestCase):
+    def test_exact(self):
+        entries = {'small': 'x', 'large': 'x' * 1000}
+        report = memory.memory_report(entries, largest=1)
+
+        sizes = {
+            key: memory.deep_size(key) + memory.deep_size(value)
+            for key, value in entries.items()
+        }
+        self.assertEqual(report['entries'], 2)
+        self.assertEqual(report['measured'], 2)
+        self.assertTrue(report['exact'])
+        self.assertEqual(report['container_bytes'], sys.getsizeof(entries))
+        self.assertEqual(
+            report['total_bytes'],
+            sys.getsizeof(entries) + sum(sizes.values()))
+        self.assertEqual(report['average_bytes'], sum(sizes.values()) / 2.0)
+        self.assertEqual(report['largest'], [['large', sizes['large']]])
+
+    def test_sampled(self):
+        entries = {'key_{:03}'.format(i): 'x' * 100 for i in range(100)}
+        report = memory.memory_report(entries, sample_size=10)
+
+        self.assertEqual(report['entries'], 100)
+        self.assertEqual(report['measured'], 10)
+        self.assertFalse(report['exact'])
+        size = memory.deep_size('key_000') + memory.deep_size('x' * 100)
+        self.assertEqual(report['average_bytes'], size)
+        self.assertEqual(
+            report['total_bytes'], sys.getsizeof(entries) + size * 100)
+
+    def test_container_bytes(self):
+        entries = {'key': 'x' * 100}
+        report = memory.memory_report(entries, container_bytes=1000)
+
+        size = memory.deep_size('key') + memory.deep_size('x' * 100)
+        self.assertEqual(report['container_bytes'], 1000)
+        self.assertEqual(report['total_bytes'], 1000 + size)
+
+    def test_empty(self):
+        report = memory.memory_report({})
+        self.assertEqual(report['entries'], 0)
+        self.assertEqual(report['average_bytes'], 0)
+        self.assertEqual(report['largest'], [])
+
+
+class TestContextCacheMemoryReport(TestCase):
+    def test_local_context_cache(self):
+        inst = cache.LocalContextCache()
+        with inst:
+            inst.set('key', 'x' * 1000)
+            report = inst.memory_report()
+
+        self.assertEqual(report['entries'], 1)
+        self.assertEqual(report['largest'][0][0], 'key')
+        self.assertGreater(report['largest'][0][1], 1000)
+        self.assertEqual(inst.memory_report()['entries'], 0)
+
+    def test_misses_not_held(self):
+        remote = mock.Mock(name='remote', spec=cache.BaseTTLCache)
+        remote.get_many.side_effect = lambda keys, default: {
+            key: 'value' if key == 'found' else default for key in keys}
+        inst = cache.LocalContextAndRemoteTTLCache(remote)
+        with inst:
+            inst.get_many(['found', 'missing'])
+            report = inst.memory_report()
+            container_bytes = sys.getsizeof(inst._cache)
+
+        self.assertEqual(report['entries'], 1)
+        self.assertEqual(report['largest'][0][0], 'found')
+        self.assertEqual(report['container_bytes'], container_bytes)
@@ -0,0 +1,357 @@
+import json
+from unittest import TestCase
+
+import mock
+
+from condecache import cache, metrics
+
+
+class TestOperations(TestCase):
+    def _op(self, listener):
+        listener.on_operation.assert_called_once()
+        return listener.on_operation.call_args[0][0]
+
+    def test_no_listeners(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.mget.return_value = [None]
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+
+        with mock.patch.object(cache, 'Operation') as operation:
+            inst.get('key_a')
+            inst.get_many(['key_a'])
+            inst.set('key_a', 'val_a', 5)
+
+        operation.assert_not_called()
+
+    def test_get_hit(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+        redis_conn.get.return_value = inst._encode({'a': 1})
+
+        inst.get('key_a')
+
+        op = self._op(listener)
+        self.assertIs(op.cache, inst)
+        self.assertEqual(op.name, 'get')
+        self.assertEqual(op.keys, ('key_a',))
+        self.assertEqual((op.hits, op.misses, op.decode_errors), (1, 0, 0))
+        self.assertEqual(op.bytes_read, len(redis_conn.get.return_value))
+        self.assertGreaterEqual(op.duration, 0)
+        self.assertIs(op.error, None)
+
+    def test_get_miss(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+        redis_conn.get.return_value = None
+
+        inst.get('key_a')
+
+        op = self._op(listener)
+        self.assertEqual((op.hits, op.misses), (0, 1))
+
+    def test_get_decode_error(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+        redis_conn.get.return_value = b'not zlib'
+
+        result = inst.get('key_a', 'default')
+
+        self.assertEqual(result, 'default')
+        self.assertEqual(self._op(listener).decode_errors, 1)
+
+    def test_get_cache_error(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+        redis_conn.get.side_effect = Exception("DOWN")
+
+        inst.get('key_a')
+
+        self.assertIsInstance(
+                self._op(listener).error, cache.RemoteCacheCommError)
+
+    def test_set_cache_error(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+        redis_conn.set.side_effect = Exception("DOWN")
+
+        with mock.patch.object(cache, '_log_cache_error') as log:
+            inst.set('key_a', 'val_a', 5)
+
+        op = self._op(listener)
+        self.assertIsInstance(op.error, cache.RemoteCacheCommError)
+        log.assert_called_once_with("(TTL) Error during cache set", op.error)
+
+    def test_get_many(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+        redis_conn.mget.return_value = [
+            inst._encode('val_a'), None, b'not zlib']
+
+        result = inst.get_many(['key_a', 'key_b', 'key_c'], 'default')
+
+        self.assertEqual(result, {
+            'key_a': 'val_a', 'key_b': 'default', 'key_c': 'default'})
+        op = self._op(listener)
+        self.assertEqual(op.keys, ['key_a', 'key_b', 'key_c'])
+        self.assertEqual((op.hits, op.misses, op.decode_errors), (2, 1, 1))
+
+    def test_get_many_arrays(self):
+        # Arrays can't be compared with ==, so failures are counted by
+        # identity.
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("numpy not installed")
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.mget.return_value = [
+            cache.NumpyRedisCache._encode(numpy.arange(3)), b'not json']
+        inst = cache.NumpyRedisCache(redis_conn)
+        inst.enable_metrics()
+
+        result = inst.get_many(['key_a', 'key_b'], 'default')
+
+        self.assertTrue(numpy.array_equal(result['key_a'], numpy.arange(3)))
+        self.assertEqual(result['key_b'], 'default')
+        stats = inst.metrics.snapshot()['operations']['get_many']
+        self.assertEqual((stats['hits'], stats['decode_errors']), (2, 1))
+
+    def test_set_many(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+
+        inst.set_many({'key_a': 'val_a', 'key_b': 'val_b'}, 5)
+
+        op = self._op(listener)
+        self.assertEqual(op.name, 'set_many')
+        self.assertEqual(sorted(op.keys), ['key_a', 'key_b'])
+        self.assertEqual(op.bytes_written,
+                len(inst._encode('val_a')) + len(inst._encode('val_b')))
+
+    def test_unexpected_error(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+        inst._get = mock.Mock(side_effect=ValueError("BUG"))
+
+        with self.assertRaises(ValueError):
+            inst.get('key_a')
+
+        # Still finished, though only cache errors are recorded.
+        self.assertIs(self._op(listener).error, None)
+
+    def test_on_start(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+        redis_conn.get.return_value = None
+
+        inst.get('key_a')
+
+        op = self._op(listener)
+        listener.on_start.assert_called_once_with(op)
+
+    def test_parent(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+        redis_conn.get.return_value = None
+        context = cache.LocalContextAndRemoteTTLCache(inst)
+        context_listener = mock.Mock(name='context_listener')
+        context.add_listener(context_listener)
+
+        with context:
+            context.get('key_a')
+
+        op = self._op(listener)
+        self.assertIs(op.parent, self._op(context_listener))
+        self.assertIs(op.parent.parent, None)
+        self.assertIs(getattr(cache._current, 'op', None), None)
+
+    def test_prefix(self):
+        def prefix(keys, *args):
+            op = cache.Operation(mock.Mock(_listeners=()), 'get_many', keys)
+            op.finish()
+            return op.prefix(*args)
+
+        self.assertEqual(prefix(['a:b:c', 'a:d']), 'a')
+        self.assertEqual(prefix(['a/b/c', 'a/b/d'], 2, '/'), 'a/b')
+        self.assertEqual(prefix(['a/b'], 2, '/'), 'a')
+        self.assertEqual(prefix(['ab']), '')
+        self.assertEqual(prefix(['a:b', 'c:b']), cache.MIXED_PREFIX)
+        self.assertEqual(prefix([]), cache.MIXED_PREFIX)
+
+    def test_remote_call(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+        redis_conn.get.return_value = None
+        redis_conn.get.__name__ = 'get'
+
+        inst.get('key_a')
+
+        listener.on_remote_call.assert_called_once()
+        call = listener.on_remote_call.call_args[0][0]
+        self.assertIs(call.cache, inst)
+        self.assertEqual(call.name, 'get')
+        self.assertIs(call.op, self._op(listener))
+        self.assertGreaterEqual(call.duration, 0)
+        self.assertLessEqual(call.duration, call.op.duration)
+        self.assertIs(call.error, None)
+
+    def test_remote_call_error(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+        error = ValueError("DOWN")
+        redis_conn.mget.side_effect = error
+
+        inst.get_many(['key_a'])
+
+        call = listener.on_remote_call.call_args[0][0]
+        self.assertIs(call.error, error)
+        self.assertIsInstance(self._op(listener).error,
+                              cache.RemoteCacheCommError)
+
+    def test_no_remote_call_without_listeners(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.get.return_value = None
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+
+        with mock.patch.object(cache, 'RemoteCall') as remote_call:
+            inst.get('key_a')
+
+        remote_call.assert_not_called()
+
+    def test_listener_error_is_not_raised(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+        listener.on_start.side_effect = Exception("BUG")
+        listener.on_operation.side_effect = Exception("BUG")
+        listener.on_remote_call.side_effect = Exception("BUG")
+        redis_conn.get.return_value = None
+
+        self.assertIs(inst.get('key_a'), None)
+
+    def test_remove_listener(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+
+        inst.remove_listener(listener)
+        inst.remove('key_a')
+
+        listener.on_operation.assert_not_called()
+        self.assertEqual(inst._listeners, ())
+
+    def test_listeners_are_per_instance(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        listener = mock.Mock(name='listener')
+        inst.add_listener(listener)
+
+        other = cache.ZLibJsonRedisCache(redis_conn)
+
+        self.assertEqual(other._listeners, ())
+
+
+class TestCacheMetrics(TestCase):
+    def test_enable_metrics(self):
+        inst = cache.LocalContextCache()
+
+        self.assertIs(inst.metrics, None)
+        result = inst.enable_metrics()
+
+        self.assertIsInstance(result, metrics.CacheMetrics)
+        self.assertIs(inst.metrics, result)
+        self.assertIs(inst.enable_metrics(), result)
+        self.assertEqual(inst._listeners, (result,))
+
+        inst.disable_metrics()
+        self.assertIs(inst.metrics, None)
+        self.assertEqual(inst._listeners, ())
+
+    def test_snapshot(self):
+        inst = cache.LocalContextCache()
+        inst_metrics = inst.enable_metrics()
+
+        with inst:
+            inst.set('key_a', 'val_a')
+            inst.get('key_a')
+            inst.get('key_b')
+            inst.get_many(['key_a', 'key_b', 'key_c'])
+
+        snapshot = inst_metrics.snapshot()
+        # It must be serializable.
+        json.dumps(snapshot)
+        operations = snapshot['operations']
+
+        self.assertEqual(sorted(operations), ['get', 'get_many', 'set'])
+        get = operations['get']
+        self.assertEqual(get['calls'], 2)
+        self.assertEqual((get['hits'], get['misses']), (1, 1))
+        self.assertEqual(get['hit_ratio'], 0.5)
+        self.assertEqual(operations['get_many']['misses'], 2)
+        self.assertIs(operations['set']['hit_ratio'], None)
+        self.assertEqual(sum(c for _, c in get['latency']['buckets']), 2)
+
+    def test_latency_histogram(self):
+        inst_metrics = metrics.CacheMetrics()
+        for duration in [0.000001, 0.003, 0.003, 0.003, 20]:
+            op = mock.Mock(name='op', hits=0, misses=0, decode_errors=0,
+                    bytes_read=0, bytes_written=0, error=None,
+                    duration=duration)
+            op.name = 'get'
+            inst_metrics.on_operation(op)
+
+        latency = inst_metrics.snapshot()['operations']['get']['latency']
+
+        buckets = dict((bound, count) for bound, count in latency['buckets'])
+        self.assertEqual(buckets[0.00001], 1)
+        self.assertEqual(buckets[0.005], 3)
+        self.assertEqual(latency['overflow'], 1)
+        self.assertEqual(latency['p50'], 0.005)
+        self.assertIs(latency['p99'], None)
+        self.assertAlmostEqual(latency['total_seconds'], 20.009001)
+
+    def test_errors(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.set.side_effect = Exception("DOWN")
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        inst_metrics = inst.enable_metrics()
+
+        inst.set('key_a', 'val_a', 5)
+
+        stats = inst_metrics.snapshot()['operations']['set']
+        self.assertEqual(stats['errors'], 1)
+        self.assertGreater(stats['bytes_written'], 0)
+
+    def test_reset(self):
+        inst = cache.LocalContextCache()
+        inst_metrics = inst.enable_metrics()
+        inst.get('key_a')
+
+        inst_metrics.reset()
+
+        self.assertEqual(inst_metrics.snapshot()['operations'], {})
@@ -1,12 +1,15 @@
+import collections
 import datetime
 from unittest import TestCase
 import zlib
 import json
 import pickle
+import struct
+import sys
 
 import mock
 
-from condecache import cache
+from condecache import cache, data_tools
 
 class TestZLibCompressor(TestCase):
     _cls = cache.ZLibCompressor
@@ -25,6 +28,24 @@ class TestZLibCompressor(TestCase):
         self.assertIsInstance(result, type(b''))
         self.assertEqual(result, zlib.compress(b'Hello, world!'))
 
+    def test_compress_buffers(self):
+        for input in (bytearray(b'Hello, world!'), memoryview(b'Hello, world!')):
+            result = self._cls.compress(input)
+
+            self.assertIsInstance(result, type(b''))
+            self.assertEqual(result, zlib.compress(b'Hello, world!'))
+
+    def test_compress_large_string(self):
+        input = u'caf\u00e9 ' * 200000
+        result = self._cls.compress(input)
+
+        self.assertEqual(zlib.decompress(result), input.encode('utf-8'))
+
+    def test_decompress_buffers(self):
+        compressed = zlib.compress(b'hello, world!')
+        for input in (bytearray(compressed), memoryview(compressed)):
+            self.assertEqual(self._cls.decompress(input), b'hello, world!')
+
     def test_decompress(self):
         input = zlib.compress(b'hello, world!')
         result = self._cls.decompress(input)
@@ -79,6 +100,24 @@ class TestZLibCompressor(TestCase):
 
         self.assertIs(cm.exception.from_err, the_error)
 
+    def test_decompress_iter(self):
+        data = b''.join(str(i).encode() for i in range(20000))
+        result = list(self._cls.decompress_iter(zlib.compress(data), 1000))
+
+        self.assertEqual(b''.join(result), data)
+        self.assertTrue(all(len(chunk) <= 1000 for chunk in result))
+        self.assertGreater(len(result), 1)
+
+    def test_decompress_iter_error(self):
+        with self.assertRaises(cache.CacheDecodeError):
+            list(self._cls.decompress_iter(b'not compressed data'))
+
+    def test_decompress_iter_truncated(self):
+        compressed = zlib.compress(b'hello, world!' * 100)
+
+        with self.assertRaises(cache.CacheDecodeError):
+            list(self._cls.decompress_iter(compressed[:-5]))
+
 
 class TestJSONSerializer(TestCase):
     _cls = cache.JSONSerializer
@@ -145,6 +184,15 @@ class TestJSONSerializer(TestCase):
 
         self.assertEqual(input, result)
 
+    def test_deserialize_buffers(self):
+        serialized = u'{"a": "caf\u00e9"}'.encode('utf-8')
+        for input in (serialized, bytearray(serialized), memoryview(serialized)):
+            self.assertEqual(self._cls.deserialize(input), {'a': u'caf\u00e9'})
+
+    def test_deserialize_invalid_utf8(self):
+        with self.assertRaises(cache.CacheDecodeError):
+            self._cls.deserialize(b'"\xff"')
+
     def test_decode_type_error_raises_cache_error(self):
         the_error = TypeError("TEST CATCHME")
         def raiser(*args, **kwargs):
@@ -176,6 +224,52 @@ class TestJSONSerializer(TestCase):
         self.assertIs(cm.exception.from_err, the_error)
 
 
+    def _chunked(self, data, size):
+        return [data[i:i + size] for i in range(0, len(data), size)]
+
+    def test_iter_array(self):
+        input = [
+            1, 23456, -7.5e10, 'caf\u00e9', None, True, [], {},
+            {'nested': [1, 2, {'a': 'b'}]},
+            datetime.datetime(2014, 1, 4, 14, 53),
+        ]
+        serialized = self._cls.serialize(input).encode()
+
+        for size in (1, 2, 3, 7, 64, len(serialized)):
+            result = list(self._cls.iter_array(self._chunked(serialized, size)))
+            self.assertEqual(result, input)
+
+    def test_iter_array_whitespace(self):
+        serialized = b' \n[ 1 ,\t2 , "three" ] \n'
+
+        result = list(self._cls.iter_array(self._chunked(serialized, 3)))
+
+        self.assertEqual(result, [1, 2, 'three'])
+
+    def test_iter_array_empty(self):
+        self.assertEqual(list(self._cls.iter_array([b'[', b' ]'])), [])
+
+    def test_iter_array_is_lazy(self):
+        def chunks():
+            yield b'[1, 2,'
+            yield b' 3]'
+            raise AssertionError("Read past the end")
+
+        result = self._cls.iter_array(chunks())
+
+        self.assertEqual(next(result), 1)
+        self.assertEqual(next(result), 2)
+
+    def test_iter_array_invalid(self):
+        inputs = [
+            b'', b'{"a": 1}', b'[1, 2', b'[1 2]', b'[1,]', b'[1] 2', b'[tru]',
+            b'[\xff]',
+        ]
+        for input_ in inputs:
+            with self.assertRaises(cache.CacheDecodeError):
+                list(self._cls.iter_array(self._chunked(input_, 2)))
+
+
 class TestPickleSerializer(TestCase):
     _cls = cache.PickleSerializer
 
@@ -208,6 +302,11 @@ class TestPickleSerializer(TestCase):
 
         self.assertEqual(input, result)
 
+    def test_deserialize_buffers(self):
+        intermediate = self._cls.serialize({'a': [1, 2, 3]})
+        for input in (bytearray(intermediate), memoryview(intermediate)):
+            self.assertEqual(self._cls.deserialize(input), {'a': [1, 2, 3]})
+
     @mock.patch('condecache.cache.pickle')
     def _test_deserialize_error(self, exception, mock_pickle):
         def raiser(*args, **kwargs):
@@ -235,3 +334,257 @@ class TestPickleSerializer(TestCase):
 
     def test_deserialize_unpickling_error(self):
         self._test_deserialize_error(pickle.UnpicklingError("TEST ERROR"))
+
+
+class TestPickle5Serializer(TestPickleSerializer):
+    _cls = cache.Pickle5Serializer
+
+    def setUp(self):
+        if self._cls.protocol < 5:
+            self.skipTest("pickle protocol 5 not available")
+
+    def test_out_of_band_buffers(self):
+        blob = bytearray(b'\x01\x02\x03' * 1000)
+        input = {
+            'blob': pickle.PickleBuffer(blob),
+            'view': pickle.PickleBuffer(b'abc' * 1000),
+        }
+
+        intermediate = self._cls.serialize(input)
+        result = self._cls.deserialize(intermediate)
+
+        self.assertEqual(result['blob'], blob)
+        self.assertIsInstance(result['view'], memoryview)
+        self.assertEqual(result['view'].tobytes(), b'abc' * 1000)
+        # Both buffers were written out of band, not into the pickle stream.
+        segments = data_tools.unpack_frame(intermediate, b'P')
+        self.assertEqual(len(segments), 3)
+        self.assertLess(segments[0].nbytes, 1000)
+
+    def test_deserialize_memoryview(self):
+        intermediate = self._cls.serialize(['a', 'b'])
+
+        result = self._cls.deserialize(memoryview(intermediate))
+
+        self.assertEqual(result, ['a', 'b'])
+
+    def test_deserialize_not_a_frame(self):
+        with self.assertRaises(cache.CacheDecodeError):
+            self._cls.deserialize(pickle.dumps('plain pickle'))
+
+    @mock.patch('condecache.cache.unpack_frame')
+    @mock.patch('condecache.cache.pickle')
+    def _test_deserialize_error(self, exception, mock_pickle, mock_unpack):
+        mock_unpack.return_value = [mock.Mock(name='segment')]
+        super(TestPickle5Serializer, self)._test_deserialize_error(exception)
+
+
+class TestFrames(TestCase):
+    def test_pack_and_unpack(self):
+        segments = [b'first', bytearray(b''), memoryview(b'third segment')]
+
+        packed = data_tools.pack_frame(b'T', segments)
+        result = data_tools.unpack_frame(packed, b'T')
+
+        self.assertIsInstance(packed, bytes)
+        self.assertEqual([s.tobytes() for s in result],
+                [b'first', b'', b'third segment'])
+
+    def test_pack_wide_items(self):
+        if sys.version_info[0] == 2:
+            self.skipTest("No memoryview.cast (py2)")
+        segment = memoryview(struct.pack('=3H', 1, 2, 3)).cast('H')
+
+        packed = data_tools.pack_frame(b'T', [segment])
+        result = data_tools.unpack_frame(packed, b'T')
+
+        self.assertEqual([s.tobytes() for s in result],
+                [struct.pack('=3H', 1, 2, 3)])
+
+    def test_unpack_wrong_kind(self):
+        packed = data_tools.pack_frame(b'T', [b'data'])
+
+        with self.assertRaises(ValueError):
+            data_tools.unpack_frame(packed, b'X')
+
+    def test_unpack_truncated(self):
+        packed = data_tools.pack_frame(b'T', [b'data', b'more data'])
+
+        for end in (3, 6, 12, len(packed) - 1):
+            with self.assertRaises(ValueError):
+                data_tools.unpack_frame(packed[:end], b'T')
+
+
+class TestNumpySerializer(TestJSONSerializer):
+    _cls = cache.NumpySerializer
+
+    def _numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("numpy not installed")
+        return numpy
+
+    def test_serialize_and_deserialize_arrays(self):
+        numpy = self._numpy()
+        embeddings = numpy.arange(12, dtype=numpy.float32).reshape(3, 4)
+        input = {
+            'embeddings': embeddings,
+            'items': [{'id': 1, 'scores': numpy.array([0.5, 1.5])}],
+            'transposed': embeddings.T,
+            'empty': numpy.zeros((0, 3), dtype='>i2'),
+            'count': numpy.int64(3),
+        }
+
+        intermediate = self._cls.serialize(input)
+        result = self._cls.deserialize(intermediate)
+
+        self.assertIsInstance(intermediate, type(b''))
+        self.assertEqual(result['count'], 3)
+        self.assertEqual(result['items'][0]['id'], 1)
+        pairs = [
+            (result['embeddings'], embeddings),
+            (result['transposed'], embeddings.T),
+            (result['items'][0]['scores'], input['items'][0]['scores']),
+            (result['empty'], input['empty']),
+        ]
+        for got, expected in pairs:
+            self.assertEqual(got.dtype, expected.dtype)
+            self.assertEqual(got.shape, expected.shape)
+            self.assertTrue(numpy.array_equal(got, expected))
+
+    def test_deserialize_does_not_copy(self):
+        numpy = self._numpy()
+        intermediate = self._cls.serialize(numpy.ones(1000))
+
+        result = self._cls.deserialize(intermediate)
+
+        self.assertFalse(result.flags.owndata)
+        self.assertFalse(result.flags.writeable)
+
+    def test_no_arrays_is_plain_json(self):
+        input = {'a': [1, 2, 3]}
+
+        result = self._cls.serialize(input)
+
+        self.assertEqual(result, cache.JSONSerializer.serialize(input))
+
+    def test_object_arrays_not_supported(self):
+        numpy = self._numpy()
+
+        with self.assertRaises(TypeError):
+            self._cls.serialize(numpy.array([object()]))
+
+    def test_deserialize_corrupt_array(self):
+        self._numpy()
+        array = {'__conde_item_type__': 'ndarray', 'buffer': 0,
+                 'dtype': '<f8', 'shape': [1]}
+        for corrupt in [
+                dict(array, buffer=1),
+                {k: v for k, v in array.items() if k != 'dtype'},
+                {k: v for k, v in array.items() if k != 'shape'}]:
+            intermediate = data_tools.pack_frame(
+                    b'A', [json.dumps(corrupt).encode(), b'\0' * 8])
+
+            with self.assertRaises(cache.CacheDecodeError):
+                self._cls.deserialize(intermediate)
+
+
+ArticleStats = collections.namedtuple(
+        'ArticleStats', ['id', 'views', 'shares', 'updated'])
+Author = collections.namedtuple('Author', ['id', 'slug'])
+
+
+class TestRecordSerializer(TestCase):
+    def setUp(self):
+        self.serializer = cache.RecordSerializer()
+        self.serializer.register(1, ArticleStats, 'QIid')
+        self.serializer.register(2, Author, ['I', '16s'])
+
+    def test_serialize_and_deserialize(self):
+        input = ArticleStats(12345678901, 100, -3, 1500000000.5)
+
+        intermediate = self.serializer.serialize(input)
+        result = self.serializer.deserialize(intermediate)
+
+        self.assertIsInstance(result, ArticleStats)
+        self.assertEqual(result, input)
+        self.assertLess(len(intermediate), len(json.dumps(input._asdict())) / 2)
+
+    def test_serialize_and_deserialize_list(self):
+        input = [Author(i, 'author-{}'.format(i).encode()) for i in range(50)]
+
+        intermediate = self.serializer.serialize(input)
+        result = self.serializer.deserialize(memoryview(intermediate))
+
+        self.assertEqual([a.id for a in result], list(range(50)))
+        self.assertEqual(result[3].slug, b'author-3')
+
+    def test_bytes_fields_kept_exactly(self):
+        inputs = [Author(1, b''), Author(2, b'a\0'), Author(3, b'x' * 16)]
+
+        intermediate = self.serializer.serialize(inputs)
+
+        self.assertEqual(self.serializer.deserialize(intermediate), inputs)
+
+    def test_serialize_bytes_field_too_long(self):
+        with self.assertRaises(ValueError):
+            self.serializer.serialize(Author(1, b'x' * 17))
+        with self.assertRaises(TypeError):
+            self.serializer.serialize(Author(1, 'text'))
+
+    def test_serialize_out_of_range(self):
+        with self.assertRaises(ValueError):
+            self.serializer.serialize(ArticleStats(-1, 2, 3, 4.0))
+
+    def test_serialize_and_deserialize_empty_list(self):
+        intermediate = self.serializer.serialize([])
+
+        self.assertEqual(self.serializer.deserialize(intermediate), [])
+
+    def test_serialize_unregistered(self):
+        Other = collections.namedtuple('Other', ['a'])
+        inputs = [Other(1), [Other(1)], {'a': 1},
+                  [Author(1, b'a'), ArticleStats(1, 2, 3, 4.0)]]
+        for input in inputs:
+            with self.assertRaises(TypeError):
+                self.serializer.serialize(input)
+
+    def test_register_invalid(self):
+        Other = collections.namedtuple('Other', ['a', 'b'])
+        inputs = [
+            (1, Other, 'II'), (3, Author, 'II'), (0, Other, 'II'),
+            (3, Other, 'I'), (3, Other, 'IZ'), (3, Other, ['I', 'II']),
+            (3, collections.namedtuple('One', ['a']), 'IZ'),
+            (3, collections.namedtuple('One', ['a']), '2I'),
+            (3, collections.namedtuple('One', ['a']), ['2I']),
+            (3, collections.namedtuple('One', ['a']), '65536s'),
+        ]
+        for schema_id, record_type, formats in inputs:
+            with self.assertRaises(ValueError):
+                self.serializer.register(schema_id, record_type, formats)
+
+    def test_deserialize_errors(self):
+        valid = self.serializer.serialize(ArticleStats(1, 2, 3, 4.0))
+        other = cache.RecordSerializer()
+        inputs = [b'', b'{"a": 1}', valid[:-1], valid + b'\0', valid[:6]]
+        for input in inputs:
+            with self.assertRaises(cache.CacheDecodeError):
+                self.serializer.deserialize(input)
+
+        with self.assertRaises(cache.CacheDecodeError):
+            other.deserialize(valid)
+
+        # The length of a bytes field is more than the field holds.
+        corrupt = bytearray(self.serializer.serialize(Author(1, b'a')))
+        corrupt[11] = 17
+        with self.assertRaises(cache.CacheDecodeError):
+            self.serializer.deserialize(bytes(corrupt))
+
+    def test_as_cache_serializer(self):
+        class TestCache(cache.BaseRedisCache):
+            serializer = self.serializer
+
+        input = [ArticleStats(1, 2, 3, 4.0), ArticleStats(5, 6, 7, 8.0)]
+
+        self.assertEqual(TestCache._decode(TestCache._encode(input)), input)
@@ -0,0 +1,140 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import mock
+
+from condecache import simulator, trace
+from condecache.trace import READ, WRITE, DELETE, TraceRecord
+
+
+def _reads(keys, size=0):
+    return [TraceRecord(i, key, READ, size) for i, key in enumerate(keys)]
+
+
+class TestSimulatedCaches(TestCase):
+    def test_lru(self):
+        # 1 is used again before 3 is inserted, so 2 is evicted.
+        result = simulator.simulate(_reads([1, 2, 1, 3, 1, 2]), 'lru', 2)
+
+        self.assertEqual(result['hits'], 2)
+        self.assertEqual(result['reads'], 6)
+        self.assertAlmostEqual(result['hit_ratio'], 2 / 6.0)
+
+    def test_fifo(self):
+        # 1 was inserted first, so is evicted by 3 despite being used.
+        result = simulator.simulate(_reads([1, 2, 1, 3, 1, 2]), 'fifo', 2)
+
+        self.assertEqual(result['hits'], 1)
+
+    def test_lfu(self):
+        # 1 is used most, so survives; 2 and 3 evict each other.
+        keys = [1, 1, 1, 2, 3, 1, 2, 3, 1]
+        lfu = simulator.simulate(_reads(keys), 'lfu', 2)
+        lru = simulator.simulate(_reads(keys), 'lru', 2)
+
+        self.assertEqual(lfu['hits'], 4)
+        self.assertLess(lru['hits'], lfu['hits'])
+
+    def test_lfu_heap_bounded(self):
+        sim = simulator.LFUCache(10)
+        for i in range(10000):
+            key = i % 20
+            if not sim.lookup(key, i):
+                sim.insert(key, 0, i)
+
+        self.assertLessEqual(len(sim._heap), 4 * 10 + 64)
+        self.assertEqual(len(sim._counts), 10)
+
+    def test_ttl(self):
+        records = [
+            TraceRecord(0, 1, READ, 0),
+            TraceRecord(5, 1, READ, 0),
+            TraceRecord(11, 1, READ, 0),
+            TraceRecord(12, 1, READ, 0),
+        ]
+
+        result = simulator.simulate(records, 'lru', 10, ttl=10)
+
+        self.assertEqual(result['hits'], 2) # at 5 and 12.
+
+    def test_writes_and_deletes(self):
+        records = [
+            TraceRecord(0, 1, WRITE, 100),
+            TraceRecord(1, 1, READ, 0),
+            TraceRecord(2, 1, DELETE, 0),
+            TraceRecord(3, 1, READ, 0),
+        ]
+
+        result = simulator.simulate(records, 'lru', 10)
+
+        self.assertEqual((result['reads'], result['hits']), (2, 1))
+        # The size of the read is known from the write.
+        self.assertEqual(result['hit_bytes'], 100)
+        self.assertEqual(result['read_bytes'], 100)
+        self.assertEqual(result['byte_hit_ratio'], 1.0)
+
+    def test_by_bytes(self):
+        records = (
+            _reads([1, 2], size=600) + _reads([1], size=600) +
+            _reads([3], size=5000) + _reads([3], size=5000))
+
+        result = simulator.simulate(records, 'lru', 1000, by_bytes=True)
+
+        # Only one 600 byte value fits; 3 never fits.
+        self.assertEqual(result['hits'], 0)
+        result = simulator.simulate(records, 'lru', 1200, by_bytes=True)
+        self.assertEqual(result['hits'], 1)
+        self.assertEqual(result['byte_hit_ratio'], 600 / 11800.0)
+
+    def test_no_sizes(self):
+        result = simulator.simulate(_reads([1, 1]), 'lru', 10)
+
+        self.assertIs(result['byte_hit_ratio'], None)
+
+    def test_sample_rate_scales_capacity(self):
+        with mock.patch.dict(simulator.POLICIES, {'lru': mock.Mock()}):
+            simulator.simulate([], 'lru', 1000, sample_rate=0.1)
+            simulator.POLICIES['lru'].assert_called_once_with(
+                100, None, False)
+
+
+class TestSimulateCurves(TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.path = os.path.join(tmp_dir, 'cache.trace')
+        recorder = trace.TraceRecorder(self.path)
+        for i in range(200):
+            op = mock.Mock(name='op', keys=('key_{}'.format(i % 50),),
+                           time=i, bytes_read=10, bytes_written=0,
+                           error=None)
+            op.name = 'get'
+            recorder.on_operation(op)
+        recorder.close()
+
+    def test_curves(self):
+        results = simulator.simulate_curves(
+            self.path, ['lru', 'fifo'], [100, 10, 50])
+
+        self.assertEqual(
+            [(r['policy'], r['capacity']) for r in results],
+            [('lru', 10), ('lru', 50), ('lru', 100),
+             ('fifo', 10), ('fifo', 50), ('fifo', 100)])
+        lru = [r['hit_ratio'] for r in results[:3]]
+        self.assertEqual(lru, [0.0, 0.75, 0.75])
+
+    def test_main(self):
+        json_path = self.path + '.json'
+
+        with mock.patch('sys.stdout', new_callable=io.StringIO
+                        if str is not bytes else io.BytesIO) as stdout:
+            simulator.main([self.path, '--policies', 'lru',
+                            '--capacities', '10,50', '--ttls', 'none,60',
+                            '--json', json_path])
+
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(os.path.exists(json_path))
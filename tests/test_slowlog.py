@@ -0,0 +1,111 @@
+import signal
+from unittest import TestCase
+
+import mock
+
+from condecache import cache, slowlog
+
+
+class TestSlowLog(TestCase):
+    def test_fast_operations_not_recorded(self):
+        inst = cache.LocalContextCache()
+        log = slowlog.SlowLog(threshold_seconds=60)
+        inst.add_listener(log)
+
+        with inst:
+            inst.get('key_a')
+
+        self.assertEqual(log.entries(), [])
+
+    def test_slow_operation(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.mget.side_effect = ValueError("DOWN")
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        log = slowlog.SlowLog(threshold_seconds=0, stack_sample_rate=0)
+        inst.add_listener(log)
+
+        inst.get_many(['key_a', 'key_b'])
+
+        entry, = log.entries()
+        self.assertEqual(entry['cache'], 'ZLibJsonRedisCache')
+        self.assertEqual(entry['operation'], 'get_many')
+        self.assertEqual(entry['keys'], ['key_a', 'key_b'])
+        self.assertEqual(entry['key_count'], 2)
+        self.assertGreaterEqual(entry['duration'], 0)
+        self.assertIn('DOWN', entry['error'])
+        self.assertIs(entry['stack'], None)
+
+    def test_keys_truncated(self):
+        inst = cache.LocalContextCache()
+        log = slowlog.SlowLog(threshold_seconds=0, max_keys=2,
+                              max_key_length=5)
+        inst.add_listener(log)
+
+        with inst:
+            inst.get_many(['key_a', 'key_bbbbbbb', 'key_c'])
+
+        entry, = log.entries()
+        self.assertEqual(entry['keys'], ['key_a', 'key_b...'])
+        self.assertEqual(entry['key_count'], 3)
+
+    def test_stack_sampled(self):
+        inst = cache.LocalContextCache()
+        log = slowlog.SlowLog(threshold_seconds=0, stack_sample_rate=1)
+        inst.add_listener(log)
+
+        with inst:
+            inst.set('key_a', 1)
+
+        stack = log.entries()[0]['stack']
+        self.assertIn('in test_stack_sampled', stack[-1])
+        self.assertFalse(any('condecache/cache.py' in frame
+                             for frame in stack))
+        self.assertLessEqual(len(stack), 8)
+
+    def test_bounded_and_filtered(self):
+        inst = cache.LocalContextCache()
+        log = slowlog.SlowLog(threshold_seconds=0, max_entries=3)
+        inst.add_listener(log)
+
+        with inst:
+            inst.set('key_a', 1)
+            for _ in range(2):
+                inst.get('key_a')
+            inst.remove('key_a')
+
+        self.assertEqual([e['operation'] for e in log.entries()],
+                         ['remove', 'get', 'get'])
+        self.assertEqual(len(log.entries(operation='get')), 2)
+        self.assertEqual(log.entries(min_duration=60), [])
+
+        log.clear()
+        self.assertEqual(log.entries(), [])
+
+    def test_dump(self):
+        inst = cache.LocalContextCache()
+        log = slowlog.SlowLog(threshold_seconds=0, stack_sample_rate=1)
+        inst.add_listener(log)
+        with inst:
+            inst.get('key_a')
+        out = mock.Mock(name='file')
+
+        log.dump(out)
+
+        lines = ''.join(
+            call[0][0] for call in out.write.call_args_list).splitlines()
+        self.assertEqual(lines[0], 'condecache slowlog: 1 entries')
+        self.assertIn("LocalContextCache.get", lines[1])
+        self.assertIn("keys=['key_a'] (1)", lines[1])
+        self.assertTrue(lines[-1].startswith('    '))
+
+    def test_signal_handler(self):
+        log = slowlog.SlowLog()
+
+        with mock.patch('signal.signal') as signal_signal:
+            with mock.patch.object(log, 'dump') as dump:
+                log.install_signal_handler()
+                signum, handler = signal_signal.call_args[0]
+                handler(signum, None)
+
+        self.assertEqual(signum, signal.SIGUSR1)
+        dump.assert_called_once_with()
@@ -0,0 +1,97 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import mock
+
+from condecache import cache, trace
+
+
+class TestTraceRecorder(TestCase):
+    def setUp(self):
+        self.redis_conn = mock.Mock(name='redis_conn')
+        self.redis_conn.mget.return_value = [None, None]
+        self.cache = cache.ZLibJsonRedisCache(self.redis_conn)
+
+    def _record(self, sample_rate=1.0):
+        out = io.BytesIO()
+        recorder = trace.TraceRecorder(out, sample_rate)
+        self.cache.add_listener(recorder)
+        return out, recorder
+
+    def _read(self, out):
+        return list(trace.read_trace(io.BytesIO(out.getvalue())))
+
+    def test_records(self):
+        out, recorder = self._record()
+        encoded = self.cache._encode({'a': 1})
+        self.redis_conn.get.return_value = encoded
+
+        self.cache.get('key_a')
+        self.cache.get_many(['key_a', 'key_b'])
+        self.cache.set('key_b', {'a': 1}, 5)
+        self.cache.remove('key_a')
+        self.cache.touch('key_a', 5)
+        recorder.close()
+
+        records = self._read(out)
+        self.assertEqual(
+            [(r.key_hash, r.kind, r.size) for r in records], [
+                (trace.hash_key('key_a'), trace.READ, len(encoded)),
+                (trace.hash_key('key_a'), trace.READ, 0),
+                (trace.hash_key('key_b'), trace.READ, 0),
+                (trace.hash_key('key_b'), trace.WRITE, len(encoded)),
+                (trace.hash_key('key_a'), trace.DELETE, 0),
+            ])
+        self.assertTrue(all(r.time > 0 for r in records))
+        self.assertEqual(len(out.getvalue()), 4 + 9 + 5 * 21)
+
+    def test_failed_operations_not_recorded(self):
+        out, recorder = self._record()
+        self.redis_conn.get.side_effect = Exception("DOWN")
+
+        self.cache.get('key_a')
+
+        self.assertEqual(self._read(out), [])
+
+    def test_sampled_by_key(self):
+        out, recorder = self._record(sample_rate=0.25)
+        keys = ['key_{}'.format(i) for i in range(400)]
+        self.redis_conn.get.return_value = None
+
+        for key in keys + keys:
+            self.cache.get(key)
+
+        header = trace.read_trace_header(io.BytesIO(out.getvalue()))
+        self.assertEqual(header['sample_rate'], 0.25)
+        hashes = [record.key_hash for record in self._read(out)]
+        sampled = set(hashes)
+        self.assertTrue(50 < len(sampled) < 150)
+        # Every access to a sampled key is kept.
+        self.assertEqual(len(hashes), 2 * len(sampled))
+
+    def test_path_and_truncated(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        path = os.path.join(tmp_dir, 'cache.trace')
+        self.redis_conn.get.return_value = None
+
+        with trace.TraceRecorder(path) as recorder:
+            self.cache.add_listener(recorder)
+            self.cache.get('key_a')
+            self.cache.get('key_b')
+        self.cache.get('key_c') # After closing.
+        with open(path, 'ab') as f:
+            f.write(b'\0' * 10)
+
+        self.assertEqual(len(list(trace.read_trace(path))), 2)
+
+    def test_not_a_trace(self):
+        with self.assertRaises(ValueError):
+            list(trace.read_trace(io.BytesIO(b'not a trace at all')))
+
+    def test_invalid_sample_rate(self):
+        with self.assertRaises(ValueError):
+            trace.TraceRecorder(io.BytesIO(), sample_rate=0)
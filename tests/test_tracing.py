@@ -0,0 +1,143 @@
+import logging
+from unittest import TestCase
+
+import mock
+
+from condecache import cache, tracing
+
+
+class TestLoggingTracer(TestCase):
+    def test_logs_operation_and_remote_call(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.mget.__name__ = 'mget'
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        logger = mock.Mock(name='logger')
+        logger.isEnabledFor.return_value = True
+        inst.add_listener(tracing.LoggingTracer(logger))
+        redis_conn.mget.return_value = [inst._encode('abc'), None]
+
+        inst.get_many(['article:1', 'article:2'])
+
+        self.assertEqual(logger.log.call_count, 2)
+        remote_args = logger.log.call_args_list[0][0]
+        self.assertEqual(remote_args[0], logging.DEBUG)
+        self.assertEqual(remote_args[2:5],
+                         ('ZLibJsonRedisCache', 'mget', 'get_many'))
+        self.assertIs(remote_args[-1], None)
+        op_args = logger.log.call_args_list[1][0]
+        self.assertEqual(op_args[2:7], (
+            'ZLibJsonRedisCache', 'get_many', 2, 'article',
+            len(inst._encode('abc')),
+        ))
+        self.assertIs(op_args[-1], None)
+
+    def test_logs_error_class(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.mget.__name__ = 'mget'
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        logger = mock.Mock(name='logger')
+        logger.isEnabledFor.return_value = True
+        inst.add_listener(tracing.LoggingTracer(logger, level=logging.WARNING))
+        redis_conn.mget.side_effect = ValueError("DOWN")
+
+        inst.get_many(['article:1'])
+
+        remote_args, op_args = [c[0] for c in logger.log.call_args_list]
+        self.assertEqual(remote_args[0], logging.WARNING)
+        self.assertEqual(remote_args[-1], 'ValueError')
+        self.assertEqual(op_args[-1], 'RemoteCacheCommError')
+
+    def test_threshold(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.mget.__name__ = 'mget'
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        logger = mock.Mock(name='logger')
+        logger.isEnabledFor.return_value = True
+        inst.add_listener(tracing.LoggingTracer(logger, threshold_seconds=60))
+        redis_conn.mget.return_value = [None]
+
+        inst.get_many(['article:1'])
+
+        logger.log.assert_not_called()
+
+    def test_level_disabled(self):
+        redis_conn = mock.Mock(name='redis_conn')
+        redis_conn.mget.__name__ = 'mget'
+        inst = cache.ZLibJsonRedisCache(redis_conn)
+        logger = mock.Mock(name='logger')
+        logger.isEnabledFor.return_value = True
+        inst.add_listener(tracing.LoggingTracer(logger))
+        logger.isEnabledFor.return_value = False
+        redis_conn.mget.return_value = [None]
+
+        inst.get_many(['article:1'])
+
+        logger.log.assert_not_called()
+
+
+class TestOpenTelemetryTracer(TestCase):
+    def setUp(self):
+        self.redis_conn = mock.Mock(name='redis_conn')
+        self.redis_conn.get.__name__ = 'get'
+        self.cache = cache.ZLibJsonRedisCache(self.redis_conn)
+        self.tracer = mock.Mock(name='tracer')
+        self.spans = []
+        self.tracer.start_span.side_effect = self._start_span
+        self.cache.add_listener(tracing.OpenTelemetryTracer(self.tracer))
+
+    def _start_span(self, name, **kwargs):
+        span = mock.Mock(name=name)
+        self.spans.append((name, kwargs, span))
+        return span
+
+    def test_spans(self):
+        self.redis_conn.get.return_value = self.cache._encode({'a': 1})
+
+        self.cache.get('article:1')
+
+        (op_name, op_kwargs, op_span), (call_name, call_kwargs, call_span) = \
+            self.spans
+        self.assertEqual(op_name, 'cache get')
+        self.assertEqual(call_name, 'cache remote get')
+        self.assertEqual(call_kwargs['attributes']['db.operation'], 'get')
+        self.assertLessEqual(op_kwargs['start_time'],
+                             call_kwargs['start_time'])
+        op_span.set_attribute.assert_any_call('cache.operation', 'get')
+        op_span.set_attribute.assert_any_call('cache.key_count', 1)
+        op_span.set_attribute.assert_any_call('cache.prefix', 'article')
+        op_span.set_attribute.assert_any_call('cache.hits', 1)
+        op_span.set_attribute.assert_any_call(
+            'cache.bytes_read', len(self.redis_conn.get.return_value))
+        op_span.end.assert_called_once()
+        call_span.end.assert_called_once()
+        self.assertGreaterEqual(op_span.end.call_args[1]['end_time'],
+                                call_span.end.call_args[1]['end_time'])
+        op_span.record_exception.assert_not_called()
+
+    def test_error(self):
+        error = ValueError("DOWN")
+        self.redis_conn.get.side_effect = error
+
+        self.cache.get('article:1')
+
+        (_, _, op_span), (_, _, call_span) = self.spans
+        call_span.set_attribute.assert_called_once_with(
+            'error.type', 'ValueError')
+        call_span.record_exception.assert_called_once_with(error)
+        op_span.set_attribute.assert_any_call(
+            'error.type', 'RemoteCacheCommError')
+        op_span.record_exception.assert_called_once()
+
+    def test_added_during_operation(self):
+        otel_tracer = tracing.OpenTelemetryTracer(self.tracer)
+        op = cache.Operation(mock.Mock(_listeners=()), 'get', ('key_a',))
+        op.finish()
+
+        otel_tracer.on_operation(op)
+
+        self.tracer.start_span.assert_not_called()
+
+    def test_default_tracer_needs_opentelemetry(self):
+        with mock.patch.object(tracing, 'otel_trace', None):
+            with self.assertRaises(ImportError):
+                tracing.OpenTelemetryTracer()